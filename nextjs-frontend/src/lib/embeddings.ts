@@ -20,7 +20,29 @@ async function getEmbedder(): Promise<
   return p;
 }
 
+async function embedQueryRemote(url: string, text: string): Promise<number[]> {
+  const response = await fetch(`${url.replace(/\/$/, "")}/embed`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query: text }),
+  });
+  if (!response.ok) {
+    throw new Error(`Query embedding server responded with ${response.status}`);
+  }
+  const payload = (await response.json()) as { embedding?: number[] };
+  if (!Array.isArray(payload.embedding)) {
+    throw new Error("Query embedding server returned no embedding");
+  }
+  return payload.embedding;
+}
+
 export async function embedQuery(text: string): Promise<number[]> {
+  // python-crawler/query_server.py が起動していれば、ウォーム済みモデルとバッチ処理を利用する
+  const serverUrl = process.env.QUERY_EMBEDDING_URL;
+  if (serverUrl) {
+    return embedQueryRemote(serverUrl, text);
+  }
+
   const embedder = await getEmbedder();
   const result = (await embedder(QUERY_PREFIX + text, {
     pooling: "mean",
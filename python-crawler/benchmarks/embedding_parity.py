@@ -0,0 +1,90 @@
+"""Parity check and throughput benchmark: torch vs ONNX Runtime embedding backends.
+
+Usage (from ``python-crawler/``, requires the ``onnx`` extra)::
+
+    uv run --extra onnx python benchmarks/embedding_parity.py
+    uv run --extra onnx python benchmarks/embedding_parity.py --quantize --repeat 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from embedding import PASSAGE_PREFIX, EmbeddingService  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+DEFAULT_MIN_COSINE = 0.99
+
+
+def load_abstracts() -> list[str]:
+    golden = json.loads((FIXTURES_DIR / "golden.json").read_text(encoding="utf-8"))
+    return [
+        value[0]
+        for name, value in sorted(golden.items())
+        if not name.endswith("listing.html") and value is not None
+    ]
+
+
+def encode(
+    service: EmbeddingService,
+    texts: list[str],
+    batch_size: int,
+) -> tuple[np.ndarray, float]:
+    model = service._load_model()
+    model.encode(texts[:1], batch_size=1, normalize_embeddings=True)  # warm-up
+    started = time.perf_counter()
+    vectors = model.encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
+    return np.asarray(vectors, dtype=np.float32), time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="torch / ONNX embedding parity benchmark")
+    parser.add_argument("--model", default="intfloat/multilingual-e5-large")
+    parser.add_argument("--onnx-dir", type=Path, default=None)
+    parser.add_argument("--quantize", action="store_true", help="int8 動的量子化モデルを比較")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=4, help="フィクスチャを複製する回数")
+    parser.add_argument("--min-cosine", type=float, default=DEFAULT_MIN_COSINE)
+    args = parser.parse_args()
+
+    texts = [f"{PASSAGE_PREFIX}{abstract}" for abstract in load_abstracts()] * args.repeat
+
+    torch_service = EmbeddingService(args.model, backend="torch")
+    onnx_service = EmbeddingService(
+        args.model,
+        backend="onnx",
+        onnx_dir=args.onnx_dir,
+        onnx_quantize=args.quantize,
+    )
+    torch_vectors, torch_seconds = encode(torch_service, texts, args.batch_size)
+    onnx_vectors, onnx_seconds = encode(onnx_service, texts, args.batch_size)
+
+    cosine = np.sum(torch_vectors * onnx_vectors, axis=1)
+    print(f"texts={len(texts)} quantize={args.quantize}")
+    print(f"cosine min={cosine.min():.5f} mean={cosine.mean():.5f}")
+    print(f"torch {len(texts) / torch_seconds:.2f} texts/s")
+    print(
+        f"onnx  {len(texts) / onnx_seconds:.2f} texts/s "
+        f"(speedup={torch_seconds / onnx_seconds:.2f}x)"
+    )
+    if cosine.min() < args.min_cosine:
+        print(f"parity failed: min cosine < {args.min_cosine}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Micro-benchmark for the CVPR HTML parsers and maintenance of their golden file.
+
+The lxml/BeautifulSoup parity check over the fixtures runs in
+``tests/test_parser_golden.py``. ``--save`` downloads pages from the live site
+into ``fixtures/<dir>/`` (listing pages as ``listing.html``) so the test
+covers real markup; pass ``--update-golden`` with it to record their output.
+
+Usage (from ``python-crawler/``)::
+
+    uv run python benchmarks/parse_benchmark.py
+    uv run python benchmarks/parse_benchmark.py --update-golden
+    uv run python benchmarks/parse_benchmark.py --update-golden --save URL [URL ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crawler import (  # noqa: E402
+    parse_article_fields,
+    parse_article_fields_soup,
+    parse_listing,
+    parse_listing_soup,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+GOLDEN_FILE = FIXTURES_DIR / "golden.json"
+LISTING_NAME = "listing.html"
+
+
+def load_pages() -> dict[str, str]:
+    return {
+        str(path.relative_to(FIXTURES_DIR)): path.read_text(encoding="utf-8")
+        for path in sorted(FIXTURES_DIR.glob("*/*.html"))
+    }
+
+
+def extract(pages: dict[str, str], fast: bool) -> dict[str, Any]:
+    listing = parse_listing if fast else parse_listing_soup
+    article = parse_article_fields if fast else parse_article_fields_soup
+    return {
+        name: listing(html) if name.endswith(LISTING_NAME) else article(html)
+        for name, html in pages.items()
+    }
+
+
+def save_pages(urls: list[str], directory: str) -> None:
+    """Download ``urls`` into ``fixtures/<directory>/``; pages outside ``/html/`` are listings."""
+
+    target = FIXTURES_DIR / directory
+    target.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(follow_redirects=True, timeout=60) as client:
+        for url in urls:
+            response = client.get(url)
+            response.raise_for_status()
+            name = url.rsplit("/", 1)[-1] if "/html/" in url else LISTING_NAME
+            (target / name).write_text(response.text, encoding="utf-8")
+            print(f"saved {url} -> {target / name}")
+
+
+def time_parser(parser: Callable[[str], Any], documents: list[str], repeat: int) -> float:
+    """Return mean milliseconds per document."""
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in documents:
+            parser(html)
+    elapsed = time.perf_counter() - started
+    return elapsed * 1000 / (repeat * len(documents))
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CVPR parser golden check / benchmark")
+    parser.add_argument("--repeat", type=int, default=50, help="計測の繰り返し回数")
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        help="BeautifulSoup 実装の出力で golden.json を更新します",
+    )
+    parser.add_argument(
+        "--save", nargs="+", default=[], help="フィクスチャとして保存するページ URL"
+    )
+    parser.add_argument(
+        "--save-dir",
+        default="cvpr2024_site",
+        help="--save の保存先 (fixtures/ 以下のディレクトリ名)",
+    )
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save, args.save_dir)
+    pages = load_pages()
+    if args.update_golden:
+        golden = _jsonable(extract(pages, fast=False))
+        GOLDEN_FILE.write_text(
+            json.dumps(golden, ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"updated {GOLDEN_FILE} ({len(golden)} fixtures)")
+
+    listings = [html for name, html in pages.items() if name.endswith(LISTING_NAME)]
+    articles = [html for name, html in pages.items() if not name.endswith(LISTING_NAME)]
+    rows = [
+        ("listing", parse_listing_soup, parse_listing, listings),
+        ("article", parse_article_fields_soup, parse_article_fields, articles),
+    ]
+    for label, slow, fast, documents in rows:
+        soup_ms = time_parser(slow, documents, args.repeat)
+        lxml_ms = time_parser(fast, documents, args.repeat)
+        print(
+            f"{label:<8} soup={soup_ms:.3f} ms/page  lxml={lxml_ms:.3f} ms/page  "
+            f"speedup={soup_ms / lxml_ms:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
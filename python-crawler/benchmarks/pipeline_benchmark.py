@@ -0,0 +1,314 @@
+"""Offline end-to-end benchmark: crawl -> parse -> embed -> upsert.
+
+The crawler talks to an ``httpx.MockTransport`` that serves the recorded CVPR
+fixtures with configurable latency, embeddings run on a small deterministic
+stand-in model (or a real model via ``--embedding-model``), and upserts go to
+an in-memory fake Supabase client. Results are written as JSON so a run can be
+compared against a saved baseline.
+
+Usage (from ``python-crawler/``)::
+
+    uv run python benchmarks/pipeline_benchmark.py --papers 500 --latency-ms 20
+    uv run python benchmarks/pipeline_benchmark.py --baseline benchmarks/results/base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import platform
+import random
+import resource
+import sys
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+import numpy as np
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crawler import CvprCrawler  # noqa: E402
+from embedding import EmbeddingService  # noqa: E402
+from models import Article  # noqa: E402
+from supabase_client import SupabaseVectorClient  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+RESULTS_DIR = Path(__file__).parent / "results"
+FIXTURE_YEAR = 2024
+STAND_IN_MODEL = "stand-in"
+STAND_IN_DIMENSION = 1024
+
+# ベースライン比較の対象にする指標
+HIGHER_IS_BETTER = {"pages_per_sec", "embeddings_per_sec", "upsert_rows_per_sec"}
+LOWER_IS_BETTER = {"seconds", "listing_ms_per_page", "article_ms_per_page", "peak_rss_mb"}
+
+
+class StandInEncoder:
+    """Deterministic hashed bag-of-words encoder with the e5 output shape.
+
+    Costs roughly one matrix multiply per batch, so the embedding stage measures
+    batching / caching overhead rather than transformer FLOPs.
+    """
+
+    def __init__(self, dimension: int = STAND_IN_DIMENSION, vocabulary: int = 4096) -> None:
+        rng = np.random.default_rng(0)
+        self._projection = rng.standard_normal((vocabulary, dimension)).astype(np.float32)
+        self._vocabulary = vocabulary
+        self.tokenizer = None
+
+    def encode(self, texts: Sequence[str], **_: Any) -> np.ndarray:
+        counts = np.zeros((len(texts), self._vocabulary), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+                counts[row, int.from_bytes(digest, "little") % self._vocabulary] += 1
+        vectors = counts @ self._projection
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+
+class FakeSupabase:
+    """Just enough of ``supabase.Client`` for ``SupabaseVectorClient._upsert_records``."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.rows = 0
+
+    def table(self, _name: str) -> FakeSupabase:
+        return self
+
+    def upsert(self, records: list[dict[str, Any]], **_: Any) -> _FakeRequest:
+        return _FakeRequest(self, records)
+
+
+class _FakeRequest:
+    def __init__(self, owner: FakeSupabase, records: list[dict[str, Any]]) -> None:
+        self._owner = owner
+        self._records = records
+
+    def execute(self) -> Any:
+        # 実際の送信と同じくシリアライズのコストを含める
+        json.dumps(self._records)
+        time.sleep(self._owner.latency)
+        self._owner.rows += len(self._records)
+        return type("Response", (), {"data": None, "error": None})()
+
+
+def load_fixture_pages() -> list[str]:
+    return [
+        path.read_text(encoding="utf-8")
+        for path in sorted((FIXTURES_DIR / f"cvpr{FIXTURE_YEAR}").glob("*_paper.html"))
+    ]
+
+
+def build_listing(papers: int, repeated_titles: int = 0) -> str:
+    # 末尾の repeated_titles 件は先頭の論文と同じタイトルを別 URL で掲載する
+    distinct = papers - repeated_titles
+    entries = "\n".join(
+        f'<dt class="ptitle"><br><a href="/content/CVPR{FIXTURE_YEAR}/html/'
+        f'Bench_{index:05d}_CVPR_{FIXTURE_YEAR}_paper.html">'
+        f"Benchmark Paper {index % distinct:05d}</a></dt>"
+        for index in range(papers)
+    )
+    return f'<html><body><div id="content"><dl>\n{entries}\n</dl></div></body></html>'
+
+
+def mock_transport(
+    papers: int,
+    latency: float,
+    jitter: float,
+    seed: int,
+    repeated_titles: int = 0,
+) -> tuple[httpx.MockTransport, dict[str, int]]:
+    listing = build_listing(papers, repeated_titles)
+    pages = load_fixture_pages()
+    rng = random.Random(seed)
+    served = {"pages": 0, "bytes": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(max(latency + rng.uniform(-jitter, jitter), 0))
+        path = request.url.path
+        if path == f"/CVPR{FIXTURE_YEAR}":
+            body = listing
+        elif path.startswith(f"/content/CVPR{FIXTURE_YEAR}/html/Bench_"):
+            index = int(path.rsplit("/", 1)[1].split("_")[1])
+            body = pages[index % len(pages)]
+        else:
+            return httpx.Response(404)
+        served["pages"] += 1
+        served["bytes"] += len(body)
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/html"})
+
+    return httpx.MockTransport(handler), served
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KiB、macOS はバイトで返す
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_parse(crawler: CvprCrawler, repeat: int) -> dict[str, float]:
+    listing = (FIXTURES_DIR / f"cvpr{FIXTURE_YEAR}" / "listing.html").read_text(encoding="utf-8")
+    pages = load_fixture_pages()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        crawler._parse_listing(listing)
+    listing_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            crawler._parse_article_page(html, "https://example.com/p", "title", FIXTURE_YEAR)
+    article_ms = (time.perf_counter() - started) * 1000 / (repeat * len(pages))
+    return {
+        "listing_ms_per_page": round(listing_ms, 4),
+        "article_ms_per_page": round(article_ms, 4),
+    }
+
+
+async def bench_crawl(args: argparse.Namespace) -> tuple[list[Article], dict[str, Any]]:
+    transport, served = mock_transport(
+        args.papers,
+        args.latency_ms / 1000,
+        args.jitter_ms / 1000,
+        args.seed,
+    )
+    crawler = CvprCrawler(
+        [FIXTURE_YEAR],
+        concurrency=args.concurrency,
+        max_concurrency=args.max_concurrency,
+        parse_workers=args.parse_workers,
+        transport=transport,
+    )
+    started = time.perf_counter()
+    result = await crawler.crawl()
+    elapsed = time.perf_counter() - started
+    return result.articles, {
+        "articles": len(result.articles),
+        "failures": len(result.failures),
+        "pages": served["pages"],
+        "bytes": served["bytes"],
+        "seconds": round(elapsed, 4),
+        "pages_per_sec": round(served["pages"] / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **bench_parse(crawler, args.parse_repeat),
+    }
+
+
+def bench_embedding(articles: list[Article], args: argparse.Namespace) -> dict[str, Any]:
+    service = EmbeddingService(args.embedding_model)
+    if args.embedding_model == STAND_IN_MODEL:
+        service._model = StandInEncoder()
+
+    started = time.perf_counter()
+    result = service.embed_articles(articles, batch_size=args.embedding_batch_size)
+    elapsed = time.perf_counter() - started
+    return {
+        "model": args.embedding_model,
+        "processed": result.processed,
+        "failed": len(result.failed),
+        "seconds": round(elapsed, 4),
+        "embeddings_per_sec": round(result.processed / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_upsert(articles: list[Article], args: argparse.Namespace) -> dict[str, Any]:
+    fake = FakeSupabase(args.upsert_latency_ms / 1000)
+    client = SupabaseVectorClient(fake)  # type: ignore[arg-type]
+
+    started = time.perf_counter()
+    client.upsert_articles_chunked(
+        articles,
+        batch_size=args.upsert_batch_size,
+        max_in_flight=args.upsert_concurrency,
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": fake.rows,
+        "seconds": round(elapsed, 4),
+        "upsert_rows_per_sec": round(fake.rows / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    lines: list[str] = []
+    for stage, metrics in current["stages"].items():
+        previous = baseline.get("stages", {}).get(stage, {})
+        for name, value in metrics.items():
+            old = previous.get(name)
+            if name not in HIGHER_IS_BETTER | LOWER_IS_BETTER:
+                continue
+            if not isinstance(value, int | float) or not isinstance(old, int | float) or not old:
+                continue
+            change = (value - old) / old * 100
+            better = change >= 0 if name in HIGHER_IS_BETTER else change <= 0
+            marker = "+" if better else "-"
+            lines.append(f"[{marker}] {stage}.{name}: {old} -> {value} ({change:+.1f}%)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="offline crawler pipeline benchmark")
+    parser.add_argument("--papers", type=int, default=300, help="一覧ページに載せる論文数")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="擬似 HTTP レイテンシ")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="レイテンシの揺らぎ幅")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--max-concurrency", type=int, default=20)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--parse-repeat", type=int, default=50)
+    parser.add_argument(
+        "--embedding-model",
+        default=STAND_IN_MODEL,
+        help=f"埋め込みモデル名。{STAND_IN_MODEL} はダウンロード不要の代替モデル",
+    )
+    parser.add_argument("--embedding-batch-size", type=int, default=32)
+    parser.add_argument("--upsert-batch-size", type=int, default=100)
+    parser.add_argument("--upsert-concurrency", type=int, default=4)
+    parser.add_argument("--upsert-latency-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="結果 JSON の保存先")
+    parser.add_argument("--baseline", type=Path, default=None, help="比較対象の結果 JSON")
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    articles, crawl_stats = asyncio.run(bench_crawl(args))
+    report = {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {key: str(value) for key, value in vars(args).items()},
+        "stages": {
+            "crawl": crawl_stats,
+            "embedding": bench_embedding(articles, args),
+            "upsert": bench_upsert(articles, args),
+        },
+    }
+    report["peak_rss_mb"] = round(peak_rss_mb(), 1)
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(json.dumps(report["stages"], indent=2))
+    print(f"peak_rss_mb={report['peak_rss_mb']} -> {output}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        print(f"baseline: {args.baseline}")
+        for line in compare(report, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Recall / latency benchmark for the local search index against brute force.
+
+Usage (from ``python-crawler/``)::
+
+    uv run python benchmarks/search_benchmark.py --synthetic 50000
+    uv run --extra search python benchmarks/search_benchmark.py --index articles.npz --ann ivf hnsw
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from local_search import ANN_BACKENDS, LocalSearchIndex  # noqa: E402
+from models import Article  # noqa: E402
+
+DEFAULT_DIMENSION = 1024
+DEFAULT_CLUSTERS = 64
+
+
+def synthetic_index(count: int, dimension: int, seed: int) -> LocalSearchIndex:
+    """Clustered random vectors with short pseudo-text, roughly shaped like real embeddings."""
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((DEFAULT_CLUSTERS, dimension)).astype(np.float32)
+    labels = rng.integers(0, DEFAULT_CLUSTERS, size=count)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((count, dimension)).astype(np.float32)
+    vocabulary = np.array([f"term{i}" for i in range(2000)])
+    articles = (
+        Article(
+            title=" ".join(rng.choice(vocabulary, 8)),
+            authors="synthetic",
+            year="2024",
+            url=f"https://example.com/papers/{i}",
+            abstract=" ".join(rng.choice(vocabulary, 120)),
+            abstract_embedding=vectors[i],
+        )
+        for i in range(count)
+    )
+    return LocalSearchIndex.from_articles(articles)
+
+
+def percentile_ms(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q) * 1000)
+
+
+def run_queries(
+    index: LocalSearchIndex,
+    queries: np.ndarray,
+    texts: list[str | None],
+    alpha: float,
+    k: int,
+) -> tuple[list[list[str]], list[float]]:
+    results: list[list[str]] = []
+    latencies: list[float] = []
+    for query, text in zip(queries, texts, strict=True):
+        started = time.perf_counter()
+        hits = index.search(text, query, alpha=alpha, match_count=k)
+        latencies.append(time.perf_counter() - started)
+        results.append([hit.url for hit in hits])
+    return results, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="local search recall / latency benchmark")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--index", type=Path, help="local_search.py build で保存したインデックス")
+    source.add_argument("--synthetic", type=int, help="合成データの件数")
+    parser.add_argument("--dimension", type=int, default=DEFAULT_DIMENSION)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--alpha", type=float, default=0.0, help="全文検索スコアの重み")
+    parser.add_argument(
+        "--ann",
+        nargs="+",
+        choices=[backend for backend in ANN_BACKENDS if backend != "exact"],
+        default=["ivf"],
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.index:
+        index = LocalSearchIndex.load(args.index)
+    else:
+        index = synthetic_index(args.synthetic, args.dimension, args.seed)
+    load_seconds = time.perf_counter() - started
+    print(f"index: rows={len(index)} dim={index.dimension} load={load_seconds:.2f}s")
+
+    # 既存行にノイズを加えたものをクエリにし、実際の検索に近い分布にする
+    rng = np.random.default_rng(args.seed + 1)
+    rows = rng.choice(np.flatnonzero(index.has_embedding), size=args.queries)
+    queries = index.matrix[rows] + 0.3 * rng.standard_normal(
+        (args.queries, index.dimension)
+    ).astype(np.float32)
+    texts: list[str | None] = [None] * args.queries
+    if args.alpha > 0:
+        texts = [
+            index.search(None, query, alpha=0.0, match_count=1)[0].title.split()[0]
+            for query in queries
+        ]
+
+    index.build_ann("exact")
+    truth, latencies = run_queries(index, queries, texts, args.alpha, args.k)
+    print(
+        f"{'exact':>6}: p50={percentile_ms(latencies, 50):.2f}ms "
+        f"p99={percentile_ms(latencies, 99):.2f}ms recall@{args.k}=1.000"
+    )
+
+    for backend in args.ann:
+        started = time.perf_counter()
+        index.build_ann(backend)
+        build_seconds = time.perf_counter() - started
+        found, latencies = run_queries(index, queries, texts, args.alpha, args.k)
+        recall = np.mean(
+            [
+                len(set(got) & set(expected)) / max(len(expected), 1)
+                for got, expected in zip(found, truth, strict=True)
+            ]
+        )
+        print(
+            f"{backend:>6}: p50={percentile_ms(latencies, 50):.2f}ms "
+            f"p99={percentile_ms(latencies, 99):.2f}ms recall@{args.k}={recall:.3f} "
+            f"build={build_seconds:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
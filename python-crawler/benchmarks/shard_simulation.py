@@ -0,0 +1,180 @@
+"""Local multi-node simulation of ``--shard`` against a mock CVF site.
+
+Spawns one process per shard. Each crawls the same synthetic listing through an
+``httpx.MockTransport`` with ``shard=INDEX/COUNT`` and writes a shard report;
+the parent then merges the reports and checks them against an unsharded crawl
+of the same listing:
+
+* every listing entry was fetched by exactly one shard,
+* the merged article count and title set match the unsharded run,
+* titles repeated under different URLs are caught even across shards.
+
+Usage (from ``python-crawler/``)::
+
+    uv run python benchmarks/shard_simulation.py --shards 4 --papers 400 --repeated-titles 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline_benchmark import FIXTURE_YEAR, mock_transport  # noqa: E402
+
+from crawler import CrawlResult, CvprCrawler, build_sources  # noqa: E402
+from shard import ShardSpec, merge_shard_reports, write_shard_report  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def crawl(args: argparse.Namespace, shard: ShardSpec | None) -> CrawlResult:
+    crawler = CvprCrawler(
+        sources=build_sources([FIXTURE_YEAR]),
+        concurrency=args.concurrency,
+        max_concurrency=args.concurrency,
+        transport=mock_transport(
+            args.papers,
+            latency=args.latency_ms / 1000,
+            jitter=0.0,
+            seed=0,
+            repeated_titles=args.repeated_titles,
+        )[0],
+        shard=shard,
+    )
+    return asyncio.run(crawler.crawl())
+
+
+def run_shard(args: argparse.Namespace) -> None:
+    shard = ShardSpec.parse(args.run_shard)
+    result = crawl(args, shard)
+    write_shard_report(args.report, shard, result)
+
+
+def spawn_shards(args: argparse.Namespace, workdir: Path) -> list[Path]:
+    reports = [workdir / f"shard-{index}.json" for index in range(args.shards)]
+    # 各シャードを別プロセスで同時に起動し、別ノードでの実行を模擬する
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                *args.forwarded,
+                "--run-shard",
+                f"{index}/{args.shards}",
+                "--report",
+                str(report),
+            ]
+        )
+        for index, report in enumerate(reports)
+    ]
+    for process in processes:
+        if process.wait() != 0:
+            raise SystemExit(f"shard process failed: {process.args}")
+    return reports
+
+
+def check(
+    args: argparse.Namespace,
+    reports: list[dict[str, Any]],
+    merged: dict[str, Any],
+    reference: CrawlResult,
+) -> list[str]:
+    problems: list[str] = []
+    shard_urls = [
+        set(report["titles"].values()) | {duplicate["url"] for duplicate in report["duplicates"]}
+        for report in reports
+    ]
+    if merged["scheduled"] != args.papers:
+        problems.append(f"scheduled {merged['scheduled']} of {args.papers} listing entries")
+    overlap = sum(len(urls) for urls in shard_urls) - len(set().union(*shard_urls))
+    if overlap:
+        problems.append(f"{overlap} URLs fetched by more than one shard")
+    if merged["total"] != reference.total:
+        problems.append(f"merged total {merged['total']} != unsharded {reference.total}")
+    merged_titles = set().union(*(report["titles"] for report in reports))
+    if merged_titles != set(reference.seen_titles):
+        problems.append("merged title set differs from the unsharded crawl")
+    found = len(merged["duplicates"]) + len(merged["cross_shard_duplicates"])
+    if found != len(reference.duplicates):
+        problems.append(
+            f"found {found} title duplicates, unsharded found {len(reference.duplicates)}"
+        )
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="local multi-process shard simulation")
+    parser.add_argument("--shards", type=int, default=4, help="起動するシャード数")
+    parser.add_argument("--papers", type=int, default=400, help="一覧に載せる論文数")
+    parser.add_argument(
+        "--repeated-titles",
+        type=int,
+        default=20,
+        help="先頭の論文と同じタイトルを別 URL で掲載する件数",
+    )
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="擬似レスポンス遅延")
+    parser.add_argument("--concurrency", type=int, default=8, help="シャードごとの同時取得数")
+    parser.add_argument("--output", type=Path, default=None, help="結果 JSON の保存先")
+    parser.add_argument("--run-shard", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--report", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    if args.run_shard:
+        run_shard(args)
+        return
+
+    args.forwarded = [
+        f"--papers={args.papers}",
+        f"--repeated-titles={args.repeated_titles}",
+        f"--latency-ms={args.latency_ms}",
+        f"--concurrency={args.concurrency}",
+    ]
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = spawn_shards(args, Path(workdir))
+        reports = [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+    sharded_seconds = time.perf_counter() - started
+    merged = merge_shard_reports(reports)
+
+    started = time.perf_counter()
+    reference = crawl(args, shard=None)
+    unsharded_seconds = time.perf_counter() - started
+
+    problems = check(args, reports, merged, reference)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": {key: str(value) for key, value in vars(args).items() if key != "forwarded"},
+        "per_shard_articles": [sum(r["per_year_counts"].values()) for r in reports],
+        "merged_total": merged["total"],
+        "in_shard_duplicates": len(merged["duplicates"]),
+        "cross_shard_duplicates": len(merged["cross_shard_duplicates"]),
+        "unsharded_total": reference.total,
+        "sharded_seconds": round(sharded_seconds, 2),
+        "unsharded_seconds": round(unsharded_seconds, 2),
+        "problems": problems,
+    }
+    output = args.output or RESULTS_DIR / f"shard-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    print(f"-> {output}")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Startup benchmark: import cost of ``main`` and time to the first embedding.
+
+Import cost is measured in fresh interpreters: ``import main`` as shipped, and
+``import main`` followed by the ``torch`` / ``sentence_transformers`` imports
+that ``embedding`` used to pay at module load. Time to first embedding runs a
+simulated crawl (``--crawl-seconds`` of sleep) and then embeds one article,
+once with the model loaded on first use and once with ``start_warm_up`` called
+before the crawl.
+
+Usage (from ``python-crawler/``)::
+
+    uv run python benchmarks/startup_benchmark.py --crawl-seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+_IMPORT_PROBE = """
+import resource, sys, time
+started = time.perf_counter()
+import main
+{extra}
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+print(elapsed, peak_mb, "torch" in sys.modules)
+"""
+
+_EAGER_IMPORTS = "import torch\nimport sentence_transformers"
+
+_FIRST_EMBEDDING_PROBE = """
+import sys, time
+from loguru import logger
+logger.remove()
+from embedding import EmbeddingService
+from models import Article
+started = time.perf_counter()
+service = EmbeddingService({model!r})
+if {warm_up}:
+    service.start_warm_up()
+time.sleep({crawl_seconds})
+article = Article(
+    title="t", authors="a", year="2024", url="https://example.com/p.html", abstract="warm up"
+)
+service.embed_articles([article], batch_size=1)
+print(time.perf_counter() - started)
+"""
+
+
+def run_probe(source: str) -> list[str]:
+    completed = subprocess.run(
+        [sys.executable, "-c", source],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout.split()
+
+
+def bench_imports(repeat: int) -> dict[str, dict[str, float | bool]]:
+    results: dict[str, dict[str, float | bool]] = {}
+    for name, extra in (("lazy", ""), ("eager", _EAGER_IMPORTS)):
+        # 最初の 1 回はディスクキャッシュの影響を受けるため捨てる
+        run_probe(_IMPORT_PROBE.format(extra=extra))
+        samples = [run_probe(_IMPORT_PROBE.format(extra=extra)) for _ in range(repeat)]
+        results[name] = {
+            "import_seconds": round(min(float(sample[0]) for sample in samples), 3),
+            "peak_rss_mb": round(min(float(sample[1]) for sample in samples), 1),
+            "torch_loaded": samples[0][2] == "True",
+        }
+    return results
+
+
+def bench_first_embedding(model: str, crawl_seconds: float) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for name, warm_up in (("on_demand", False), ("warm_up", True)):
+        source = _FIRST_EMBEDDING_PROBE.format(
+            model=model,
+            warm_up=warm_up,
+            crawl_seconds=crawl_seconds,
+        )
+        results[f"{name}_seconds"] = round(float(run_probe(source)[0]), 3)
+    results["saved_seconds"] = round(results["on_demand_seconds"] - results["warm_up_seconds"], 3)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="crawler startup benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="import 計測の繰り返し回数")
+    parser.add_argument(
+        "--embedding-model",
+        default="intfloat/multilingual-e5-large",
+        help="初回埋め込みの計測に使うモデル名",
+    )
+    parser.add_argument(
+        "--crawl-seconds",
+        type=float,
+        default=10.0,
+        help="モデル読み込みと重ねる擬似クロール時間",
+    )
+    parser.add_argument(
+        "--skip-first-embedding",
+        action="store_true",
+        help="モデルを使う計測を省略し、import 時間のみ計測します",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="結果 JSON の保存先")
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    started = time.perf_counter()
+    report: dict[str, object] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": {key: str(value) for key, value in vars(args).items()},
+        "imports": bench_imports(args.repeat),
+    }
+    if not args.skip_first_embedding:
+        report["first_embedding"] = bench_first_embedding(args.embedding_model, args.crawl_seconds)
+    report["benchmark_seconds"] = round(time.perf_counter() - started, 1)
+
+    output = args.output or RESULTS_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    print(f"-> {output}")
+
+
+if __name__ == "__main__":
+    main()
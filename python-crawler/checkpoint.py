@@ -0,0 +1,127 @@
+"""Checkpoint journal that lets an interrupted run resume where it stopped."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from models import Article
+
+_SCHEMA = """
+create table if not exists articles (
+    url text primary key,
+    data text not null,
+    embedding blob,
+    upserted integer not null default 0
+);
+"""
+
+
+class CheckpointJournal:
+    """SQLite journal of fetched articles, computed embeddings and upserted rows.
+
+    Each stage records its progress as soon as a unit of work completes, so a
+    crash loses at most the batch that was in flight. ``load_pending`` restores
+    every article that has not been upserted yet, with its embedding if one was
+    already computed. Rows dropped as near-duplicates are marked done the same
+    way, so a resumed run does not upsert them after all.
+
+    The journal is a context manager that closes its connection on exit.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+
+    def reset(self) -> None:
+        self._conn.execute("delete from articles")
+        self._conn.commit()
+
+    def record_article(self, article: Article) -> None:
+        self._conn.execute(
+            "insert or ignore into articles (url, data) values (?, ?)",
+            (str(article.url), _dump_article(article)),
+        )
+        self._conn.commit()
+
+    def record_embeddings(self, articles: Iterable[Article]) -> None:
+        rows = [
+            (np.asarray(article.abstract_embedding, dtype=np.float32).tobytes(), str(article.url))
+            for article in articles
+            if article.abstract_embedding is not None
+        ]
+        if not rows:
+            return
+        self._conn.executemany("update articles set embedding = ? where url = ?", rows)
+        self._conn.commit()
+
+    def mark_upserted(self, articles: Iterable[Article]) -> None:
+        self.mark_done(str(article.url) for article in articles)
+
+    def mark_done(self, urls: Iterable[str]) -> None:
+        """Mark ``urls`` as finished so ``load_pending`` no longer restores them."""
+
+        self._conn.executemany(
+            "update articles set upserted = 1 where url = ?", [(url,) for url in urls]
+        )
+        self._conn.commit()
+
+    def known_urls(self) -> set[str]:
+        return {url for (url,) in self._conn.execute("select url from articles")}
+
+    def load_pending(self) -> list[Article]:
+        """Return journaled articles that were not upserted, restoring stored embeddings."""
+
+        articles: list[Article] = []
+        for data, blob in self._conn.execute(
+            "select data, embedding from articles where upserted = 0 order by rowid"
+        ):
+            article = Article.model_validate_json(data)
+            if blob is not None:
+                article.abstract_embedding = np.frombuffer(blob, dtype=np.float32)
+            articles.append(article)
+        return articles
+
+    def summary(self) -> str:
+        total, embedded, upserted = self._conn.execute(
+            "select count(*), count(embedding), coalesce(sum(upserted), 0) from articles"
+        ).fetchone()
+        return f"journaled={total}, embedded={embedded}, upserted={upserted}"
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> CheckpointJournal:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def open_journal(path: Path, resume: bool) -> CheckpointJournal:
+    """Open the journal at ``path``, clearing it unless the run is resuming."""
+
+    journal = CheckpointJournal(path)
+    if resume:
+        logger.info(
+            "チェックポイントから再開します: {path} ({summary})",
+            path=path,
+            summary=journal.summary(),
+        )
+    else:
+        journal.reset()
+    return journal
+
+
+def _dump_article(article: Article) -> str:
+    return article.model_copy(update={"abstract_embedding": None}).model_dump_json(
+        exclude_none=True
+    )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -13,32 +13,62 @@ from pydantic import AnyHttpUrl, BaseModel, ValidationError
 load_dotenv()
 
 
+_OPTIONAL_KEYS = frozenset(
+    {
+        "embedding_model_name",
+        "database_url",
+        "embedding_backend",
+        "embedding_onnx_dir",
+        "embedding_onnx_quantize",
+    }
+)
+
+
 class SettingsError(RuntimeError):
     """Raised when environment settings are missing or invalid."""
 
 
-class Settings(BaseModel):
-    """Runtime configuration derived from environment variables."""
+class EmbeddingSettings(BaseModel):
+    """Embedding model configuration, usable without Supabase credentials."""
 
-    supabase_url: AnyHttpUrl
-    supabase_service_role_key: str
     embedding_model_name: str = "intfloat/multilingual-e5-large"
+    embedding_backend: Literal["torch", "onnx"] = "torch"
+    embedding_onnx_dir: str | None = None
+    embedding_onnx_quantize: bool = False
 
     model_config = {"frozen": True}
 
+
+class Settings(EmbeddingSettings):
+    """Runtime configuration derived from environment variables."""
+
+    supabase_url: AnyHttpUrl
+    supabase_service_role_key: str
+    database_url: str | None = None
+
     def as_dict(self) -> dict[str, Any]:
         """Return settings as a plain dictionary."""
 
         return self.model_dump()
 
 
+def _embedding_config() -> dict[str, Any]:
+    return {
+        "embedding_model_name": os.getenv("EMBEDDING_MODEL_NAME", "intfloat/multilingual-e5-large"),
+        "embedding_backend": os.getenv("EMBEDDING_BACKEND", "torch"),
+        "embedding_onnx_dir": os.getenv("EMBEDDING_ONNX_DIR") or None,
+        "embedding_onnx_quantize": os.getenv("EMBEDDING_ONNX_QUANTIZE", "false"),
+    }
+
+
 def _build_settings() -> Settings:
     """Create settings instance from environment variables."""
 
     raw_config = {
         "supabase_url": os.getenv("SUPABASE_URL"),
         "supabase_service_role_key": os.getenv("SUPABASE_SERVICE_ROLE_KEY"),
-        "embedding_model_name": os.getenv("EMBEDDING_MODEL_NAME", "intfloat/multilingual-e5-large"),
+        "database_url": os.getenv("SUPABASE_DB_URL") or None,
+        **_embedding_config(),
     }
 
     try:
@@ -50,7 +80,7 @@ def _build_settings() -> Settings:
     missing = [
         key
         for key, value in raw_config.items()
-        if key != "embedding_model_name" and value in (None, "")
+        if key not in _OPTIONAL_KEYS and value in (None, "")
     ]
     if missing:
         logger.error("必須の環境変数が未設定です: {}", ", ".join(missing))
@@ -64,3 +94,14 @@ def get_settings() -> Settings:
     """Return cached settings instance."""
 
     return _build_settings()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_settings() -> EmbeddingSettings:
+    """Return embedding settings without requiring Supabase credentials."""
+
+    try:
+        return EmbeddingSettings(**_embedding_config())
+    except ValidationError as exc:  # pragma: no cover - configuration errors need to surface
+        logger.error("環境変数のバリデーションに失敗しました: {}", exc)
+        raise SettingsError("環境変数の設定を見直してください。") from exc
@@ -3,27 +3,114 @@
 from __future__ import annotations
 
 import asyncio
+import importlib.util
+import multiprocessing
 import re
+import time
 import unicodedata
 from collections import Counter
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Callable, Collection, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
 from urllib.parse import urljoin
 
 import certifi
 import httpx
+import lxml.html
 from bs4 import BeautifulSoup
 from httpx import HTTPError
 from loguru import logger
+from lxml import etree
 
+from dedup import DuplicateMatch
+from dispatch import WorkDispatcher
+from metrics import METRICS
 from models import Article
+from page_cache import CachedPage, PageCache
+from throttle import (
+    DEFAULT_MAX_RETRIES,
+    RETRYABLE_STATUS_CODES,
+    AdaptiveLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
+
+if TYPE_CHECKING:
+    from shard import ShardSpec
 
 BASE_URL = "https://openaccess.thecvf.com"
 USER_AGENT = "Mozilla/5.0 (compatible; CVPaperReader/0.1; +https://github.com/)"
-LISTING_TEMPLATE = "https://openaccess.thecvf.com/CVPR{year}?day=all"
+LISTING_TEMPLATE = "https://openaccess.thecvf.com/{conference}{year}?day=all"
+CONFERENCES = ("CVPR", "ICCV", "WACV")
 DEFAULT_CONCURRENCY = 5
 DEFAULT_TIMEOUT = 30.0
 
+_ParsedT = TypeVar("_ParsedT")
+_FetchOutcome = tuple["CrawlSource", Article | None, str | None]
+
+_LISTING_ANCHORS_XPATH = etree.XPath(
+    "//dt[contains(concat(' ', normalize-space(@class), ' '), ' ptitle ')]/a"
+)
+_ABSTRACT_XPATH = etree.XPath("(//*[@id='abstract'])[1]")
+_AUTHORS_XPATH = etree.XPath("(//*[@id='authors'])[1]")
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+_PARSE_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_HTTP_LATENCY = METRICS.histogram(
+    "crawler_http_request_duration_seconds",
+    "Latency of individual HTTP attempts by host.",
+)
+_HTTP_RESPONSES = METRICS.counter("crawler_http_responses_total", "HTTP responses by status code.")
+_HTTP_ERRORS = METRICS.counter("crawler_http_transport_errors_total", "HTTP transport errors.")
+_HTTP_RETRIES = METRICS.counter("crawler_http_retries_total", "Retried HTTP requests.")
+_HTTP_BYTES = METRICS.counter("crawler_http_downloaded_bytes_total", "Bytes downloaded.")
+_DISPATCH_DEPTH = METRICS.gauge(
+    "crawler_dispatch_queue_depth",
+    "Listing entries waiting for a fetch worker.",
+)
+_WORKER_UTILISATION = METRICS.gauge(
+    "crawler_worker_utilisation_ratio",
+    "Share of wall time the fetch workers spent fetching and parsing pages.",
+)
+_PARSE_DURATION = METRICS.histogram(
+    "crawler_parse_duration_seconds",
+    "HTML parse time per page by parser.",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class CrawlSource:
+    """One proceedings listing on the CVF open access site (e.g. ICCV 2023)."""
+
+    conference: str
+    year: int
+    listing_template: str = LISTING_TEMPLATE
+
+    @property
+    def label(self) -> str:
+        return f"{self.conference}{self.year}"
+
+    @property
+    def listing_url(self) -> str:
+        return self.listing_template.format(conference=self.conference, year=self.year)
+
+
+def build_sources(
+    years: Sequence[int],
+    conferences: Sequence[str] = ("CVPR",),
+) -> list[CrawlSource]:
+    """Return one source per conference and year, e.g. CVPR/ICCV/WACV for 2023-2025."""
+
+    return [
+        CrawlSource(conference, year)
+        for conference in dict.fromkeys(conferences)
+        for year in sorted(set(years))
+    ]
+
 
 @dataclass(slots=True)
 class CrawlResult:
@@ -31,120 +118,300 @@ class CrawlResult:
 
     articles: list[Article] = field(default_factory=list)
     failures: list[str] = field(default_factory=list)
-    duplicates: list[str] = field(default_factory=list)
+    duplicates: list[DuplicateMatch] = field(default_factory=list)
     per_year_counts: Counter[str] = field(default_factory=Counter)
+    skipped: int = 0
+    scheduled: int = 0
+    other_shards: int = 0
+    seen_titles: dict[str, str] = field(default_factory=dict)
+    page_cache_stats: Counter[str] = field(default_factory=Counter)
+    request_stats: Counter[str] = field(default_factory=Counter)
+    dispatch_stats: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        """Number of accepted articles, including ones streamed out without being retained."""
+
+        return sum(self.per_year_counts.values())
 
     def summary(self) -> str:
         year_stats = ", ".join(
             f"{year}:{count}" for year, count in sorted(self.per_year_counts.items())
         )
-        return (
-            f"total={len(self.articles)} articles, "
+        summary = (
+            f"total={self.total} articles, "
             f"failures={len(self.failures)}, duplicates={len(self.duplicates)}, "
-            f"year_counts={{ {year_stats} }}"
+            f"skipped={self.skipped}, new={self.scheduled}, year_counts={{ {year_stats} }}"
         )
+        if self.other_shards:
+            summary += f", other_shards={self.other_shards}"
+        if self.page_cache_stats:
+            cache_stats = ", ".join(
+                f"{key}:{count}" for key, count in sorted(self.page_cache_stats.items())
+            )
+            summary += f", page_cache={{ {cache_stats} }}"
+        if self.request_stats:
+            request_stats = ", ".join(
+                f"{key}:{count}" for key, count in sorted(self.request_stats.items())
+            )
+            summary += f", requests={{ {request_stats} }}"
+        if self.dispatch_stats:
+            dispatch_stats = ", ".join(
+                f"{key}:{count}" for key, count in sorted(self.dispatch_stats.items())
+            )
+            summary += f", dispatch={{ {dispatch_stats} }}"
+        return summary
 
 
 class CvprCrawler:
-    """Crawler for CVPR open access proceedings."""
+    """Crawler for CVF open access proceedings (CVPR by default, also ICCV and WACV)."""
 
     def __init__(
         self,
-        years: Sequence[int],
+        years: Sequence[int] = (),
         concurrency: int = DEFAULT_CONCURRENCY,
         request_timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        http2: bool = False,
+        page_cache: PageCache | None = None,
+        since_cache: bool = False,
+        skip_urls: Collection[str] = (),
+        parse_workers: int = 0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        sources: Sequence[CrawlSource] | None = None,
+        workers: int | None = None,
+        shard: ShardSpec | None = None,
     ) -> None:
-        self._years = sorted(set(years))
+        self._sources = list(sources) if sources is not None else build_sources(years)
         self._timeout = httpx.Timeout(request_timeout)
         self._headers = {"User-Agent": USER_AGENT}
-        self._semaphore = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._max_concurrency = max(concurrency, max_concurrency or concurrency)
+        self._max_retries = max_retries
+        # 取得ワーカー数は接続上限に合わせ、同時実行数の調整は AdaptiveLimiter に任せる
+        self._workers = workers or self._max_concurrency
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+        pool_size = max_connections or self._max_concurrency
+        self._limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=max_keepalive_connections or pool_size,
+        )
+        self._http2 = http2 and _http2_available()
+        self._page_cache = page_cache
+        self._since_cache = since_cache and page_cache is not None
+        self._skip_urls = frozenset(skip_urls)
+        self._shard = shard
+        self._parse_workers = parse_workers
+        # ベンチマークなどで httpx.MockTransport を差し込むためのフック
+        self._transport = transport
+        self._parse_pool: ProcessPoolExecutor | None = None
+        self._cache_stats: Counter[str] = Counter()
+        self._request_stats: Counter[str] = Counter()
 
     async def crawl(self, limit: int | None = None) -> CrawlResult:
-        """Fetch paper metadata for configured years."""
+        """Fetch paper metadata for the configured sources."""
 
         result = CrawlResult()
-        seen_titles: dict[str, Article] = {}
-
-        async with httpx.AsyncClient(
-            headers=self._headers,
-            timeout=self._timeout,
-            verify=certifi.where(),
-        ) as client:
-            for year in self._years:
-                listing_url = LISTING_TEMPLATE.format(year=year)
-                try:
-                    listing_html = await self._fetch_listing(client, listing_url)
-                except HTTPError as exc:
-                    logger.error(
-                        "{year} 年のリスト取得に失敗しました: {error}",
-                        year=year,
-                        error=exc,
-                    )
-                    result.failures.append(listing_url)
-                    continue
+        async for article in self.iter_articles(result, limit=limit):
+            result.articles.append(article)
+        return result
 
-                papers = self._parse_listing(listing_html)
-                logger.info("{year} 年の候補論文数: {count}", year=year, count=len(papers))
+    async def iter_articles(
+        self,
+        result: CrawlResult,
+        limit: int | None = None,
+    ) -> AsyncIterator[Article]:
+        """Yield articles as they are fetched, recording failures and duplicates in ``result``."""
+
+        self._cache_stats = result.page_cache_stats
+        self._request_stats = result.request_stats
+        known_urls = set(self._skip_urls)
+        if self._since_cache:
+            known_urls |= self._page_cache.known_urls()
+
+        async with AsyncExitStack() as stack:
+            if self._parse_workers > 0:
+                self._parse_pool = stack.enter_context(
+                    ProcessPoolExecutor(
+                        max_workers=self._parse_workers,
+                        # 埋め込みモデルのウォームアップ用スレッドが動いている状態で fork しない
+                        mp_context=multiprocessing.get_context(_PARSE_START_METHOD),
+                    )
+                )
+                stack.callback(setattr, self, "_parse_pool", None)
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(
+                    headers=self._headers,
+                    timeout=self._timeout,
+                    verify=certifi.where(),
+                    limits=self._limits,
+                    http2=self._http2,
+                    transport=self._transport,
+                )
+            )
+            # 全ソースの一覧を同時に取得し、固定数のワーカーが届いた論文を交互に取得する
+            dispatcher: WorkDispatcher[CrawlSource, tuple[str, str]] = WorkDispatcher(
+                producers=len(self._sources),
+                limit=limit,
+            )
+            fetched: asyncio.Queue[_FetchOutcome | None] = asyncio.Queue(maxsize=self._workers)
+            busy = [0.0]
+            started = time.perf_counter()
+
+            async def produce(source: CrawlSource) -> None:
+                try:
+                    papers = await self._fetch_papers(client, source, known_urls, result)
+                    await dispatcher.add(source, papers)
+                    _DISPATCH_DEPTH.set(dispatcher.depth)
+                finally:
+                    await dispatcher.close_producer()
+
+            async def work() -> None:
+                while (item := await dispatcher.next()) is not None:
+                    _DISPATCH_DEPTH.set(dispatcher.depth)
+                    source, (title, href) = item
+                    work_started = time.perf_counter()
+                    try:
+                        article, failure_url = await self._fetch_article(
+                            client, title, href, source.year
+                        )
+                    except BaseException:
+                        await dispatcher.done(source, accepted=False)
+                        raise
+                    busy[0] += time.perf_counter() - work_started
+                    await fetched.put((source, article, failure_url))
 
+            async def supervise() -> None:
                 tasks = [
-                    asyncio.create_task(self._fetch_article(client, title, href, year))
-                    for title, href in papers
+                    *(asyncio.create_task(produce(source)) for source in self._sources),
+                    *(asyncio.create_task(work()) for _ in range(self._workers)),
                 ]
+                try:
+                    await asyncio.gather(*tasks)
+                finally:
+                    # 1 つが失敗したら残りのワーカーも止め、閉じかけのクライアントを使わせない
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    await fetched.put(None)
 
-                collected = 0
-                stop_fetching = False
-                for task in asyncio.as_completed(tasks):
-                    article, failure_url = await task
+            supervisor = asyncio.create_task(supervise())
+            try:
+                while (outcome := await fetched.get()) is not None:
+                    source, article, failure_url = outcome
                     if failure_url:
                         result.failures.append(failure_url)
 
-                    if not article:
-                        continue
-
-                    key = _normalize_title(article.title)
-                    if key in seen_titles:
-                        result.duplicates.append(article.title)
-                        continue
-
-                    seen_titles[key] = article
-                    result.articles.append(article)
-                    result.per_year_counts[str(year)] += 1
-                    collected += 1
-
-                    if limit and collected >= limit:
+                    accepted = article is not None and self._accept(article, result)
+                    if await dispatcher.done(source, accepted):
                         logger.info(
-                            "{year} 年の取得を limit={limit} で打ち切ります。",
-                            year=year,
+                            "{source} の取得を limit={limit} で打ち切ります。",
+                            source=source.label,
                             limit=limit,
                         )
-                        stop_fetching = True
-                        break
+                    if not accepted:
+                        continue
 
-                if stop_fetching:
-                    for task in tasks:
-                        if not task.done():
-                            task.cancel()
-                    await asyncio.gather(*tasks, return_exceptions=True)
+                    result.per_year_counts[source.label] += 1
+                    yield article
+                # ワーカーやリスト取得で発生した例外を呼び出し元へ伝える
+                await supervisor
+            finally:
+                # コンシューマ側の中断時にワーカーを確実に止める
+                supervisor.cancel()
+                await asyncio.gather(supervisor, return_exceptions=True)
+                elapsed = time.perf_counter() - started
+                utilisation = busy[0] / (self._workers * elapsed) if elapsed > 0 else 0.0
+                _WORKER_UTILISATION.set(utilisation)
+                result.dispatch_stats.update(
+                    workers=self._workers,
+                    dispatched=dispatcher.dispatched,
+                    dropped=dispatcher.dropped,
+                    max_queue_depth=dispatcher.max_depth,
+                    utilisation_pct=round(100 * utilisation, 1),
+                )
+
+    def _accept(self, article: Article, result: CrawlResult) -> bool:
+        """Return ``False`` (recording the duplicate) when the title was already seen."""
+
+        seen_titles = result.seen_titles
+        key = normalize_title(article.title)
+        if key in seen_titles:
+            result.duplicates.append(
+                DuplicateMatch(
+                    title=article.title,
+                    url=str(article.url),
+                    matched_url=seen_titles[key],
+                    reason="title",
+                )
+            )
+            return False
+        seen_titles[key] = str(article.url)
+        return True
+
+    async def _fetch_papers(
+        self,
+        client: httpx.AsyncClient,
+        source: CrawlSource,
+        known_urls: Collection[str],
+        result: CrawlResult,
+    ) -> list[tuple[str, str]]:
+        """Fetch and parse one source's listing, returning the ``(title, href)`` pairs to fetch."""
 
-        return result
+        try:
+            listing_html = await self._fetch_listing(client, source.listing_url)
+        except HTTPError as exc:
+            logger.error(
+                "{source} のリスト取得に失敗しました: {error}",
+                source=source.label,
+                error=exc,
+            )
+            result.failures.append(source.listing_url)
+            return []
+
+        papers = await self._run_parser(parse_listing, listing_html)
+        logger.info("{source} の候補論文数: {count}", source=source.label, count=len(papers))
+
+        if self._shard is not None:
+            # URL のハッシュで分割するため、どのノードでも同じ論文が同じシャードに入る
+            candidates = len(papers)
+            papers = [
+                (title, href) for title, href in papers if self._shard.owns(urljoin(BASE_URL, href))
+            ]
+            result.other_shards += candidates - len(papers)
+            logger.info(
+                "{source} はシャード {shard} の {count} 件を担当します。",
+                source=source.label,
+                shard=self._shard,
+                count=len(papers),
+            )
+
+        if known_urls:
+            candidates = len(papers)
+            papers = [
+                (title, href) for title, href in papers if urljoin(BASE_URL, href) not in known_urls
+            ]
+            result.skipped += candidates - len(papers)
+            logger.info(
+                "{source} は取得済み URL を除いた {count} 件を取得します。",
+                source=source.label,
+                count=len(papers),
+            )
+        result.scheduled += len(papers)
+        return papers
 
     async def _fetch_listing(self, client: httpx.AsyncClient, url: str) -> str:
-        async with self._semaphore:
-            resp = await client.get(url)
-        resp.raise_for_status()
-        return resp.text
+        # 一覧ページは新規論文を検出するため TTL を使わず常に再検証する
+        page, from_cache = await self._get_page(client, url, use_ttl=False)
+        if self._page_cache and not from_cache:
+            self._page_cache.store(page)
+        return page.body
 
     def _parse_listing(self, html: str) -> list[tuple[str, str]]:
-        soup = BeautifulSoup(html, "lxml")
-        anchors = soup.select("dt.ptitle > a")
-        papers: list[tuple[str, str]] = []
-        for anchor in anchors:
-            title = _clean_text(anchor.text)
-            href = anchor.get("href")
-            if not href:
-                continue
-            papers.append((title, href))
-        return papers
+        return parse_listing(html)
 
     async def _fetch_article(
         self,
@@ -155,20 +422,153 @@ class CvprCrawler:
     ) -> tuple[Article | None, str | None]:
         url = urljoin(BASE_URL, href)
         try:
-            async with self._semaphore:
-                resp = await client.get(url)
-            resp.raise_for_status()
+            page, from_cache = await self._get_page(client, url)
         except HTTPError as exc:
             logger.warning("論文ページ取得に失敗しました: {url} ({error})", url=url, error=exc)
             return None, url
 
-        article = self._parse_article_page(resp.text, url=url, title=title, year=year)
+        if from_cache and page.has_article:
+            # キャッシュ有効期限内、または 304 の場合は解析を省略する
+            article = Article(
+                title=title,
+                authors=page.authors,
+                year=str(year),
+                url=url,
+                abstract=page.abstract,
+            )
+        else:
+            fields = await self._run_parser(parse_article_fields, page.body)
+            article = _build_article(fields, url=url, title=title, year=year)
+            if self._page_cache:
+                page.parsed_at = time.time()
+                page.abstract = article.abstract if article else None
+                page.authors = article.authors if article else None
+                self._page_cache.store(page)
+
         if not article:
             logger.warning("論文ページの解析に失敗したためスキップします: {url}", url=url)
             return None, url
 
         return article, None
 
+    async def _get_page(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        use_ttl: bool = True,
+    ) -> tuple[CachedPage, bool]:
+        """Fetch ``url``, consulting the page cache when one is configured.
+
+        Returns the page and whether it was served from the cache (inside the TTL
+        or revalidated by a 304). Freshly downloaded pages are not stored here;
+        callers store them once they have added whatever they parsed.
+        """
+
+        cached = self._page_cache.get(url) if self._page_cache else None
+        if cached and use_ttl and cached.is_fresh(self._page_cache.ttl):
+            self._cache_stats["hit"] += 1
+            return cached, True
+
+        headers = cached.conditional_headers() if cached else {}
+        resp = await self._request(client, url, headers)
+
+        if cached and resp.status_code == httpx.codes.NOT_MODIFIED:
+            self._cache_stats["not_modified"] += 1
+            self._page_cache.touch(url)
+            return cached, True
+
+        resp.raise_for_status()
+        if self._page_cache:
+            self._cache_stats["miss"] += 1
+        page = CachedPage(
+            url=url,
+            body=resp.text,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            fetched_at=time.time(),
+        )
+        return page, False
+
+    async def _request(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+    ) -> httpx.Response:
+        """GET ``url`` under the per-host adaptive limiter, retrying transient failures.
+
+        429/5xx responses and transport errors are retried up to ``max_retries``
+        times, honouring ``Retry-After`` or falling back to jittered exponential
+        backoff. The last retryable response is returned so callers can raise.
+        """
+
+        limiter = self._limiter_for(url)
+        attempt = 0
+        while True:
+            attempt += 1
+            ticket = await limiter.acquire()
+            started = time.monotonic()
+            trace = _ConnectionTrace()
+            try:
+                resp = await client.get(url, headers=headers, extensions={"trace": trace})
+            except httpx.TransportError as exc:
+                await limiter.release(ticket, throttled=True)
+                self._request_stats["transport_errors"] += 1
+                _HTTP_ERRORS.inc(error=type(exc).__name__)
+                if attempt > self._max_retries:
+                    raise
+                retry_after = None
+                reason = repr(exc)
+            except BaseException:
+                await limiter.release(ticket)
+                raise
+            else:
+                _HTTP_LATENCY.observe(time.monotonic() - started, host=resp.url.host)
+                _HTTP_RESPONSES.inc(status=resp.status_code)
+                self._record_transfer(resp, trace)
+                if resp.status_code not in RETRYABLE_STATUS_CODES:
+                    await limiter.release(ticket, latency=time.monotonic() - started)
+                    self._request_stats["concurrency_limit"] = limiter.limit
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                await limiter.release(ticket, throttled=True, retry_after=retry_after)
+                self._request_stats[f"status_{resp.status_code}"] += 1
+                if attempt > self._max_retries:
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+
+            delay = backoff_delay(attempt, retry_after)
+            self._request_stats["concurrency_limit"] = limiter.limit
+            self._request_stats["retries"] += 1
+            _HTTP_RETRIES.inc()
+            logger.debug(
+                "リクエストを再試行します: {url} ({reason}, attempt={attempt}, wait={delay:.1f}s, "
+                "concurrency={limit})",
+                url=url,
+                reason=reason,
+                attempt=attempt,
+                delay=delay,
+                limit=limiter.limit,
+            )
+            await asyncio.sleep(delay)
+
+    def _record_transfer(self, resp: httpx.Response, trace: _ConnectionTrace) -> None:
+        self._request_stats["bytes_downloaded"] += resp.num_bytes_downloaded
+        _HTTP_BYTES.inc(resp.num_bytes_downloaded)
+        if resp.http_version == "HTTP/2":
+            self._request_stats["http2_responses"] += 1
+        if trace.traced:
+            key = "connections_new" if trace.new_connection else "connections_reused"
+            self._request_stats[key] += 1
+
+    def _limiter_for(self, url: str) -> AdaptiveLimiter:
+        host = httpx.URL(url).host
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveLimiter(self._concurrency, maximum=self._max_concurrency)
+            self._limiters[host] = limiter
+        return limiter
+
     def _parse_article_page(
         self,
         html: str,
@@ -176,29 +576,164 @@ class CvprCrawler:
         title: str,
         year: int,
     ) -> Article | None:
-        soup = BeautifulSoup(html, "lxml")
+        return _build_article(parse_article_fields(html), url=url, title=title, year=year)
 
-        abstract_node = soup.select_one("#abstract")
-        authors_node = soup.select_one("#authors")
+    async def _run_parser(self, parser: Callable[[str], _ParsedT], html: str) -> _ParsedT:
+        """Run a pure HTML parser in the process pool, or inline when no pool is configured."""
 
-        if not abstract_node or not authors_node:
-            return None
+        started = time.perf_counter()
+        if self._parse_pool is None:
+            parsed = parser(html)
+        else:
+            loop = asyncio.get_running_loop()
+            parsed = await loop.run_in_executor(self._parse_pool, parser, html)
+        _PARSE_DURATION.observe(time.perf_counter() - started, parser=parser.__name__)
+        return parsed
 
-        abstract = _clean_text(abstract_node.get_text(" ", strip=True))
-        authors_text = authors_node.get_text(" ", strip=True)
-        authors = _extract_authors(authors_text)
 
-        if not abstract:
-            logger.debug("抽出された abstract が空のためスキップ: {url}", url=url)
-            return None
+class _ConnectionTrace:
+    """httpcore ``trace`` extension noting whether a request opened a new connection."""
 
-        return Article(
-            title=title,
-            authors=authors,
-            year=str(year),
-            url=url,
-            abstract=abstract,
-        )
+    __slots__ = ("new_connection", "traced")
+
+    def __init__(self) -> None:
+        self.new_connection = False
+        self.traced = False
+
+    async def __call__(self, name: str, info: dict[str, Any]) -> None:
+        self.traced = True
+        if name == "connection.connect_tcp.complete":
+            self.new_connection = True
+
+
+def _http2_available() -> bool:
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("h2 パッケージが見つからないため HTTP/1.1 で接続します。")
+        return False
+    return True
+
+
+def parse_listing(html: str) -> list[tuple[str, str]]:
+    """Extract ``(title, href)`` pairs from a proceedings listing page.
+
+    Uses precompiled lxml XPath instead of building a BeautifulSoup tree; the
+    output is identical to :func:`parse_listing_soup`, which remains the fallback
+    for documents lxml refuses to parse.
+    """
+
+    try:
+        document = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return parse_listing_soup(html)
+
+    papers: list[tuple[str, str]] = []
+    for anchor in _LISTING_ANCHORS_XPATH(document):
+        title = _clean_text("".join(_iter_strings(anchor)))
+        href = anchor.get("href")
+        if not href:
+            continue
+        papers.append((title, href))
+    return papers
+
+
+def parse_article_fields(html: str) -> tuple[str, str] | None:
+    """Extract ``(abstract, authors)`` from a paper page, or ``None`` if either node is missing.
+
+    Fast-path counterpart of :func:`parse_article_fields_soup` that only walks the
+    ``#abstract`` and ``#authors`` subtrees.
+    """
+
+    try:
+        document = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return parse_article_fields_soup(html)
+
+    abstract_nodes = _ABSTRACT_XPATH(document)
+    authors_nodes = _AUTHORS_XPATH(document)
+
+    if not abstract_nodes or not authors_nodes:
+        return None
+
+    abstract = _clean_text(_joined_text(abstract_nodes[0]))
+    authors_text = _joined_text(authors_nodes[0])
+    return abstract, _extract_authors(authors_text)
+
+
+def parse_listing_soup(html: str) -> list[tuple[str, str]]:
+    """Reference BeautifulSoup implementation of :func:`parse_listing`."""
+
+    soup = BeautifulSoup(html, "lxml")
+    anchors = soup.select("dt.ptitle > a")
+    papers: list[tuple[str, str]] = []
+    for anchor in anchors:
+        title = _clean_text(anchor.text)
+        href = anchor.get("href")
+        if not href:
+            continue
+        papers.append((title, href))
+    return papers
+
+
+def parse_article_fields_soup(html: str) -> tuple[str, str] | None:
+    """Reference BeautifulSoup implementation of :func:`parse_article_fields`."""
+
+    soup = BeautifulSoup(html, "lxml")
+
+    abstract_node = soup.select_one("#abstract")
+    authors_node = soup.select_one("#authors")
+
+    if not abstract_node or not authors_node:
+        return None
+
+    abstract = _clean_text(abstract_node.get_text(" ", strip=True))
+    authors_text = authors_node.get_text(" ", strip=True)
+    return abstract, _extract_authors(authors_text)
+
+
+def _iter_strings(node: etree._Element) -> Iterator[str]:
+    """Yield text in document order the way BeautifulSoup's ``get_text`` sees it.
+
+    Comments and processing instructions contribute only their tail, and the
+    contents of script/style/template elements are skipped.
+    """
+
+    if not isinstance(node.tag, str) or node.tag in _NON_TEXT_TAGS:
+        return
+    if node.text:
+        yield node.text
+    for child in node:
+        yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _joined_text(node: etree._Element) -> str:
+    """Equivalent of BeautifulSoup's ``get_text(" ", strip=True)``."""
+
+    return " ".join(piece for piece in (text.strip() for text in _iter_strings(node)) if piece)
+
+
+def _build_article(
+    fields: tuple[str, str] | None,
+    url: str,
+    title: str,
+    year: int,
+) -> Article | None:
+    if fields is None:
+        return None
+
+    abstract, authors = fields
+    if not abstract:
+        logger.debug("抽出された abstract が空のためスキップ: {url}", url=url)
+        return None
+
+    return Article(
+        title=title,
+        authors=authors,
+        year=str(year),
+        url=url,
+        abstract=abstract,
+    )
 
 
 def _clean_text(value: str) -> str:
@@ -216,7 +751,7 @@ def _extract_authors(raw_text: str) -> str:
     return authors
 
 
-def _normalize_title(title: str) -> str:
+def normalize_title(title: str) -> str:
     cleaned = _clean_text(title).lower()
     cleaned = re.sub(r"[^a-z0-9]+", " ", cleaned)
     return cleaned.strip()
@@ -0,0 +1,130 @@
+"""Near-duplicate detection over abstract embeddings."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from models import Article
+
+DEFAULT_THRESHOLD = 0.98
+DEFAULT_BLOCK_SIZE = 1024
+
+
+@dataclass(slots=True, frozen=True)
+class DuplicateMatch:
+    """An article dropped as a duplicate of an earlier one."""
+
+    title: str
+    url: str
+    matched_url: str
+    reason: str
+    score: float = 1.0
+
+    def as_dict(self) -> dict[str, str | float]:
+        return {
+            "title": self.title,
+            "url": self.url,
+            "matched_url": self.matched_url,
+            "reason": self.reason,
+            "score": round(self.score, 6),
+        }
+
+
+class NearDuplicateIndex:
+    """Incremental cosine-similarity dedup over L2-normalized embeddings.
+
+    Kept vectors are stored as float32 blocks and every comparison is a
+    ``block_size x block_size`` matrix product, so memory
+    stays O(n * dim) instead of materializing the O(n²) similarity matrix.
+    Articles are compared only against earlier ones; the first occurrence wins.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self._threshold = threshold
+        self._block_size = block_size
+        self._chunks: list[np.ndarray] = []
+        self._urls: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def filter(self, articles: Sequence[Article]) -> tuple[list[Article], list[DuplicateMatch]]:
+        """Split ``articles`` into ``(kept, duplicates)`` and remember the kept ones.
+
+        Articles without an embedding are passed through unchanged.
+        """
+
+        kept: list[Article] = []
+        duplicates: list[DuplicateMatch] = []
+        embedded = [article for article in articles if article.abstract_embedding is not None]
+        for start in range(0, len(embedded), self._block_size):
+            block = embedded[start : start + self._block_size]
+            vectors = _normalize(
+                np.asarray([article.abstract_embedding for article in block], dtype=np.float32)
+            )
+            best_score, best_url = self._best_matches(vectors)
+            # ブロック内は先に保持した記事とだけ比較する (最初の出現を残す)
+            within = vectors @ vectors.T
+            kept_rows: list[int] = []
+            for row, article in enumerate(block):
+                score, url = float(best_score[row]), best_url[row]
+                if kept_rows:
+                    earlier = within[row, kept_rows]
+                    position = int(earlier.argmax())
+                    if earlier[position] > score:
+                        score = float(earlier[position])
+                        url = str(block[kept_rows[position]].url)
+                if url is not None and score >= self._threshold:
+                    duplicates.append(
+                        DuplicateMatch(
+                            title=article.title,
+                            url=str(article.url),
+                            matched_url=url,
+                            reason="embedding",
+                            score=score,
+                        )
+                    )
+                    continue
+                kept_rows.append(row)
+                kept.append(article)
+
+            if kept_rows:
+                self._chunks.append(vectors[kept_rows])
+                self._urls.extend(str(block[row].url) for row in kept_rows)
+
+        kept.extend(article for article in articles if article.abstract_embedding is None)
+        return kept, duplicates
+
+    def _best_matches(self, vectors: np.ndarray) -> tuple[np.ndarray, list[str | None]]:
+        """Return each row's highest similarity to a stored vector and that vector's URL."""
+
+        best_score = np.full(len(vectors), -np.inf, dtype=np.float32)
+        best_url: list[str | None] = [None] * len(vectors)
+        offset = 0
+        for chunk in self._chunks:
+            for start in range(0, len(chunk), self._block_size):
+                scores = vectors @ chunk[start : start + self._block_size].T
+                columns = scores.argmax(axis=1)
+                maxima = scores[np.arange(len(columns)), columns]
+                for row in np.flatnonzero(maxima > best_score):
+                    best_score[row] = maxima[row]
+                    best_url[row] = self._urls[offset + start + int(columns[row])]
+            offset += len(chunk)
+        return best_score, best_url
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
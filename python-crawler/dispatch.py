@@ -0,0 +1,102 @@
+"""Bounded, limit-aware work dispatch for the crawler's fetch workers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+_KeyT = TypeVar("_KeyT", bound=Hashable)
+_ItemT = TypeVar("_ItemT")
+
+
+class WorkDispatcher(Generic[_KeyT, _ItemT]):
+    """Round-robin work queue across keys (e.g. crawl sources) with an optional per-key cap.
+
+    Producers :meth:`add` items per key and call :meth:`close_producer` once each;
+    a fixed pool of workers takes items with :meth:`next` and reports every item
+    back with :meth:`done`. With ``limit`` set, an item is handed out only while
+    ``accepted + in_flight < limit`` for its key, so no work is started that could
+    only be thrown away, and a key's backlog is dropped once it reaches the limit.
+    """
+
+    def __init__(self, producers: int, limit: int | None = None) -> None:
+        self._open_producers = producers
+        self._limit = limit
+        self._queues: dict[_KeyT, deque[_ItemT]] = {}
+        self._in_flight: Counter[_KeyT] = Counter()
+        self._accepted: Counter[_KeyT] = Counter()
+        self._exhausted: set[_KeyT] = set()
+        self._changed = asyncio.Condition()
+        self.max_depth = 0
+        self.dispatched = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of queued items that may still be handed out."""
+
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    def is_exhausted(self, key: _KeyT) -> bool:
+        return key in self._exhausted
+
+    async def add(self, key: _KeyT, items: Iterable[_ItemT]) -> None:
+        async with self._changed:
+            if key in self._exhausted:
+                return
+            self._queues.setdefault(key, deque()).extend(items)
+            self.max_depth = max(self.max_depth, self.depth)
+            self._changed.notify_all()
+
+    async def close_producer(self) -> None:
+        async with self._changed:
+            self._open_producers -= 1
+            self._changed.notify_all()
+
+    async def next(self) -> tuple[_KeyT, _ItemT] | None:
+        """Wait for the next eligible item; ``None`` means no more work will appear."""
+
+        async with self._changed:
+            while True:
+                item = self._take()
+                if item is not None:
+                    return item
+                if not self._open_producers and not self.depth:
+                    return None
+                # 残りの項目が上限待ちなら、処理中の結果が返るまで待つ
+                await self._changed.wait()
+
+    async def done(self, key: _KeyT, accepted: bool) -> bool:
+        """Record the outcome of one item; returns ``True`` when ``key`` just hit its limit."""
+
+        async with self._changed:
+            self._in_flight[key] -= 1
+            reached = False
+            if accepted:
+                self._accepted[key] += 1
+                if self._limit and self._accepted[key] >= self._limit:
+                    reached = key not in self._exhausted
+                    self._exhausted.add(key)
+                    self.dropped += len(self._queues.pop(key, ()))
+            self._changed.notify_all()
+            return reached
+
+    def _take(self) -> tuple[_KeyT, _ItemT] | None:
+        for key, queue in self._queues.items():
+            if not queue:
+                continue
+            if self._limit and self._accepted[key] + self._in_flight[key] >= self._limit:
+                continue
+            item = queue.popleft()
+            self._in_flight[key] += 1
+            self.dispatched += 1
+            # 取り出したキーを末尾に回し、ソース間で交互に配る
+            self._queues[key] = self._queues.pop(key)
+            return key, item
+        return None
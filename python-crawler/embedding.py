@@ -3,18 +3,56 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Sequence
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from pathlib import Path
-import torch
+from typing import TYPE_CHECKING
+
 import numpy as np
 from loguru import logger
-from sentence_transformers import SentenceTransformer
 
+from config import EmbeddingSettings
+from embedding_cache import EmbeddingCache
+from metrics import DURATION_BUCKETS, METRICS
 from models import Article
+from onnx_backend import OnnxEncoder
+
+if TYPE_CHECKING:
+    # torch / sentence_transformers は読み込みに数秒かかるため、埋め込みを使う時点で import する
+    from sentence_transformers import SentenceTransformer
 
 
 PASSAGE_PREFIX = "passage: "
+QUERY_PREFIX = "query: "
+DEFAULT_BATCH_SIZE = 32
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+
+_MODEL_LOAD_SECONDS = METRICS.gauge(
+    "embedding_model_load_seconds",
+    "Time spent loading the embedding model.",
+)
+_ENCODE_DURATION = METRICS.histogram(
+    "embedding_batch_encode_duration_seconds",
+    "Wall time of one model.encode call (or one worker shard).",
+    buckets=DURATION_BUCKETS,
+)
+_ENCODED = METRICS.counter("embedding_encoded_total", "Texts encoded by the model.")
+_WARM_UP_SECONDS = METRICS.gauge(
+    "embedding_warm_up_seconds",
+    "Time from starting the background warm-up until the model was ready.",
+)
+_FIRST_EMBEDDING_SECONDS = METRICS.gauge(
+    "embedding_time_to_first_embedding_seconds",
+    "Time from creating the service until the first article embedding was produced.",
+)
+_FAILED = METRICS.counter("embedding_failures_total", "Articles whose embedding failed.")
+_CACHE_LOOKUPS = METRICS.counter("embedding_cache_lookups_total", "Embedding cache lookups.")
 
 
 class EmbeddingError(RuntimeError):
@@ -27,16 +65,27 @@ class EmbeddingJobResult:
 
     processed: int = 0
     failed: list[dict[str, str]] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
 
     def record_failure(self, article: Article, error: Exception) -> None:
+        _FAILED.inc()
         self.failed.append(
             {
                 "title": article.title,
-                "url": article.url,
+                "url": str(article.url),
                 "error": str(error),
             }
         )
 
+    def merge(self, other: EmbeddingJobResult) -> None:
+        """Accumulate counters from another (partial) job result."""
+
+        self.processed += other.processed
+        self.failed.extend(other.failed)
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
     def dump_failures(self, path: Path) -> None:
         if not self.failed:
             return
@@ -54,8 +103,22 @@ MODEL_ALIASES = {
 class EmbeddingService:
     """Handles multilingual-e5-large embedding generation."""
 
-    def __init__(self, model_name: str) -> None:
-        self.device = "cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu"
+    def __init__(
+        self,
+        model_name: str,
+        cache: EmbeddingCache | None = None,
+        backend: str = "torch",
+        onnx_dir: Path | None = None,
+        onnx_quantize: bool = False,
+        workers: int = 1,
+        num_threads: int | None = None,
+    ) -> None:
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"unknown embedding backend: {backend}")
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        if num_threads is not None and num_threads <= 0:
+            raise ValueError("num_threads must be positive")
         self._model_name = MODEL_ALIASES.get(model_name, model_name)
         if self._model_name != model_name:
             logger.warning(
@@ -63,57 +126,454 @@ class EmbeddingService:
                 original=model_name,
                 resolved=self._model_name,
             )
-        self._model: SentenceTransformer | None = None
+        self._model: SentenceTransformer | OnnxEncoder | None = None
+        self._model_lock = threading.Lock()
+        self._warm_up_thread: threading.Thread | None = None
+        self._device: str | None = None
+        self._created_at = time.perf_counter()
+        self._first_embedding_recorded = False
+        self._cache = cache
+        self._backend = backend
+        self._onnx_dir = onnx_dir or Path("onnx_models") / self._model_name.replace("/", "--")
+        self._onnx_quantize = onnx_quantize
+        self._workers = workers
+        if num_threads is None and workers > 1:
+            # 指定が無いと各ワーカーが全コア分のスレッドを立てて奪い合うため、コアを等分する
+            num_threads = max(1, (os.cpu_count() or 1) // workers)
+        self._num_threads = num_threads
+        self._pool: ProcessPoolExecutor | None = None
+        # int8 量子化したベクトルは fp32 と一致しないため、キャッシュの名前空間を分ける
+        self._cache_namespace = (
+            f"{self._model_name}@onnx-int8"
+            if backend == "onnx" and onnx_quantize
+            else self._model_name
+        )
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def device(self) -> str:
+        if self._device is None:
+            self._device = _detect_device() if self._backend == "torch" else "cpu"
+        return self._device
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: EmbeddingSettings,
+        cache: EmbeddingCache | None = None,
+        workers: int = 1,
+        num_threads: int | None = None,
+    ) -> EmbeddingService:
+        return cls(
+            model_name=settings.embedding_model_name,
+            cache=cache,
+            backend=settings.embedding_backend,
+            onnx_dir=Path(settings.embedding_onnx_dir) if settings.embedding_onnx_dir else None,
+            onnx_quantize=settings.embedding_onnx_quantize,
+            workers=workers,
+            num_threads=num_threads,
+        )
 
-    def _load_model(self) -> SentenceTransformer:
-        if self._model is None:
-            logger.info("SentenceTransformer モデルを読み込みます: {model}", model=self._model_name)
-            self._model = SentenceTransformer(self._model_name, device=self.device)
+    def close(self) -> None:
+        """Shut down the worker processes used for sharded embedding."""
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _load_model(self) -> SentenceTransformer | OnnxEncoder:
+        # バックグラウンドのウォームアップと同時に呼ばれた場合は、読み込み完了を待って共有する
+        with self._model_lock:
+            if self._model is None:
+                self._model = self._create_model()
         return self._model
 
+    def _create_model(self) -> SentenceTransformer | OnnxEncoder:
+        started = time.perf_counter()
+        if self._backend == "onnx":
+            logger.info(
+                "ONNX Runtime バックエンドを使用します: {model} (quantize={quantize})",
+                model=self._model_name,
+                quantize=self._onnx_quantize,
+            )
+            model: SentenceTransformer | OnnxEncoder = OnnxEncoder.load(
+                self._model_name,
+                self._onnx_dir,
+                quantize=self._onnx_quantize,
+                intra_op_threads=self._num_threads,
+            )
+        else:
+            logger.info(
+                "SentenceTransformer モデルを読み込みます: {model}",
+                model=self._model_name,
+            )
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            if self._num_threads is not None:
+                torch.set_num_threads(self._num_threads)
+            model = SentenceTransformer(self._model_name, device=self.device)
+        _MODEL_LOAD_SECONDS.set(time.perf_counter() - started, backend=self._backend)
+        return model
+
     def embed_articles(
         self,
         articles: Sequence[Article],
         failure_log: Path | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
     ) -> EmbeddingJobResult:
-        model = self._load_model()
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+
         result = EmbeddingJobResult()
 
         if not articles:
             return result
 
-        for index, article in enumerate(articles, start=1):
-            text = f"{PASSAGE_PREFIX}{article.abstract}"
+        store = _VectorStore(articles)
+        pending = self._apply_cache(articles, result, store)
+        if self._workers > 1 and len(pending) > 1:
+            self._embed_sharded(articles, pending, batch_size, result, store)
+        elif pending:
+            model = self._load_model()
+            texts = {index: f"{PASSAGE_PREFIX}{articles[index].abstract}" for index in pending}
+            # 長さの近いテキストを同じバッチにまとめ、パディングによる無駄な計算を減らす
+            lengths = dict(zip(pending, _token_lengths(model, list(texts.values())), strict=True))
+            order = sorted(pending, key=lengths.__getitem__)
+
+            for start in range(0, len(order), batch_size):
+                indices = order[start : start + batch_size]
+                self._encode_batch(model, articles, texts, indices, result, store)
+
+        if failure_log:
+            result.dump_failures(failure_log)
+
+        return result
+
+    def warm_up(self) -> None:
+        """Load the model and run one tiny forward pass so the first real call is fast."""
+
+        if self._workers > 1:
+            # シャード時は各ワーカーがモデルを持つため、プロセスの起動と読み込みを先に済ませる
+            pool = self._worker_pool()
+            for future in [pool.submit(_worker_ready) for _ in range(self._workers)]:
+                future.result()
+            return
+        self.embed_queries(["warm up"])
+
+    def start_warm_up(self) -> threading.Thread:
+        """Run :meth:`warm_up` in a background thread so model loading overlaps the crawl.
+
+        Failures are only logged; the next embedding call loads the model again.
+        """
+
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(
+                target=self._background_warm_up,
+                name="embedding-warm-up",
+                daemon=True,
+            )
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def _background_warm_up(self) -> None:
+        started = time.perf_counter()
+        try:
+            self.warm_up()
+        except Exception as exc:
+            logger.warning("埋め込みモデルのウォームアップに失敗しました: {}", exc)
+            return
+        elapsed = time.perf_counter() - started
+        _WARM_UP_SECONDS.set(elapsed, backend=self._backend)
+        logger.info("埋め込みモデルの準備が完了しました ({elapsed:.1f}s)", elapsed=elapsed)
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Encode search queries with the e5 ``query:`` prefix into a float32 matrix."""
+
+        model = self._load_model()
+        embeddings = model.encode(
+            [f"{QUERY_PREFIX}{query}" for query in queries],
+            batch_size=max(len(queries), 1),
+            normalize_embeddings=True,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(queries), -1)
+
+    def _embed_sharded(
+        self,
+        articles: Sequence[Article],
+        pending: Sequence[int],
+        batch_size: int,
+        result: EmbeddingJobResult,
+        store: _VectorStore,
+    ) -> None:
+        """Split pending articles across worker processes and gather vectors in input order."""
+
+        pool = self._worker_pool()
+        # 文字数順に並べてからラウンドロビンで配り、各シャードの計算量を揃える
+        order = sorted(pending, key=lambda index: len(articles[index].abstract))
+        shards = [order[worker :: self._workers] for worker in range(self._workers)]
+        futures: dict[Future[tuple[list[np.ndarray | None], EmbeddingJobResult, float]], int] = {
+            pool.submit(_embed_shard, [articles[index] for index in shard], batch_size): number
+            for number, shard in enumerate(shards)
+            if shard
+        }
+
+        broken = False
+        for future in as_completed(futures):
+            number = futures[future]
+            shard = shards[number]
             try:
-                embedding = model.encode(
-                    text,
-                    batch_size=1,
-                    normalize_embeddings=True,
-                    show_progress_bar=False,
-                    convert_to_numpy=True,
-                )
-            except Exception as exc:  # pragma: no cover - third party library errors
+                vectors, shard_result, seconds = future.result()
+            except Exception as exc:
+                broken = True
                 logger.error(
-                    "埋め込み生成に失敗しました: index={index} error={error}",
-                    index=index,
+                    "埋め込みシャード {shard} の処理に失敗しました: size={size} error={error}",
+                    shard=number,
+                    size=len(shard),
                     error=exc,
                 )
-                result.record_failure(article, exc)
+                for index in shard:
+                    result.record_failure(articles[index], EmbeddingError(f"shard {number}: {exc}"))
                 continue
 
-            if not isinstance(embedding, np.ndarray):
+            # ワーカー内のメトリクスは別プロセスに残るため、親プロセス側で集計する
+            _ENCODE_DURATION.observe(seconds, mode="shard")
+            _ENCODED.inc(shard_result.processed)
+            self._record_first_embedding()
+            _FAILED.inc(len(shard_result.failed))
+            result.processed += shard_result.processed
+            result.failed.extend(shard_result.failed)
+            encoded = [
+                (index, vector)
+                for index, vector in zip(shard, vectors, strict=True)
+                if vector is not None
+            ]
+            if encoded:
+                indices, rows = zip(*encoded, strict=True)
+                store.assign(indices, np.stack(rows))
+            self._store_in_cache(articles, encoded)
+
+        if broken:
+            # ワーカーが異常終了するとプールは再利用できないため、次回呼び出しで作り直す
+            self.close()
+
+    def _record_first_embedding(self) -> None:
+        if self._first_embedding_recorded:
+            return
+        self._first_embedding_recorded = True
+        _FIRST_EMBEDDING_SECONDS.set(time.perf_counter() - self._created_at, backend=self._backend)
+
+    def _worker_pool(self) -> ProcessPoolExecutor:
+        # ウォームアップ用スレッドと同時に呼ばれてもプールを二重に作らない
+        with self._model_lock:
+            if self._pool is None:
+                logger.info(
+                    "埋め込みワーカーを起動します: workers={workers} threads={threads}",
+                    workers=self._workers,
+                    threads=self._num_threads,
+                )
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    # fork だと親プロセスの torch スレッドプールを引き継いで固まることがある
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(
+                        self._model_name,
+                        self._backend,
+                        self._onnx_dir,
+                        self._onnx_quantize,
+                        self._num_threads,
+                    ),
+                )
+        return self._pool
+
+    def _store_in_cache(
+        self,
+        articles: Sequence[Article],
+        encoded: Sequence[tuple[int, np.ndarray]],
+    ) -> None:
+        if self._cache is None or not encoded:
+            return
+        self._cache.put_many(
+            self._cache_namespace,
+            PASSAGE_PREFIX,
+            [
+                (EmbeddingCache.content_hash(articles[index].abstract), embedding)
+                for index, embedding in encoded
+            ],
+        )
+
+    def _apply_cache(
+        self,
+        articles: Sequence[Article],
+        result: EmbeddingJobResult,
+        store: _VectorStore,
+    ) -> list[int]:
+        """Fill embeddings from the cache and return indices that still need encoding."""
+
+        if self._cache is None:
+            return list(range(len(articles)))
+
+        hashes = [EmbeddingCache.content_hash(article.abstract) for article in articles]
+        cached = self._cache.get_many(self._cache_namespace, PASSAGE_PREFIX, hashes)
+        pending: list[int] = []
+        hits: list[int] = []
+        for index, content_hash in enumerate(hashes):
+            (pending if content_hash not in cached else hits).append(index)
+        if hits:
+            store.assign(hits, np.stack([cached[hashes[index]] for index in hits]))
+            result.processed += len(hits)
+
+        result.cache_hits += len(articles) - len(pending)
+        result.cache_misses += len(pending)
+        _CACHE_LOOKUPS.inc(len(articles) - len(pending), result="hit")
+        _CACHE_LOOKUPS.inc(len(pending), result="miss")
+        return pending
+
+    def _encode_batch(
+        self,
+        model: SentenceTransformer | OnnxEncoder,
+        articles: Sequence[Article],
+        texts: Mapping[int, str],
+        indices: Sequence[int],
+        result: EmbeddingJobResult,
+        store: _VectorStore,
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            embeddings = model.encode(
+                [texts[index] for index in indices],
+                batch_size=len(indices),
+                normalize_embeddings=True,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+        except Exception as exc:
+            if len(indices) > 1:
+                # 失敗したバッチだけを二分割して再試行し、原因レコードを特定する
+                logger.warning(
+                    "バッチ埋め込みに失敗したため分割して再試行します: size={size} error={error}",
+                    size=len(indices),
+                    error=exc,
+                )
+                middle = len(indices) // 2
+                self._encode_batch(model, articles, texts, indices[:middle], result, store)
+                self._encode_batch(model, articles, texts, indices[middle:], result, store)
+                return
+
+            logger.error(
+                "埋め込み生成に失敗しました: index={index} error={error}",
+                index=indices[0] + 1,
+                error=exc,
+            )
+            result.record_failure(articles[indices[0]], exc)
+            return
+
+        if not isinstance(embeddings, np.ndarray) or embeddings.shape[0] != len(indices):
+            for index in indices:
                 logger.error(
                     "想定外の埋め込みフォーマットを受け取りました: index={index}",
-                    index=index,
+                    index=index + 1,
                 )
-                result.record_failure(article, EmbeddingError("invalid embedding format"))
-                continue
+                result.record_failure(articles[index], EmbeddingError("invalid embedding format"))
+            return
 
-            vector = embedding.tolist()
-            article.abstract_embedding = vector
-            result.processed += 1
+        _ENCODE_DURATION.observe(time.perf_counter() - started, mode="batch")
+        _ENCODED.inc(len(indices))
+        self._record_first_embedding()
+        store.assign(indices, embeddings)
+        result.processed += len(indices)
 
-        if failure_log:
-            result.dump_failures(failure_log)
+        self._store_in_cache(articles, list(zip(indices, embeddings, strict=True)))
 
-        return result
+
+class _VectorStore:
+    """Contiguous float32 matrix owned by one ``embed_articles`` call.
+
+    Articles receive row views into the matrix rather than their own arrays or
+    Python float lists; it is allocated once the embedding dimension is known.
+    """
+
+    def __init__(self, articles: Sequence[Article]) -> None:
+        self._articles = articles
+        self._matrix: np.ndarray | None = None
+
+    def assign(self, indices: Sequence[int], vectors: np.ndarray) -> None:
+        if self._matrix is None:
+            self._matrix = np.empty((len(self._articles), vectors.shape[1]), dtype=np.float32)
+        self._matrix[list(indices)] = vectors
+        for index in indices:
+            self._articles[index].abstract_embedding = self._matrix[index]
+
+
+_WORKER_SERVICE: EmbeddingService | None = None
+
+
+def _init_worker(
+    model_name: str,
+    backend: str,
+    onnx_dir: Path,
+    onnx_quantize: bool,
+    num_threads: int | None,
+) -> None:
+    """Load the model once per worker process with a pinned thread count."""
+
+    global _WORKER_SERVICE
+    _WORKER_SERVICE = EmbeddingService(
+        model_name,
+        backend=backend,
+        onnx_dir=onnx_dir,
+        onnx_quantize=onnx_quantize,
+        num_threads=num_threads,
+    )
+    _WORKER_SERVICE._load_model()
+
+
+def _worker_ready() -> bool:
+    return _WORKER_SERVICE is not None
+
+
+def _embed_shard(
+    articles: list[Article],
+    batch_size: int,
+) -> tuple[list[np.ndarray | None], EmbeddingJobResult, float]:
+    if _WORKER_SERVICE is None:  # pragma: no cover - initializer always runs first
+        raise EmbeddingError("embedding worker is not initialized")
+    # 親側で測ると全シャードの開始からの経過時間になるため、ワーカー内で計測する
+    started = time.perf_counter()
+    shard_result = _WORKER_SERVICE.embed_articles(articles, batch_size=batch_size)
+    seconds = time.perf_counter() - started
+    # list[float] のまま返すと pickle が重いため、float32 配列にして親へ戻す
+    vectors = [
+        np.asarray(article.abstract_embedding, dtype=np.float32)
+        if article.abstract_embedding is not None
+        else None
+        for article in articles
+    ]
+    return vectors, shard_result, seconds
+
+
+def _detect_device() -> str:
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _token_lengths(model: SentenceTransformer | OnnxEncoder, texts: Sequence[str]) -> list[int]:
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return [len(text) for text in texts]
+    try:
+        encoded = tokenizer(list(texts), add_special_tokens=False, verbose=False)
+    except Exception:  # pragma: no cover - fall back to character length
+        return [len(text) for text in texts]
+    return [len(ids) for ids in encoded["input_ids"]]
@@ -0,0 +1,133 @@
+"""Persistent content-addressed cache for abstract embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+DEFAULT_MAX_ENTRIES = 200_000
+_SQLITE_MAX_VARIABLES = 500
+
+_SCHEMA = """
+create table if not exists embeddings (
+    model text not null,
+    prefix text not null,
+    content_hash text not null,
+    dim integer not null,
+    vector blob not null,
+    last_used integer not null,
+    primary key (model, prefix, content_hash)
+);
+create index if not exists embeddings_last_used_idx on embeddings (last_used);
+"""
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding store keyed by ``(model, prefix, sha256(text))``.
+
+    Vectors are stored as raw float32 blobs. Every lookup refreshes ``last_used``,
+    and once the table grows past ``max_entries`` the least recently used rows
+    are evicted.
+    """
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._path = path
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("pragma journal_mode=wal")
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(
+        self,
+        model: str,
+        prefix: str,
+        hashes: Sequence[str],
+    ) -> dict[str, np.ndarray]:
+        """Return cached vectors for the given content hashes, refreshing their recency."""
+
+        found: dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _SQLITE_MAX_VARIABLES):
+                chunk = unique[start : start + _SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "select content_hash, dim, vector from embeddings "
+                    f"where model = ? and prefix = ? and content_hash in ({placeholders})",
+                    (model, prefix, *chunk),
+                ).fetchall()
+                for content_hash, dim, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if vector.shape[0] == dim:
+                        found[content_hash] = vector
+
+            if found:
+                now = time.time_ns()
+                self._conn.executemany(
+                    "update embeddings set last_used = ? "
+                    "where model = ? and prefix = ? and content_hash = ?",
+                    [(now, model, prefix, content_hash) for content_hash in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(
+        self,
+        model: str,
+        prefix: str,
+        items: Iterable[tuple[str, np.ndarray]],
+    ) -> None:
+        """Store vectors and evict the least recently used rows beyond the size cap."""
+
+        now = time.time_ns()
+        rows = []
+        for content_hash, vector in items:
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((model, prefix, content_hash, array.shape[0], array.tobytes(), now))
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "insert or replace into embeddings "
+                "(model, prefix, content_hash, dim, vector, last_used) values (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("select count(*) from embeddings").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("select count(*) from embeddings").fetchone()
+        overflow = count - self._max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "delete from embeddings where rowid in "
+            "(select rowid from embeddings order by last_used asc limit ?)",
+            (overflow,),
+        )
+        logger.debug("Embedding キャッシュから {count} 件を削除しました。", count=overflow)
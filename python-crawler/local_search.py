@@ -0,0 +1,632 @@
+"""Offline hybrid search over a local copy of the Articles table.
+
+Follows ``public.search_articles``: the score is
+``alpha * ts_rank(ft, plainto_tsquery('simple', query_text))
++ (1 - alpha) * (1 - cosine_distance(abstract_embedding, query_embedding))``,
+and rows are eligible when they match every query term or when a vector query
+with a positive vector weight is given. ``ts_rank`` is reimplemented from
+Postgres (``calc_rank_or`` for one query term, ``calc_rank_and`` for several),
+so scores agree as long as :func:`tokenize` splits text the way the ``simple``
+configuration does. It covers words, hyphenated compounds and dotted tokens
+such as ``1.5`` or ``e.g``; URLs, e-mail addresses, file paths and similar
+token types of the default parser are split into plain words instead, which
+can shift the rank of rows containing them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+from loguru import logger
+
+from models import Article
+
+DEFAULT_ALPHA = 0.5
+DEFAULT_MATCH_COUNT = 20
+ANN_BACKENDS = ("exact", "ivf", "hnsw")
+DEFAULT_IVF_PROBES = 8
+DEFAULT_ANN_CANDIDATES = 200
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_EF_CONSTRUCTION = 200
+INDEX_FORMAT_VERSION = 1
+
+# ts_rank の既定重み: title は 'A' (1.0)、abstract は 'B' (0.4)
+TITLE_WEIGHT = 1.0
+ABSTRACT_WEIGHT = 0.4
+# Postgres は 1 つの語彙素につき 256 個までしか位置を保持しない
+_MAX_POSITIONS = 256
+_ZETA_2 = 1.64493406685
+_POSITION_DECAY = 1.0 / np.arange(1, _MAX_POSITIONS + 1, dtype=np.float64) ** 2
+# ts_rank の calc_rank_and: 異なる語の出現位置の距離で重みを減衰させる
+_MAX_WORD_DISTANCE = 100
+_MIN_RANK = 1e-20
+# 英数字の並びを "-" や "." でつないだものを 1 トークンとして拾い、複合語は後で分解する
+_TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[.-][^\W_]+)*")
+
+
+class LocalSearchError(RuntimeError):
+    """Raised when a local search index cannot be built, loaded or queried."""
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """One row of ``search_articles`` output."""
+
+    id: str | None
+    title: str
+    authors: str
+    year: str
+    url: str
+    abstract: str
+    score: float
+
+
+def tokenize(text: str) -> list[str]:
+    """Lexemes of ``to_tsvector('simple', text)`` in position order (see the module notes).
+
+    A hyphenated compound yields the compound followed by its parts
+    (``self-supervised self supervised``), and a hyphen before digits starts a
+    signed number (``resnet -50``), as in the Postgres default parser.
+    """
+
+    tokens: list[str] = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if "-" not in token:
+            tokens.append(token)
+            continue
+        run: list[str] = []
+        for index, part in enumerate(token.split("-")):
+            if index and part.isdigit():
+                tokens.extend(_compound(run))
+                tokens.append(f"-{part}")
+                run = []
+            else:
+                run.append(part)
+        tokens.extend(_compound(run))
+    return tokens
+
+
+def _compound(parts: list[str]) -> list[str]:
+    if len(parts) <= 1:
+        return parts
+    return ["-".join(parts), *parts]
+
+
+def term_rank(title_count: int, abstract_count: int) -> float:
+    """Contribution of one lexeme to ``ts_rank`` (Postgres ``calc_rank_or``).
+
+    Positions are ordered title first, so the best-weighted occurrence is always
+    the first one and ``(wjm + resj - wjm / (jm + 1) ** 2)`` reduces to ``resj``.
+    """
+
+    title_count = min(title_count, _MAX_POSITIONS)
+    abstract_count = min(abstract_count, _MAX_POSITIONS - title_count)
+    decay = _POSITION_DECAY[: title_count + abstract_count]
+    resj = TITLE_WEIGHT * decay[:title_count].sum() + ABSTRACT_WEIGHT * decay[title_count:].sum()
+    return float(resj / _ZETA_2)
+
+
+def and_rank(occurrences: Sequence[tuple[np.ndarray, np.ndarray]]) -> float:
+    """``ts_rank`` of a multi-term ``plainto_tsquery`` (Postgres ``calc_rank_and``).
+
+    ``occurrences`` holds ``(positions, weights)`` of each query term found in
+    the document. Every pair of positions of two different terms contributes
+    ``sqrt(w1 * w2 * word_distance(|p1 - p2|))`` and the contributions combine
+    as ``1 - prod(1 - c)``; a document with fewer than two of the terms gets
+    the ``1e-20`` floor.
+    """
+
+    keep = 1.0
+    for i in range(1, len(occurrences)):
+        positions, weights = occurrences[i]
+        for other_positions, other_weights in occurrences[:i]:
+            distance = np.abs(positions[:, None] - other_positions[None, :])
+            closeness = np.where(
+                distance > _MAX_WORD_DISTANCE,
+                1e-30,
+                1.0 / (1.005 + 0.05 * np.exp(distance / 1.5 - 2)),
+            )
+            contribution = np.sqrt(weights[:, None] * other_weights[None, :] * closeness)
+            keep *= float(np.prod(1.0 - contribution))
+    rank = 1.0 - keep
+    return rank if rank > 0 else _MIN_RANK
+
+
+class TextIndex:
+    """Inverted index of ``term -> (doc ids, per-doc rank contribution, positions)``.
+
+    Positions follow ``ft``: title lexemes first, abstract lexemes shifted past
+    the last title position, at most 256 per lexeme.
+    """
+
+    def __init__(self, titles: Sequence[str], abstracts: Sequence[str]) -> None:
+        postings: dict[str, tuple[list[int], list[float], list[list[int]]]] = {}
+        title_lengths: list[int] = []
+        for doc_id, (title, abstract) in enumerate(zip(titles, abstracts, strict=True)):
+            title_tokens = tokenize(title)
+            positions: dict[str, list[int]] = {}
+            for position, token in enumerate([*title_tokens, *tokenize(abstract)], start=1):
+                positions.setdefault(token, []).append(position)
+            title_lengths.append(len(title_tokens))
+            for term, term_positions in positions.items():
+                term_positions = term_positions[:_MAX_POSITIONS]
+                title_count = sum(position <= len(title_tokens) for position in term_positions)
+                ids, ranks, doc_positions = postings.setdefault(term, ([], [], []))
+                ids.append(doc_id)
+                ranks.append(term_rank(title_count, len(term_positions) - title_count))
+                doc_positions.append(term_positions)
+
+        self._title_lengths = np.asarray(title_lengths, dtype=np.int64)
+        self._postings = {
+            term: (np.asarray(ids, dtype=np.int64), np.asarray(ranks, dtype=np.float32))
+            for term, (ids, ranks, _) in postings.items()
+        }
+        # 出現位置は語ごとに 1 本の配列へ連結し、offsets で文書ごとに区切る
+        self._positions = {
+            term: (
+                np.asarray([position for doc in doc_positions for position in doc], dtype=np.int64),
+                np.concatenate(([0], np.cumsum([len(doc) for doc in doc_positions]))),
+            )
+            for term, (_, _, doc_positions) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def lookup(self, terms: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(doc_ids, ranks, matched)`` for docs containing any of the distinct ``terms``.
+
+        ``ranks`` is ``ts_rank``: the ``calc_rank_or`` contribution for a single
+        term, :func:`and_rank` for several. ``matched`` flags docs that contain
+        every term (``ft @@ query``).
+        """
+
+        empty = np.empty(0, dtype=np.int64)
+        if not terms:
+            return empty, np.empty(0, dtype=np.float32), np.empty(0, dtype=bool)
+
+        present = [term for term in terms if term in self._postings]
+        if not present:
+            return empty, np.empty(0, dtype=np.float32), np.empty(0, dtype=bool)
+
+        all_ids = np.concatenate([self._postings[term][0] for term in present])
+        doc_ids, inverse = np.unique(all_ids, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(doc_ids))
+        matched = counts == len(terms)
+        if len(terms) == 1:
+            return doc_ids, self._postings[terms[0]][1], matched
+
+        # plainto_tsquery は複数語を AND でつなぐので、2 語以上を含む文書だけ距離で順位付けする
+        ranks = np.full(len(doc_ids), _MIN_RANK, dtype=np.float32)
+        for row in np.flatnonzero(counts >= 2):
+            ranks[row] = and_rank(self._occurrences(int(doc_ids[row]), present))
+        return doc_ids, ranks, matched
+
+    def _occurrences(
+        self,
+        doc_id: int,
+        terms: Sequence[str],
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        occurrences = []
+        for term in terms:
+            ids = self._postings[term][0]
+            slot = int(np.searchsorted(ids, doc_id))
+            if slot == len(ids) or ids[slot] != doc_id:
+                continue
+            positions, offsets = self._positions[term]
+            doc_positions = positions[offsets[slot] : offsets[slot + 1]]
+            weights = np.where(
+                doc_positions <= self._title_lengths[doc_id], TITLE_WEIGHT, ABSTRACT_WEIGHT
+            )
+            occurrences.append((doc_positions, weights))
+        return occurrences
+
+
+class VectorIndex(Protocol):
+    def search(self, query: np.ndarray, count: int) -> np.ndarray:
+        """Return ids of (approximately) the ``count`` most similar rows."""
+
+
+class IvfIndex:
+    """Inverted-file index: spherical k-means lists probed by centroid similarity."""
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        n_lists: int | None = None,
+        n_probe: int = DEFAULT_IVF_PROBES,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        if n_probe <= 0:
+            raise ValueError("n_probe must be positive")
+        self._matrix = matrix
+        n_lists = n_lists or max(int(np.sqrt(len(matrix))), 1)
+        n_lists = min(n_lists, len(matrix))
+        self.n_probe = n_probe
+
+        rng = np.random.default_rng(seed)
+        centroids = matrix[rng.choice(len(matrix), size=n_lists, replace=False)].copy()
+        assignment = np.zeros(len(matrix), dtype=np.int64)
+        for _ in range(iterations):
+            assignment = np.argmax(matrix @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=n_lists)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            nonempty = counts > 0
+            sums = np.zeros_like(centroids)
+            sums[nonempty] = np.add.reduceat(matrix[order], starts[nonempty], axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # 空になったリストは前回のセントロイドを使い続ける
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        self._centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+
+        # リストごとの行 ID を 1 本の配列に連続して並べ、offsets で区切る
+        self._order = np.argsort(assignment, kind="stable")
+        self._offsets = np.searchsorted(assignment[self._order], np.arange(n_lists + 1))
+
+    def search(self, query: np.ndarray, count: int) -> np.ndarray:
+        probes = min(self.n_probe, len(self._centroids))
+        lists = _top_indices(self._centroids @ query, probes)
+        candidates = np.concatenate(
+            [self._order[self._offsets[i] : self._offsets[i + 1]] for i in lists]
+        )
+        if len(candidates) == 0:
+            return candidates
+        scores = self._matrix[candidates] @ query
+        return candidates[_top_indices(scores, count)]
+
+
+class HnswIndex:
+    """HNSW graph index backed by ``hnswlib`` (optional ``search`` extra)."""
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        m: int = DEFAULT_HNSW_M,
+        ef_construction: int = DEFAULT_HNSW_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_ANN_CANDIDATES,
+    ) -> None:
+        hnswlib = _import_hnswlib()
+        self._index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        self._index.init_index(max_elements=len(matrix), M=m, ef_construction=ef_construction)
+        self._index.add_items(matrix, np.arange(len(matrix)))
+        self._ef_search = ef_search
+        self._size = len(matrix)
+
+    def search(self, query: np.ndarray, count: int) -> np.ndarray:
+        count = min(count, self._size)
+        # ef は返す件数以上でないと hnswlib がエラーになる
+        self._index.set_ef(max(count, self._ef_search))
+        labels, _ = self._index.knn_query(query, k=count)
+        return labels[0].astype(np.int64)
+
+
+class LocalSearchIndex:
+    """In-memory copy of the Articles table with vector and full-text indexes."""
+
+    def __init__(
+        self,
+        records: Sequence[dict[str, Any]],
+        matrix: np.ndarray,
+        has_embedding: np.ndarray,
+        model_name: str | None = None,
+    ) -> None:
+        if matrix.shape[0] != len(records) or has_embedding.shape[0] != len(records):
+            raise LocalSearchError("records and embedding matrix have different lengths")
+        self._records = list(records)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.has_embedding = has_embedding.astype(bool)
+        self.model_name = model_name
+        self._text = TextIndex(
+            [record["title"] for record in self._records],
+            [record["abstract"] for record in self._records],
+        )
+        self._ann: VectorIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @classmethod
+    def from_articles(
+        cls,
+        articles: Iterable[Article],
+        model_name: str | None = None,
+    ) -> LocalSearchIndex:
+        records: list[dict[str, Any]] = []
+        vectors: list[Sequence[float] | None] = []
+        for article in articles:
+            records.append(
+                {
+                    "id": str(article.id) if article.id else None,
+                    "title": article.title,
+                    "authors": article.authors,
+                    "year": article.year,
+                    "url": str(article.url),
+                    "abstract": article.abstract,
+                }
+            )
+            vectors.append(article.abstract_embedding)
+
+        dimension = next((len(vector) for vector in vectors if vector is not None), 0)
+        matrix = np.zeros((len(records), dimension), dtype=np.float32)
+        has_embedding = np.zeros(len(records), dtype=bool)
+        for row, vector in enumerate(vectors):
+            if vector is None or not len(vector):
+                continue
+            if len(vector) != dimension:
+                raise LocalSearchError(
+                    f"embedding dimension mismatch: {records[row]['url']} has {len(vector)}"
+                )
+            matrix[row] = vector
+            has_embedding[row] = True
+
+        # pgvector の <=> は正規化前のベクトルでもコサイン距離なので、
+        # 行を単位長に揃えて内積で計算する
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return cls(records, matrix, has_embedding, model_name=model_name)
+
+    @classmethod
+    def load(cls, path: Path) -> LocalSearchIndex:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != INDEX_FORMAT_VERSION:
+                raise LocalSearchError(f"unsupported index format: {meta.get('version')}")
+            index = cls(
+                meta["records"],
+                data["matrix"],
+                data["has_embedding"],
+                model_name=meta.get("model_name"),
+            )
+        logger.info(
+            "ローカル検索インデックスを読み込みました: {path} rows={rows}",
+            path=path,
+            rows=len(index),
+        )
+        return index
+
+    def save(self, path: Path) -> None:
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "model_name": self.model_name,
+            "records": self._records,
+        }
+        np.savez(
+            path,
+            matrix=self.matrix,
+            has_embedding=self.has_embedding,
+            meta=np.asarray(json.dumps(meta, ensure_ascii=False)),
+        )
+        logger.info(
+            "ローカル検索インデックスを保存しました: {path} rows={rows}",
+            path=path,
+            rows=len(self),
+        )
+
+    def build_ann(self, backend: str, **options: Any) -> None:
+        """Attach an approximate vector index (``exact`` removes it)."""
+
+        if backend not in ANN_BACKENDS:
+            raise ValueError(f"unknown ann backend: {backend}")
+        if backend == "exact" or not self.has_embedding.any():
+            self._ann = None
+            return
+        rows = np.flatnonzero(self.has_embedding)
+        embedded = self.matrix[rows]
+        index: VectorIndex = (
+            IvfIndex(embedded, **options) if backend == "ivf" else HnswIndex(embedded, **options)
+        )
+        self._ann = _Remapped(index, rows)
+
+    def search(
+        self,
+        query_text: str | None = None,
+        query_embedding: Sequence[float] | np.ndarray | None = None,
+        alpha: float = DEFAULT_ALPHA,
+        match_count: int = DEFAULT_MATCH_COUNT,
+        ann_candidates: int = DEFAULT_ANN_CANDIDATES,
+    ) -> list[SearchHit]:
+        """Rank articles like ``search_articles`` (ANN narrows vector candidates).
+
+        See the module notes for where the text rank can differ from Postgres.
+        """
+
+        text_weight = alpha
+        vector_weight = 1 - text_weight
+        match_count = max(match_count, 1)
+        terms = (
+            list(dict.fromkeys(tokenize(query_text))) if query_text and query_text.strip() else []
+        )
+        query = self._normalize_query(query_embedding)
+        vector_query = query is not None and vector_weight > 0
+        text_ids, text_ranks, matched = self._text.lookup(terms)
+
+        if vector_query and self._ann is not None:
+            # ANN で得たベクトル候補と、語を含む文書の和集合だけを正確にスコアリングする
+            ann_ids = self._ann.search(query, max(ann_candidates, match_count))
+            candidates = np.union1d(ann_ids, text_ids)
+        elif vector_query or not terms:
+            candidates = np.arange(len(self))
+        else:
+            candidates = text_ids[matched]
+
+        if len(candidates) == 0:
+            return []
+
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        if len(text_ids):
+            positions = np.searchsorted(text_ids, candidates)
+            positions = np.minimum(positions, len(text_ids) - 1)
+            present = text_ids[positions] == candidates
+            scores[present] += text_weight * text_ranks[positions[present]]
+        if query is not None:
+            scores += vector_weight * (self.matrix[candidates] @ query)
+
+        top = _top_indices(scores, match_count)
+        return [self._hit(int(candidates[i]), float(scores[i])) for i in top]
+
+    def _normalize_query(
+        self,
+        query_embedding: Sequence[float] | np.ndarray | None,
+    ) -> np.ndarray | None:
+        if query_embedding is None:
+            return None
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dimension:
+            raise LocalSearchError(
+                f"query embedding has dimension {query.shape[0]}, index has {self.dimension}"
+            )
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def _hit(self, row: int, score: float) -> SearchHit:
+        return SearchHit(score=score, **self._records[row])
+
+
+class _Remapped:
+    """Translate ids of an index built on embedded rows back to table rows."""
+
+    def __init__(self, index: VectorIndex, rows: np.ndarray) -> None:
+        self._index = index
+        self._rows = rows
+
+    def search(self, query: np.ndarray, count: int) -> np.ndarray:
+        return self._rows[self._index.search(query, count)]
+
+
+def _top_indices(scores: np.ndarray, count: int) -> np.ndarray:
+    """Indices of the ``count`` largest scores, highest first (``argpartition`` + sort)."""
+
+    if count >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, count - 1)[:count]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _import_hnswlib() -> Any:
+    try:
+        import hnswlib
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise LocalSearchError(
+            'hnswlib is not installed; install the extra with `uv pip install -e ".[search]"`'
+        ) from exc
+    return hnswlib
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Supabase を使わないローカル検索")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(
+        "build",
+        help="Supabase から記事と埋め込みを取得してインデックスを保存",
+    )
+    build.add_argument("--output", type=Path, required=True, help="保存先 (.npz)")
+    build.add_argument("--years", nargs="+", type=int, default=None, help="対象年 (省略時は全件)")
+    build.add_argument(
+        "--snapshot",
+        type=Path,
+        default=None,
+        help="Supabase の代わりに main.py --export-snapshot の出力から作成",
+    )
+
+    query = commands.add_parser("query", help="保存済みインデックスを検索")
+    query.add_argument("query", help="検索クエリ")
+    query.add_argument("--index", type=Path, required=True, help="build で保存したインデックス")
+    query.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help=f"全文検索スコアの重み (デフォルト: {DEFAULT_ALPHA})",
+    )
+    query.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_MATCH_COUNT,
+        help=f"返す件数 (デフォルト: {DEFAULT_MATCH_COUNT})",
+    )
+    query.add_argument(
+        "--ann",
+        choices=ANN_BACKENDS,
+        default="exact",
+        help="ベクトル検索の方式。hnsw は `.[search]` extra が必要 (デフォルト: exact)",
+    )
+    query.add_argument(
+        "--text-only",
+        action="store_true",
+        help="クエリ埋め込みを生成せず全文検索スコアのみで順位付け",
+    )
+    return parser
+
+
+def main() -> None:
+    from config import SettingsError, get_settings
+    from logging_config import configure_logging
+
+    args = build_parser().parse_args()
+    configure_logging()
+
+    if args.command == "build" and args.snapshot:
+        from snapshot import SnapshotError, load_snapshot
+
+        try:
+            snapshot = load_snapshot(args.snapshot)
+            years = {str(year) for year in args.years or ()}
+            index = LocalSearchIndex.from_articles(
+                (
+                    article
+                    for article in snapshot.iter_articles()
+                    if not years or article.year in years
+                ),
+                model_name=snapshot.model_name,
+            )
+        except SnapshotError as exc:
+            logger.error("インデックスの作成に失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+        index.save(args.output)
+        return
+
+    if args.command == "build":
+        from supabase_client import SupabaseClientError, SupabaseVectorClient
+
+        try:
+            settings = get_settings()
+            client = SupabaseVectorClient.from_settings(settings)
+            index = LocalSearchIndex.from_articles(
+                client.iter_articles(args.years),
+                model_name=settings.embedding_model_name,
+            )
+        except (SettingsError, SupabaseClientError) as exc:
+            logger.error("インデックスの作成に失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+        index.save(args.output)
+        return
+
+    index = LocalSearchIndex.load(args.index)
+    index.build_ann(args.ann)
+    embedding = None
+    if not args.text_only:
+        from embedding import EmbeddingService
+
+        service = EmbeddingService(index.model_name or "intfloat/multilingual-e5-large")
+        embedding = service.embed_queries([args.query])[0]
+
+    hits = index.search(args.query, embedding, alpha=args.alpha, match_count=args.limit)
+    for hit in hits:
+        print(json.dumps(asdict(hit), ensure_ascii=False))
+
+
+if __name__ == "__main__":  # pragma: no cover - script entry
+    main()
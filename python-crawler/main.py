@@ -4,16 +4,43 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
+import os
 from collections.abc import Sequence
 from pathlib import Path
 
 from loguru import logger
 
-from config import SettingsError, get_settings
-from crawler import CvprCrawler
+from checkpoint import CheckpointJournal, open_journal
+from config import EmbeddingSettings, SettingsError, get_embedding_settings, get_settings
+from crawler import CONFERENCES, CrawlResult, CvprCrawler, build_sources
+from dedup import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+from dedup import DuplicateMatch, NearDuplicateIndex
+from embedding import DEFAULT_BATCH_SIZE as DEFAULT_EMBEDDING_BATCH_SIZE
 from embedding import EmbeddingJobResult, EmbeddingService
+from embedding_cache import DEFAULT_MAX_ENTRIES as DEFAULT_CACHE_MAX_ENTRIES
+from embedding_cache import EmbeddingCache
 from logging_config import configure_logging
-from supabase_client import SupabaseClientError, SupabaseVectorClient
+from metrics import METRICS
+from models import Article
+from page_cache import DEFAULT_TTL as DEFAULT_PAGE_CACHE_TTL
+from page_cache import PageCache
+from pipeline import DEFAULT_QUEUE_SIZE, StreamingPipeline
+from postgres_client import PostgresCopyClient
+from shard import ShardError, ShardSpec, write_shard_report
+from snapshot import SnapshotError, load_snapshot, write_snapshot
+from supabase_client import (
+    DEFAULT_MAX_BATCH_BYTES,
+    DEFAULT_MAX_IN_FLIGHT,
+    SupabaseClientError,
+    SupabaseVectorClient,
+)
+from throttle import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES
+
+# 解析プロセスは起動コストがあるため、小さなクロールでも過剰にならないよう上限を設ける
+DEFAULT_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+ArticleStore = SupabaseVectorClient | PostgresCopyClient
+CHECKPOINT_EMBEDDING_BATCHES = 8
 
 
 def parse_years(raw_years: Sequence[str]) -> Sequence[int]:
@@ -23,8 +50,17 @@ def parse_years(raw_years: Sequence[str]) -> Sequence[int]:
         raise argparse.ArgumentTypeError("years は整数で指定してください") from exc
 
 
+def parse_shard(raw: str) -> ShardSpec:
+    try:
+        return ShardSpec.parse(raw)
+    except ShardError as exc:
+        raise argparse.ArgumentTypeError(
+            "shard は INDEX/COUNT (0 <= INDEX < COUNT) で指定してください"
+        ) from exc
+
+
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="CVPR 2023-2025 crawler")
+    parser = argparse.ArgumentParser(description="CVF open access crawler (CVPR / ICCV / WACV)")
     parser.add_argument(
         "--years",
         nargs="+",
@@ -32,17 +68,56 @@ def build_parser() -> argparse.ArgumentParser:
         type=int,
         help="クロール対象の年 (複数指定可能)",
     )
+    parser.add_argument(
+        "--conferences",
+        nargs="+",
+        choices=CONFERENCES,
+        default=["CVPR"],
+        help="クロール対象の会議 (複数指定可能, 全ての一覧を同時に取得します)",
+    )
     parser.add_argument(
         "--limit",
         type=int,
         default=None,
-        help="各年あたり取得する論文数の上限 (テスト用)",
+        help="会議・年ごとに取得する論文数の上限 (テスト用)",
     )
     parser.add_argument(
         "--concurrency",
         type=int,
         default=5,
-        help="同時接続数 (デフォルト: 5)",
+        help="同時接続数の初期値 (デフォルト: 5)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=(
+            "応答が健全な間に引き上げる同時接続数の上限 "
+            f"(デフォルト: {DEFAULT_MAX_CONCURRENCY}, --concurrency と同値で固定)"
+        ),
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"429/5xx/タイムアウト時の再試行回数 (デフォルト: {DEFAULT_MAX_RETRIES})",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=None,
+        help="HTTP コネクションプールの最大接続数 (デフォルト: --max-concurrency と同値)",
+    )
+    parser.add_argument(
+        "--max-keepalive",
+        type=int,
+        default=None,
+        help="keep-alive で保持する接続数の上限 (デフォルト: --max-connections と同値)",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="HTTP/2 で接続し、1 接続上でリクエストを多重化します (h2 パッケージが必要)",
     )
     parser.add_argument(
         "--timeout",
@@ -50,17 +125,181 @@ def build_parser() -> argparse.ArgumentParser:
         default=30.0,
         help="HTTP タイムアウト (秒)",
     )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=DEFAULT_PARSE_WORKERS,
+        help=(
+            "HTML 解析用のプロセス数 "
+            f"(デフォルト: CPU コア数と 4 の小さい方 = {DEFAULT_PARSE_WORKERS}, "
+            "0 でイベントループ内で解析)"
+        ),
+    )
+    parser.add_argument(
+        "--page-cache",
+        type=Path,
+        default=None,
+        help="HTTP レスポンスキャッシュ (SQLite) のパス。指定時は条件付きリクエストで差分取得",
+    )
+    parser.add_argument(
+        "--page-cache-ttl",
+        type=float,
+        default=DEFAULT_PAGE_CACHE_TTL,
+        help="論文ページキャッシュを再検証せずに使う秒数 (デフォルト: 7 日)",
+    )
+    parser.add_argument(
+        "--since-cache",
+        action="store_true",
+        help="ページキャッシュに未登録の URL のみ取得します (--page-cache と併用)",
+    )
     parser.add_argument(
         "--upsert",
         action="store_true",
         help="クロール結果を Supabase に upsert します",
     )
+    parser.add_argument(
+        "--upsert-backend",
+        choices=("postgrest", "copy"),
+        default="postgrest",
+        help="upsert の送信先 (postgrest: Supabase API, copy: SUPABASE_DB_URL へ COPY 一括ロード)",
+    )
+    parser.add_argument(
+        "--upsert-max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BATCH_BYTES,
+        help=(
+            "1 リクエストあたりの upsert ペイロード上限バイト数 "
+            f"(デフォルト: {DEFAULT_MAX_BATCH_BYTES})"
+        ),
+    )
+    parser.add_argument(
+        "--upsert-concurrency",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help=f"同時に送信する upsert バッチ数 (デフォルト: {DEFAULT_MAX_IN_FLIGHT})",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="Supabase に埋め込み付きで保存済みの URL を取得対象から除外します (--upsert と併用)",
+    )
     parser.add_argument(
         "--batch-size",
         type=int,
         default=100,
         help="Supabase upsert のバッチサイズ",
     )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="クロール・埋め込み・upsert をキューで接続して並行実行します (--upsert と併用)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"パイプラインの各ステージ間キューの上限 (デフォルト: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--embedding-batch-size",
+        type=int,
+        default=DEFAULT_EMBEDDING_BATCH_SIZE,
+        help=f"埋め込み生成のバッチサイズ (デフォルト: {DEFAULT_EMBEDDING_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--embed",
+        action="store_true",
+        help="Supabase に接続せずに埋め込みを生成します (--export-snapshot と併用)",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        type=Path,
+        default=None,
+        help="取得した論文と埋め込みをスナップショット (Parquet + .npy) として書き出すディレクトリ",
+    )
+    parser.add_argument(
+        "--import-snapshot",
+        type=Path,
+        default=None,
+        help="クロールの代わりにスナップショットから論文と埋め込みを読み込みます",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help=(
+            "埋め込みのコサイン類似度がこの値以上の論文を重複として upsert 対象から除外します "
+            f"(例: {DEFAULT_DEDUP_THRESHOLD}, 未指定で無効)"
+        ),
+    )
+    parser.add_argument(
+        "--no-warm-up",
+        action="store_true",
+        help="起動直後にバックグラウンドで埋め込みモデルを読み込まず、最初の埋め込み時に読み込みます",
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        type=Path,
+        default=None,
+        help="埋め込みキャッシュ (SQLite) のパス。指定時は同一アブストラクトの再計算を省略",
+    )
+    parser.add_argument(
+        "--embedding-cache-max-entries",
+        type=int,
+        default=DEFAULT_CACHE_MAX_ENTRIES,
+        help=f"埋め込みキャッシュの最大件数 (LRU, デフォルト: {DEFAULT_CACHE_MAX_ENTRIES})",
+    )
+    parser.add_argument(
+        "--embedding-workers",
+        type=int,
+        default=1,
+        help="埋め込み生成に使うプロセス数。2 以上で記事をシャードに分けて並列処理 (デフォルト: 1)",
+    )
+    parser.add_argument(
+        "--embedding-threads",
+        type=int,
+        default=None,
+        help="埋め込みワーカー 1 つあたりの演算スレッド数 (デフォルト: CPU コア数 / プロセス数)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="取得・埋め込み・upsert の進捗を記録するチェックポイント (SQLite) のパス",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="--checkpoint の記録から未完了の処理だけを再開します",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="INDEX/COUNT",
+        help=(
+            "論文 URL のハッシュで一覧を COUNT 分割し、INDEX 番目だけを処理します (例: 0/4)。"
+            "タイトルの重複除外はシャード内のみで、別シャードの同名論文は両方 upsert されます"
+        ),
+    )
+    parser.add_argument(
+        "--shard-report",
+        type=Path,
+        default=None,
+        help="シャードの取得結果を書き出す JSON のパス (shard.py merge で集約します)",
+    )
+    parser.add_argument(
+        "--metrics-report",
+        type=Path,
+        default=None,
+        help="実行終了時にステージごとの計測値を書き出す JSON レポートのパス",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=None,
+        help="node_exporter の textfile collector 向けに計測値を書き出す .prom ファイルのパス",
+    )
     parser.add_argument(
         "--embedding-failure-log",
         type=Path,
@@ -77,42 +316,134 @@ def build_parser() -> argparse.ArgumentParser:
 
 async def run_crawler(
     args: argparse.Namespace,
-    supabase_client: SupabaseVectorClient | None,
+    supabase_client: ArticleStore | None,
+    embedding_service: EmbeddingService | None,
+    embedding_failure_log: Path | None,
+) -> None:
+    page_cache = PageCache(args.page_cache, ttl=args.page_cache_ttl) if args.page_cache else None
+    if args.since_cache and not page_cache:
+        logger.warning("--since-cache は --page-cache と併用した場合のみ有効です。")
+
+    journal = open_journal(args.checkpoint, resume=args.resume) if args.checkpoint else None
+    if args.resume and not journal:
+        logger.warning("--resume は --checkpoint と併用した場合のみ有効です。")
+    with journal or contextlib.nullcontext():
+        await crawl_and_upsert(
+            args,
+            supabase_client,
+            embedding_service,
+            embedding_failure_log,
+            page_cache=page_cache,
+            journal=journal,
+        )
+
+
+async def crawl_and_upsert(
+    args: argparse.Namespace,
+    supabase_client: ArticleStore | None,
     embedding_service: EmbeddingService | None,
     embedding_failure_log: Path | None,
+    page_cache: PageCache | None,
+    journal: CheckpointJournal | None,
 ) -> None:
+    restored = journal.load_pending() if journal and args.resume else []
+    if restored:
+        logger.info(
+            "チェックポイントから {count} 件の未完了レコードを復元しました。",
+            count=len(restored),
+        )
+
+    skip_urls: set[str] = journal.known_urls() if journal and args.resume else set()
+    if args.skip_existing and supabase_client:
+        try:
+            skip_urls |= embedded_urls(supabase_client, args.years)
+        except SupabaseClientError as exc:
+            logger.error("既存レコードの取得に失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+    elif args.skip_existing:
+        logger.warning("--skip-existing は --upsert と併用した場合のみ有効です。")
+
     crawler = CvprCrawler(
-        years=args.years,
+        sources=build_sources(args.years, args.conferences),
         concurrency=args.concurrency,
         request_timeout=args.timeout,
+        max_concurrency=args.max_concurrency,
+        max_retries=args.max_retries,
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_keepalive,
+        http2=args.http2,
+        page_cache=page_cache,
+        since_cache=args.since_cache,
+        skip_urls=skip_urls,
+        parse_workers=args.parse_workers,
+        shard=args.shard,
     )
+    if args.shard_report and not args.shard:
+        logger.warning("--shard-report は --shard と併用した場合のみ有効です。")
 
-    logger.info(
-        "クロールを開始します (years={years}, limit={limit})",
-        years=args.years,
-        limit=args.limit,
-    )
-    result = await crawler.crawl(limit=args.limit)
-    logger.info("クロール完了: {summary}", summary=result.summary())
+    if args.pipeline and embedding_service and not args.import_snapshot:
+        if args.export_snapshot:
+            logger.warning("--export-snapshot はパイプラインモードでは使用できません。")
+        await run_pipeline(
+            args,
+            crawler,
+            supabase_client=supabase_client,
+            embedding_service=embedding_service,
+            embedding_failure_log=embedding_failure_log,
+            journal=journal,
+            restored=restored,
+        )
+        return
+
+    result = CrawlResult()
+    if args.import_snapshot:
+        result.articles = read_snapshot(args.import_snapshot, embedding_service)
+        if args.shard:
+            result.articles = [
+                article for article in result.articles if args.shard.owns(str(article.url))
+            ]
+    else:
+        logger.info(
+            "クロールを開始します (conferences={conferences}, years={years}, limit={limit})",
+            conferences=args.conferences,
+            years=args.years,
+            limit=args.limit,
+        )
+        async for article in crawler.iter_articles(result, limit=args.limit):
+            result.articles.append(article)
+            if journal:
+                journal.record_article(article)
+        logger.info("クロール完了: {summary}", summary=result.summary())
 
     sample_titles = [article.title for article in result.articles[:3]]
     if sample_titles:
         logger.info("サンプルタイトル: {titles}", titles=sample_titles)
 
-    articles_for_upsert = result.articles
+    articles = [*restored, *result.articles]
+    articles_for_upsert = articles
     embedding_result: EmbeddingJobResult | None = None
-    if embedding_service and result.articles:
-        logger.info("埋め込み生成を開始します (1 abstract = 1 chunk)")
-        embedding_result = embedding_service.embed_articles(
-            result.articles,
-            failure_log=embedding_failure_log,
+    if embedding_service and articles:
+        logger.info(
+            "埋め込み生成を開始します (1 abstract = 1 chunk, batch_size={batch_size})",
+            batch_size=args.embedding_batch_size,
+        )
+        embedding_result = embed_with_checkpoints(
+            embedding_service,
+            [article for article in articles if article.abstract_embedding is None],
+            batch_size=args.embedding_batch_size,
+            journal=journal,
         )
+        if embedding_failure_log:
+            embedding_result.dump_failures(embedding_failure_log)
         success = embedding_result.processed
         failed = len(embedding_result.failed)
         logger.info(
-            "埋め込み生成完了: processed={success}, failed={failed}",
+            "埋め込み生成完了: processed={success}, failed={failed}, "
+            "cache_hits={hits}, cache_misses={misses}",
             success=success,
             failed=failed,
+            hits=embedding_result.cache_hits,
+            misses=embedding_result.cache_misses,
         )
         if failed:
             if embedding_failure_log:
@@ -123,14 +454,36 @@ async def run_crawler(
             else:
                 logger.warning("埋め込みに失敗したレコードがありますが、ログ出力は無効化されています。")
         articles_for_upsert = [
-            article for article in result.articles if article.abstract_embedding is not None
+            article for article in articles if article.abstract_embedding is not None
         ]
+    if args.export_snapshot:
+        try:
+            write_snapshot(
+                args.export_snapshot,
+                articles,
+                model_name=embedding_service.model_name if embedding_service else None,
+            )
+        except SnapshotError as exc:
+            logger.error("スナップショットの書き出しに失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+
+    if args.dedup_threshold is not None and articles_for_upsert:
+        articles_for_upsert, duplicates = NearDuplicateIndex(args.dedup_threshold).filter(
+            articles_for_upsert
+        )
+        result.duplicates.extend(duplicates)
+        log_duplicates(duplicates)
+        if journal:
+            journal.mark_done(duplicate.url for duplicate in duplicates)
 
     if supabase_client and articles_for_upsert:
         try:
             supabase_client.upsert_articles_chunked(
                 articles_for_upsert,
                 batch_size=args.batch_size,
+                on_batch=journal.mark_upserted if journal else None,
+                max_batch_bytes=args.upsert_max_bytes,
+                max_in_flight=args.upsert_concurrency,
             )
         except SupabaseClientError as exc:
             logger.error("Supabase upsert に失敗しました: {}", exc)
@@ -142,6 +495,132 @@ async def run_crawler(
     elif args.upsert and not articles_for_upsert:
         logger.warning("upsert対象のレコードがありません (embedding 失敗の可能性)。")
 
+    if args.shard and args.shard_report:
+        write_shard_report(
+            args.shard_report,
+            args.shard,
+            result,
+            embedding=embedding_result,
+            upserted=len(articles_for_upsert) if supabase_client else 0,
+        )
+
+
+def embedded_urls(store: ArticleStore, years: Sequence[int]) -> set[str]:
+    """URLs stored with an embedding for ``years``, which ``--skip-existing`` does not fetch."""
+
+    # 埋め込みが欠けているレコードは再取得して補完する
+    return {url for url, has_embedding in store.fetch_existing_urls(years).items() if has_embedding}
+
+
+def read_snapshot(path: Path, embedding_service: EmbeddingService | None) -> list[Article]:
+    try:
+        snapshot = load_snapshot(path)
+        articles = snapshot.articles()
+    except SnapshotError as exc:
+        logger.error("スナップショットの読み込みに失敗しました: {}", exc)
+        raise SystemExit(1) from exc
+    if (
+        embedding_service
+        and snapshot.model_name
+        and snapshot.model_name != embedding_service.model_name
+    ):
+        logger.warning(
+            "スナップショットの埋め込みモデル {snapshot} は現在の設定 {current} と異なります。",
+            snapshot=snapshot.model_name,
+            current=embedding_service.model_name,
+        )
+    return articles
+
+
+def log_duplicates(duplicates: Sequence[DuplicateMatch]) -> None:
+    if not duplicates:
+        return
+    logger.info("類似度による重複を {count} 件除外しました。", count=len(duplicates))
+    for duplicate in duplicates:
+        logger.debug(
+            "重複: {url} -> {matched} (score={score:.4f})",
+            url=duplicate.url,
+            matched=duplicate.matched_url,
+            score=duplicate.score,
+        )
+
+
+def embed_with_checkpoints(
+    embedding_service: EmbeddingService,
+    articles: Sequence[Article],
+    batch_size: int,
+    journal: CheckpointJournal | None,
+) -> EmbeddingJobResult:
+    """Embed ``articles``, journaling vectors every few batches when a journal is given."""
+
+    if not journal:
+        return embedding_service.embed_articles(articles, batch_size=batch_size)
+
+    result = EmbeddingJobResult()
+    interval = batch_size * CHECKPOINT_EMBEDDING_BATCHES
+    for start in range(0, len(articles), interval):
+        chunk = articles[start : start + interval]
+        result.merge(embedding_service.embed_articles(chunk, batch_size=batch_size))
+        journal.record_embeddings(chunk)
+    return result
+
+
+async def run_pipeline(
+    args: argparse.Namespace,
+    crawler: CvprCrawler,
+    supabase_client: ArticleStore | None,
+    embedding_service: EmbeddingService,
+    embedding_failure_log: Path | None,
+    journal: CheckpointJournal | None = None,
+    restored: Sequence[Article] = (),
+) -> None:
+    pipeline = StreamingPipeline(
+        crawler,
+        embedding_service,
+        supabase_client,
+        embedding_batch_size=args.embedding_batch_size,
+        upsert_batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        journal=journal,
+        upsert_max_bytes=args.upsert_max_bytes,
+        upsert_in_flight=args.upsert_concurrency,
+        dedup_index=(
+            NearDuplicateIndex(args.dedup_threshold) if args.dedup_threshold is not None else None
+        ),
+    )
+
+    logger.info(
+        "パイプラインモードでクロールを開始します "
+        "(conferences={conferences}, years={years}, limit={limit})",
+        conferences=args.conferences,
+        years=args.years,
+        limit=args.limit,
+    )
+    try:
+        result = await pipeline.run(
+            limit=args.limit,
+            failure_log=embedding_failure_log,
+            restored=restored,
+        )
+    except SupabaseClientError as exc:
+        logger.error("Supabase upsert に失敗しました: {}", exc)
+        raise SystemExit(1) from exc
+
+    logger.info("パイプライン完了: {summary}", summary=result.summary())
+    log_duplicates(
+        [duplicate for duplicate in result.crawl.duplicates if duplicate.reason == "embedding"]
+    )
+    if result.embedding.failed and not embedding_failure_log:
+        logger.warning("埋め込みに失敗したレコードがありますが、ログ出力は無効化されています。")
+    if args.shard and args.shard_report:
+        write_shard_report(
+            args.shard_report,
+            args.shard,
+            result.crawl,
+            embedding=result.embedding,
+            upserted=result.upserted,
+        )
+
 
 def main() -> None:
     parser = build_parser()
@@ -149,9 +628,10 @@ def main() -> None:
 
     configure_logging()
 
-    supabase_client: SupabaseVectorClient | None = None
+    supabase_client: ArticleStore | None = None
     embedding_service: EmbeddingService | None = None
     embedding_failure_log: Path | None = None
+    embedding_settings: EmbeddingSettings | None = None
 
     if args.upsert:
         try:
@@ -160,21 +640,77 @@ def main() -> None:
             logger.error("設定の読み込みに失敗しました: {}", exc)
             raise SystemExit(1) from exc
 
-        supabase_client = SupabaseVectorClient.from_settings(settings)
-        embedding_service = EmbeddingService(model_name=settings.embedding_model_name)
+        try:
+            supabase_client = (
+                PostgresCopyClient.from_settings(settings)
+                if args.upsert_backend == "copy"
+                else SupabaseVectorClient.from_settings(settings)
+            )
+        except SupabaseClientError as exc:
+            logger.error("upsert クライアントの初期化に失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+        embedding_settings = settings
+        logger.info("Supabase クライアントを初期化しました: {url}", url=settings.supabase_url)
+    elif args.embed:
+        try:
+            embedding_settings = get_embedding_settings()
+        except SettingsError as exc:
+            logger.error("設定の読み込みに失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+
+    if embedding_settings is not None:
+        embedding_cache = (
+            EmbeddingCache(args.embedding_cache, max_entries=args.embedding_cache_max_entries)
+            if args.embedding_cache
+            else None
+        )
+        embedding_service = EmbeddingService.from_settings(
+            embedding_settings,
+            cache=embedding_cache,
+            workers=args.embedding_workers,
+            num_threads=args.embedding_threads,
+        )
+        if not args.no_warm_up:
+            # モデルの読み込みをクロールと並行して進め、最初の埋め込みまでの待ち時間を隠す
+            embedding_service.start_warm_up()
         if not args.no_embedding_failure_log:
             embedding_failure_log = args.embedding_failure_log
 
-        logger.info("Supabase クライアントを初期化しました: {url}", url=settings.supabase_url)
+    try:
+        asyncio.run(
+            run_crawler(
+                args,
+                supabase_client=supabase_client,
+                embedding_service=embedding_service,
+                embedding_failure_log=embedding_failure_log,
+            )
+        )
+    finally:
+        if embedding_service is not None:
+            embedding_service.close()
+        write_metrics(args)
 
-    asyncio.run(
-        run_crawler(
-            args,
-            supabase_client=supabase_client,
-            embedding_service=embedding_service,
-            embedding_failure_log=embedding_failure_log,
+
+def write_metrics(args: argparse.Namespace) -> None:
+    """Write the collected metrics to the paths requested on the command line."""
+
+    if args.metrics_report:
+        METRICS.write_report(
+            args.metrics_report,
+            extra={
+                "conferences": args.conferences,
+                "years": args.years,
+                "limit": args.limit,
+                "pipeline": args.pipeline,
+                "upsert": args.upsert,
+                "upsert_backend": args.upsert_backend,
+                "shard": str(args.shard) if args.shard else None,
+            },
         )
-    )
+        logger.info("メトリクスレポートを書き出しました: {path}", path=args.metrics_report)
+    if args.metrics_textfile:
+        METRICS.write_textfile(args.metrics_textfile)
+        logger.info("メトリクスを書き出しました: {path}", path=args.metrics_textfile)
 
 
 if __name__ == "__main__":  # pragma: no cover - script entry
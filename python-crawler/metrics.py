@@ -0,0 +1,267 @@
+"""In-process metrics registry with JSON and Prometheus textfile exporters.
+
+Instrumented modules declare their metrics at import time against the shared
+:data:`METRICS` registry; ``main.py`` writes the collected values at the end of
+a run as a JSON report and as a textfile for node_exporter's textfile collector.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+NAMESPACE = "cvpaper"
+
+_LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: Mapping[str, Any]) -> _LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: _LabelKey, extra: Sequence[tuple[str, str]] = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, lock: threading.Lock) -> None:
+        self.name = name
+        self.help = help_text
+        self._lock = lock
+
+    def render(self) -> list[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def snapshot(self) -> list[dict[str, Any]]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def reset(self) -> None:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, lock: threading.Lock) -> None:
+        super().__init__(name, help_text, lock)
+        self._values: dict[_LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {"labels": dict(key), "value": value} for key, value in sorted(self._values.items())
+        ]
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Gauge(Counter):
+    """Last observed value per label set."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        lock: threading.Lock,
+        buckets: Sequence[float],
+    ) -> None:
+        super().__init__(name, help_text, lock)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[_LabelKey, list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        # 末尾 2 要素は sum と count、それ以外はバケットごとの (非累積) 件数
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines: list[str] = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series, strict=False):
+                cumulative += count
+                labels = _format_labels(key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}")
+        return lines
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "labels": dict(key),
+                "count": int(series[-1]),
+                "sum": round(series[-2], 6),
+                "mean": round(series[-2] / series[-1], 6) if series[-1] else None,
+                "p50": self._quantile(series, 0.5),
+                "p99": self._quantile(series, 0.99),
+            }
+            for key, series in sorted(self._series.items())
+        ]
+
+    def reset(self) -> None:
+        self._series.clear()
+
+    def _quantile(self, series: list[float], q: float) -> float | None:
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+
+        total = series[-1]
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0.0
+        lower = 0.0
+        for bound, count in zip((*self.buckets, math.inf), series, strict=False):
+            if cumulative + count >= rank and count:
+                if math.isinf(bound):
+                    return lower
+                return round(lower + (bound - lower) * (rank - cumulative) / count, 6)
+            cumulative += count
+            lower = bound
+        return lower
+
+
+class MetricsRegistry:
+    """Thread-safe collection of named metrics."""
+
+    def __init__(self, namespace: str = NAMESPACE) -> None:
+        self._namespace = namespace
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge, name, help_text)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, help_text, buckets=buckets)
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.reset()
+        self.started_at = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            name: {"type": metric.kind, "series": metric.snapshot()}
+            for name, metric in sorted(self._metrics.items())
+            if metric.snapshot()
+        }
+
+    def render_textfile(self) -> str:
+        """Render in the Prometheus text exposition format read by node_exporter."""
+
+        lines: list[str] = []
+        for name, metric in sorted(self._metrics.items()):
+            samples = metric.render()
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        # node_exporter が書き込み途中のファイルを読まないよう、一時ファイルから rename する
+        _atomic_write(path, self.render_textfile())
+
+    def write_report(self, path: Path, extra: Mapping[str, Any] | None = None) -> None:
+        finished_at = time.time()
+        report = {
+            "started_at": self.started_at,
+            "finished_at": finished_at,
+            "duration_seconds": round(finished_at - self.started_at, 3),
+            **(extra or {}),
+            "metrics": self.snapshot(),
+        }
+        _atomic_write(path, json.dumps(report, ensure_ascii=False, indent=2, default=str))
+
+    def _register(self, cls: type[Any], name: str, help_text: str, **options: Any) -> Any:
+        full_name = f"{self._namespace}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = cls(full_name, help_text, self._lock, **options)
+                self._metrics[full_name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {full_name} is already registered as {metric.kind}")
+        return metric
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+METRICS = MetricsRegistry()
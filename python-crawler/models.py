@@ -2,12 +2,32 @@
 
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Annotated, Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field, HttpUrl
+import numpy as np
+from pydantic import BaseModel, BeforeValidator, Field, HttpUrl, PlainSerializer
 
-EmbeddingVector = list[float]
+
+def _as_float32(value: Any) -> np.ndarray | None:
+    if value is None:
+        return None
+    # float32 の配列 (ジョブが持つ行列の行ビューなど) はコピーせずにそのまま保持する
+    vector = np.asarray(value, dtype=np.float32)
+    if vector.ndim != 1:
+        raise ValueError("embedding must be a 1-D vector")
+    return vector
+
+
+EmbeddingVector = Annotated[
+    np.ndarray,
+    BeforeValidator(_as_float32),
+    PlainSerializer(lambda vector: vector.tolist(), return_type=list[float], when_used="json"),
+]
+
+DEFAULT_EMBEDDING_PRECISION = 6
 
 
 class Article(BaseModel):
@@ -21,12 +41,28 @@ class Article(BaseModel):
     abstract: str
     abstract_embedding: EmbeddingVector | None = Field(default=None, repr=False)
 
-    model_config = {"populate_by_name": True, "from_attributes": True}
+    model_config = {
+        "populate_by_name": True,
+        "from_attributes": True,
+        "arbitrary_types_allowed": True,
+    }
 
-    def to_supabase_record(self) -> dict[str, Any]:
-        """Convert the article into a Supabase insertable dictionary."""
+    def to_supabase_record(
+        self,
+        embedding_precision: int = DEFAULT_EMBEDDING_PRECISION,
+    ) -> dict[str, Any]:
+        """Convert the article into a Supabase insertable dictionary.
 
-        record = self.model_dump(mode="json", exclude_none=True)
+        The embedding is emitted in pgvector text form (``"[0.012345,...]"``) at a
+        fixed number of decimals rather than as a JSON array of full-precision floats.
+        """
+
+        record = self.model_dump(mode="json", exclude_none=True, exclude={"abstract_embedding"})
+        if self.abstract_embedding is not None:
+            record["abstract_embedding"] = format_pgvector(
+                self.abstract_embedding,
+                precision=embedding_precision,
+            )
         return record
 
 
@@ -39,3 +75,32 @@ class UpsertPayload(BaseModel):
         """Return Supabase-ready dictionaries."""
 
         return [article.to_supabase_record() for article in self.articles if article]
+
+
+def format_pgvector(
+    vector: np.ndarray | Sequence[float],
+    precision: int = DEFAULT_EMBEDDING_PRECISION,
+) -> str:
+    """Serialize a vector into pgvector's text input format with fixed precision.
+
+    The whole row is formatted with a single ``%`` operation against a cached
+    template, instead of one ``str.format`` call per component.
+    """
+
+    values = np.asarray(vector, dtype=np.float32).tolist()
+    return "[" + _row_template(len(values), precision) % tuple(values) + "]"
+
+
+@lru_cache(maxsize=8)
+def _row_template(dimension: int, precision: int) -> str:
+    return ",".join([f"%.{precision}f"] * dimension)
+
+
+def parse_pgvector(value: str | Sequence[float] | None) -> list[float] | None:
+    """Parse a pgvector value as returned by PostgREST (text form or JSON array)."""
+
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [float(item) for item in value.strip("[]").split(",") if item]
+    return [float(item) for item in value]
@@ -0,0 +1,148 @@
+"""ONNX Runtime CPU backend for e5 sentence embeddings."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+DEFAULT_MAX_SEQ_LENGTH = 512
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+
+
+class OnnxEncoder:
+    """Drop-in replacement for ``SentenceTransformer.encode`` backed by ONNX Runtime.
+
+    Reproduces the e5 sentence-transformers head (mean pooling over the
+    attention mask followed by L2 normalization) on top of the exported
+    transformer, so vectors match the torch backend up to numerical noise.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        tokenizer: Any,
+        max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH,
+    ) -> None:
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self._session = session
+        self._input_names = {node.name for node in session.get_inputs()}
+
+    @classmethod
+    def load(
+        cls,
+        model_name: str,
+        model_dir: Path,
+        quantize: bool = False,
+        intra_op_threads: int | None = None,
+    ) -> OnnxEncoder:
+        """Load the ONNX model from ``model_dir``, exporting (and quantizing) it on first use."""
+
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = ensure_onnx_model(model_name, model_dir, quantize=quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        logger.info("ONNX Runtime でモデルを読み込みました: {path}", path=model_path)
+        return cls(session, tokenizer)
+
+    def encode(
+        self,
+        sentences: str | Sequence[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        outputs = [
+            self._encode_batch(texts[start : start + batch_size], normalize_embeddings)
+            for start in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.concatenate(outputs) if outputs else np.empty((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: Sequence[str], normalize: bool) -> np.ndarray:
+        encoded = self.tokenizer(
+            list(texts),
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self._input_names and name in encoded
+        }
+        (hidden,) = self._session.run(["last_hidden_state"], feeds)
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32, copy=False)
+
+
+def ensure_onnx_model(model_name: str, model_dir: Path, quantize: bool = False) -> Path:
+    """Return the ONNX model path in ``model_dir``, exporting it from Hugging Face if needed."""
+
+    fp32_path = model_dir / FP32_FILENAME
+    if not fp32_path.exists():
+        export_onnx(model_name, model_dir)
+    if not quantize:
+        return fp32_path
+
+    int8_path = model_dir / INT8_FILENAME
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("ONNX モデルを int8 に動的量子化します: {path}", path=int8_path)
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def export_onnx(model_name: str, model_dir: Path) -> Path:
+    """Export the transformer body of ``model_name`` to ONNX together with its tokenizer."""
+
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    logger.info("ONNX へエクスポートします: {model} -> {path}", model=model_name, path=model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    dummy = tokenizer(["passage: export"], return_tensors="pt")
+    output_path = model_dir / FP32_FILENAME
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(output_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17,
+        )
+    tokenizer.save_pretrained(model_dir)
+    return output_path
@@ -0,0 +1,112 @@
+"""On-disk HTTP response cache used for incremental crawls."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_TTL = 7 * 24 * 60 * 60.0
+
+_SCHEMA = """
+create table if not exists pages (
+    url text primary key,
+    body text not null,
+    etag text,
+    last_modified text,
+    fetched_at real not null,
+    parsed_at real,
+    abstract text,
+    authors text
+);
+"""
+
+
+@dataclass(slots=True)
+class CachedPage:
+    """A cached response body plus validators and the fields parsed from it."""
+
+    url: str
+    body: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+    parsed_at: float | None = None
+    abstract: str | None = None
+    authors: str | None = None
+
+    @property
+    def has_article(self) -> bool:
+        return self.parsed_at is not None and bool(self.abstract) and self.authors is not None
+
+    def is_fresh(self, ttl: float, now: float | None = None) -> bool:
+        current = time.time() if now is None else now
+        return ttl > 0 and current - self.fetched_at < ttl
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """SQLite store of fetched pages keyed by URL."""
+
+    def __init__(self, path: Path, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("pragma journal_mode=wal")
+
+    def get(self, url: str) -> CachedPage | None:
+        row = self._conn.execute(
+            "select url, body, etag, last_modified, fetched_at, parsed_at, abstract, authors "
+            "from pages where url = ?",
+            (url,),
+        ).fetchone()
+        return CachedPage(*row) if row else None
+
+    def known_urls(self) -> set[str]:
+        """URLs of cached paper pages that parsed into an article (see ``has_article``).
+
+        Listing pages and pages whose abstract or authors were missing are left
+        out, so ``--since-cache`` fetches them again.
+        """
+
+        rows = self._conn.execute(
+            "select url from pages where parsed_at is not null "
+            "and abstract is not null and abstract != '' and authors is not null"
+        )
+        return {url for (url,) in rows}
+
+    def store(self, page: CachedPage) -> None:
+        self._conn.execute(
+            "insert or replace into pages "
+            "(url, body, etag, last_modified, fetched_at, parsed_at, abstract, authors) "
+            "values (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                page.url,
+                page.body,
+                page.etag,
+                page.last_modified,
+                page.fetched_at,
+                page.parsed_at,
+                page.abstract,
+                page.authors,
+            ),
+        )
+        self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark a cached page as revalidated (e.g. after a 304 response)."""
+
+        self._conn.execute("update pages set fetched_at = ? where url = ?", (time.time(), url))
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
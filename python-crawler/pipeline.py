@@ -0,0 +1,269 @@
+"""Streaming crawl -> embed -> upsert pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from loguru import logger
+
+from checkpoint import CheckpointJournal
+from crawler import CrawlResult, CvprCrawler
+from dedup import NearDuplicateIndex
+from embedding import DEFAULT_BATCH_SIZE, EmbeddingJobResult, EmbeddingService
+from models import Article
+from postgres_client import PostgresCopyClient
+from supabase_client import (
+    DEFAULT_MAX_BATCH_BYTES,
+    DEFAULT_MAX_IN_FLIGHT,
+    SupabaseVectorClient,
+)
+
+DEFAULT_QUEUE_SIZE = 256
+
+_END_OF_STREAM = None
+
+
+@dataclass(slots=True)
+class StageStats:
+    """Throughput counters for a single pipeline stage."""
+
+    name: str
+    items: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: float | None = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.items / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: items={self.items}, batches={self.batches}, "
+            f"busy={self.busy_seconds:.1f}s, elapsed={self.elapsed_seconds:.1f}s, "
+            f"throughput={self.throughput:.2f}/s"
+        )
+
+
+@dataclass(slots=True)
+class PipelineResult:
+    """Aggregated result of a streaming pipeline run."""
+
+    crawl: CrawlResult = field(default_factory=CrawlResult)
+    embedding: EmbeddingJobResult = field(default_factory=EmbeddingJobResult)
+    upserted: int = 0
+    stages: list[StageStats] = field(default_factory=list)
+
+    def summary(self) -> str:
+        stage_stats = "; ".join(stage.summary() for stage in self.stages)
+        return (
+            f"{self.crawl.summary()}, embedded={self.embedding.processed}, "
+            f"embedding_failures={len(self.embedding.failed)}, "
+            f"cache_hits={self.embedding.cache_hits}, cache_misses={self.embedding.cache_misses}, "
+            f"upserted={self.upserted}, "
+            f"stages=[ {stage_stats} ]"
+        )
+
+
+class StreamingPipeline:
+    """Runs crawl, embedding and upsert concurrently, connected by bounded queues.
+
+    The crawler pushes articles into a bounded queue as soon as they are parsed,
+    the embedding stage pulls micro-batches and encodes them in a worker thread,
+    and the upsert stage flushes every ``upsert_batch_size`` embedded rows. Full
+    queues block the upstream stage, so memory stays bounded by the queue sizes.
+    """
+
+    def __init__(
+        self,
+        crawler: CvprCrawler,
+        embedding_service: EmbeddingService,
+        supabase_client: SupabaseVectorClient | PostgresCopyClient | None,
+        embedding_batch_size: int = DEFAULT_BATCH_SIZE,
+        upsert_batch_size: int = 100,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        journal: CheckpointJournal | None = None,
+        upsert_max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        upsert_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        dedup_index: NearDuplicateIndex | None = None,
+    ) -> None:
+        if embedding_batch_size <= 0 or upsert_batch_size <= 0 or queue_size <= 0:
+            raise ValueError("batch sizes and queue_size must be positive")
+        self._crawler = crawler
+        self._embedding_service = embedding_service
+        self._supabase_client = supabase_client
+        self._embedding_batch_size = embedding_batch_size
+        self._upsert_batch_size = upsert_batch_size
+        self._queue_size = queue_size
+        self._journal = journal
+        self._upsert_max_bytes = upsert_max_bytes
+        self._upsert_in_flight = upsert_in_flight
+        self._dedup_index = dedup_index
+
+    async def run(
+        self,
+        limit: int | None = None,
+        failure_log: Path | None = None,
+        restored: Sequence[Article] = (),
+    ) -> PipelineResult:
+        """Run all stages to completion.
+
+        ``restored`` articles (e.g. replayed from a checkpoint journal) are fed in
+        ahead of the crawl: embedded ones go straight to the upsert stage.
+        """
+
+        result = PipelineResult()
+        crawl_stats = StageStats("crawl")
+        embed_stats = StageStats("embed")
+        upsert_stats = StageStats("upsert")
+        result.stages.extend([crawl_stats, embed_stats, upsert_stats])
+
+        crawled: asyncio.Queue[Article | None] = asyncio.Queue(maxsize=self._queue_size)
+        embedded: asyncio.Queue[Article | None] = asyncio.Queue(maxsize=self._queue_size)
+
+        stages = [
+            asyncio.create_task(
+                self._crawl_stage(crawled, embedded, result, crawl_stats, limit, restored)
+            ),
+            asyncio.create_task(self._embed_stage(crawled, embedded, result, embed_stats)),
+            asyncio.create_task(self._upsert_stage(embedded, result, upsert_stats)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            for stage in stages:
+                if not stage.done():
+                    stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+
+        if failure_log:
+            result.embedding.dump_failures(failure_log)
+
+        return result
+
+    async def _crawl_stage(
+        self,
+        output: asyncio.Queue[Article | None],
+        embedded: asyncio.Queue[Article | None],
+        result: PipelineResult,
+        stats: StageStats,
+        limit: int | None,
+        restored: Sequence[Article],
+    ) -> None:
+        for article in restored:
+            target = output if article.abstract_embedding is None else embedded
+            await target.put(article)
+
+        async for article in self._crawler.iter_articles(result.crawl, limit=limit):
+            stats.items += 1
+            if self._journal:
+                self._journal.record_article(article)
+            await output.put(article)
+        stats.finished_at = time.perf_counter()
+        await output.put(_END_OF_STREAM)
+
+    async def _embed_stage(
+        self,
+        source: asyncio.Queue[Article | None],
+        output: asyncio.Queue[Article | None],
+        result: PipelineResult,
+        stats: StageStats,
+    ) -> None:
+        finished = False
+        while not finished:
+            batch, finished = await _take_batch(source, self._embedding_batch_size)
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            job = await asyncio.to_thread(
+                self._embedding_service.embed_articles,
+                batch,
+                None,
+                self._embedding_batch_size,
+            )
+            stats.busy_seconds += time.perf_counter() - started
+            stats.items += len(batch)
+            stats.batches += 1
+            result.embedding.merge(job)
+            if self._journal:
+                self._journal.record_embeddings(batch)
+
+            for article in batch:
+                if article.abstract_embedding is not None:
+                    await output.put(article)
+        stats.finished_at = time.perf_counter()
+        await output.put(_END_OF_STREAM)
+
+    async def _upsert_stage(
+        self,
+        source: asyncio.Queue[Article | None],
+        result: PipelineResult,
+        stats: StageStats,
+    ) -> None:
+        finished = False
+        while not finished:
+            batch, finished = await _take_batch(
+                source,
+                self._upsert_batch_size,
+                wait_for_full=True,
+            )
+            if self._dedup_index is not None:
+                batch, duplicates = await asyncio.to_thread(self._dedup_index.filter, batch)
+                result.crawl.duplicates.extend(duplicates)
+                if self._journal and duplicates:
+                    # 除外した行は再開時に upsert し直さないよう完了扱いにする
+                    self._journal.mark_done(duplicate.url for duplicate in duplicates)
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            if self._supabase_client:
+                await asyncio.to_thread(
+                    self._supabase_client.upsert_articles_chunked,
+                    batch,
+                    batch_size=self._upsert_batch_size,
+                    max_batch_bytes=self._upsert_max_bytes,
+                    max_in_flight=self._upsert_in_flight,
+                )
+                result.upserted += len(batch)
+                if self._journal:
+                    self._journal.mark_upserted(batch)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.items += len(batch)
+            stats.batches += 1
+            logger.info("パイプライン upsert 進捗: total={total}", total=result.upserted)
+        stats.finished_at = time.perf_counter()
+
+
+async def _take_batch(
+    queue: asyncio.Queue[Article | None],
+    size: int,
+    wait_for_full: bool = False,
+) -> tuple[list[Article], bool]:
+    """Pull up to ``size`` items, returning ``(batch, end_of_stream_reached)``.
+
+    The first item is awaited; the rest are drained without waiting unless
+    ``wait_for_full`` is set, so that downstream work starts as early as possible.
+    """
+
+    batch: list[Article] = []
+    while len(batch) < size:
+        if batch and not wait_for_full and queue.empty():
+            break
+        item = await queue.get()
+        if item is _END_OF_STREAM:
+            return batch, True
+        batch.append(item)
+    return batch, False
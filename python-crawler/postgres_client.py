@@ -0,0 +1,174 @@
+"""Direct Postgres bulk loader using COPY, as an alternative to PostgREST upserts."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Sequence
+from types import ModuleType
+
+from loguru import logger
+
+from config import Settings
+from metrics import DURATION_BUCKETS, METRICS
+from models import Article, format_pgvector
+from supabase_client import SupabaseClientError
+
+# supabase_client と同名で登録するため、同じ系列に backend="copy" として記録される
+_UPSERT_DURATION = METRICS.histogram(
+    "upsert_batch_duration_seconds",
+    "Latency of one upsert request (successful attempt) by backend.",
+    buckets=DURATION_BUCKETS,
+)
+_UPSERT_ROWS = METRICS.counter("upsert_rows_total", "Rows written by upserts by backend.")
+
+_COLUMNS = ("title", "authors", "year", "url", "abstract", "abstract_embedding")
+
+_CREATE_STAGING = """
+create temp table articles_staging (
+    title text not null,
+    authors text not null,
+    year text not null,
+    url text not null,
+    abstract text not null,
+    abstract_embedding text
+) on commit drop
+"""
+
+_COPY_STAGING = f"copy articles_staging ({', '.join(_COLUMNS)}) from stdin"
+
+# 埋め込みの無い行で既存のベクトルを NULL に上書きしない (PostgREST 経路と同じ挙動)
+_MERGE_STAGING = f"""
+insert into public."Articles" ({", ".join(_COLUMNS)})
+select distinct on (url)
+    title, authors, year, url, abstract, abstract_embedding::vector
+from articles_staging
+order by url
+on conflict (url) do update set
+    title = excluded.title,
+    authors = excluded.authors,
+    year = excluded.year,
+    abstract = excluded.abstract,
+    abstract_embedding = coalesce(excluded.abstract_embedding, "Articles".abstract_embedding)
+"""
+
+
+class PostgresCopyClient:
+    """Loads articles with ``COPY ... FROM STDIN`` into a staging table plus one merge.
+
+    Offers the same upsert interface as ``SupabaseVectorClient`` so it can be
+    swapped in for initial loads and re-indexing. Requires the ``postgres`` extra.
+    """
+
+    def __init__(self, dsn: str) -> None:
+        self._dsn = dsn
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> PostgresCopyClient:
+        if not settings.database_url:
+            raise SupabaseClientError("SUPABASE_DB_URL is required for the copy backend")
+        return cls(settings.database_url)
+
+    def upsert_articles(self, articles: Sequence[Article]) -> None:
+        """Upsert articles into Postgres in a single transaction."""
+
+        self.upsert_articles_chunked(articles, batch_size=max(len(articles), 1))
+
+    def upsert_articles_chunked(
+        self,
+        articles: Sequence[Article],
+        batch_size: int = 100,
+        on_batch: Callable[[Sequence[Article]], None] | None = None,
+        max_batch_bytes: int | None = None,
+        max_in_flight: int | None = None,
+    ) -> None:
+        """Stream all articles through COPY and merge them with one ``ON CONFLICT`` insert.
+
+        Everything is committed in one transaction, so ``on_batch`` is invoked for
+        each ``batch_size`` slice only after the commit. ``max_batch_bytes`` and
+        ``max_in_flight`` only apply to the PostgREST client and are ignored here.
+        """
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if not articles:
+            logger.debug("Upsert対象のレコードが空のため処理をスキップします。")
+            return
+
+        psycopg = _import_psycopg()
+        logger.info("Postgres に COPY で {count} 件のレコードをロードします。", count=len(articles))
+        started = time.perf_counter()
+        try:
+            with psycopg.connect(self._dsn, prepare_threshold=None) as conn:
+                with conn.transaction(), conn.cursor() as cur:
+                    cur.execute(_CREATE_STAGING)
+                    with cur.copy(_COPY_STAGING) as copy:
+                        for article in articles:
+                            copy.write_row(_to_row(article))
+                    cur.execute(_MERGE_STAGING)
+                    merged = cur.rowcount
+        except psycopg.Error as exc:
+            logger.error("Postgres への COPY ロードでエラーが発生しました: {}", exc)
+            raise SupabaseClientError(str(exc)) from exc
+
+        _UPSERT_DURATION.observe(time.perf_counter() - started, backend="copy")
+        _UPSERT_ROWS.inc(len(articles), backend="copy")
+        logger.debug("Postgres merge 完了: rows={count}", count=merged)
+        if on_batch:
+            for start in range(0, len(articles), batch_size):
+                on_batch(articles[start : start + batch_size])
+
+    def delete_articles(self, urls: Sequence[str]) -> None:
+        """Delete stored articles by URL."""
+
+        psycopg = _import_psycopg()
+        try:
+            with psycopg.connect(self._dsn, prepare_threshold=None) as conn:
+                deleted = conn.execute(
+                    'delete from public."Articles" where url = any(%s)', (list(urls),)
+                ).rowcount
+        except psycopg.Error as exc:
+            logger.error("Postgres delete でエラーが発生しました: {}", exc)
+            raise SupabaseClientError(str(exc)) from exc
+        logger.info("Postgres から {count} 件のレコードを削除しました。", count=deleted)
+
+    def fetch_existing_urls(self, years: Sequence[int | str]) -> dict[str, bool]:
+        """Return stored article URLs for ``years`` mapped to whether they have an embedding."""
+
+        psycopg = _import_psycopg()
+        try:
+            with psycopg.connect(self._dsn, prepare_threshold=None) as conn:
+                rows = conn.execute(
+                    'select url, abstract_embedding is not null from public."Articles" '
+                    "where year = any(%s)",
+                    ([str(year) for year in years],),
+                ).fetchall()
+        except psycopg.Error as exc:
+            logger.error("Postgres select でエラーが発生しました: {}", exc)
+            raise SupabaseClientError(str(exc)) from exc
+        return dict(rows)
+
+
+def _to_row(article: Article) -> tuple[str | None, ...]:
+    embedding = (
+        format_pgvector(article.abstract_embedding)
+        if article.abstract_embedding is not None
+        else None
+    )
+    return (
+        article.title,
+        article.authors,
+        article.year,
+        str(article.url),
+        article.abstract,
+        embedding,
+    )
+
+
+def _import_psycopg() -> ModuleType:
+    try:
+        import psycopg
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise SupabaseClientError(
+            'psycopg is not installed; install the extra with `uv pip install -e ".[postgres]"`'
+        ) from exc
+    return psycopg
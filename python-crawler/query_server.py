@@ -0,0 +1,409 @@
+"""Long-lived HTTP server that turns search queries into e5 ``query:`` embeddings.
+
+Concurrent requests are coalesced into micro-batches so the model runs one
+forward pass per window instead of one per request, and recent query vectors
+are kept in a bounded LRU cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+from embedding import EMBEDDING_BACKENDS, EmbeddingService
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_STATS_WINDOW = 10_000
+MAX_QUERIES_PER_REQUEST = 64
+MAX_BODY_BYTES = 1_000_000
+
+
+class QueryServerError(RuntimeError):
+    """Raised for malformed embedding requests."""
+
+
+@dataclass(slots=True)
+class ServerStats:
+    """Rolling request latency and batch-size statistics."""
+
+    window: int = DEFAULT_STATS_WINDOW
+    requests: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    batches: int = 0
+    latencies: deque[float] = field(init=False)
+    batch_sizes: deque[int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.latencies = deque(maxlen=self.window)
+        self.batch_sizes = deque(maxlen=self.window)
+
+    def record_request(self, seconds: float) -> None:
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def record_batch(self, size: int) -> None:
+        self.batches += 1
+        self.batch_sizes.append(size)
+
+    def snapshot(self) -> dict[str, Any]:
+        latencies = np.asarray(self.latencies, dtype=np.float64) * 1000
+        sizes = np.asarray(self.batch_sizes, dtype=np.float64)
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "requests": self.requests,
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+                "p99": round(float(np.percentile(latencies, 99)), 3) if len(latencies) else None,
+            },
+            "batches": self.batches,
+            "batch_size": {
+                "mean": round(float(sizes.mean()), 2) if len(sizes) else None,
+                "max": int(sizes.max()) if len(sizes) else None,
+            },
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": round(self.cache_hits / lookups, 4) if lookups else None,
+            },
+        }
+
+
+class QueryBatcher:
+    """Coalesce concurrent ``embed`` calls into micro-batches with an LRU in front."""
+
+    def __init__(
+        self,
+        service: EmbeddingService,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT_MS / 1000,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        stats: ServerStats | None = None,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+        self._service = service
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        # 同じクエリが同時に来た場合は 1 回だけエンコードする
+        self._inflight: dict[str, asyncio.Future[np.ndarray]] = {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        # モデル呼び出しは 1 スレッドに直列化し、バッチ同士が CPU を奪い合わないようにする
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embed")
+        self._worker: asyncio.Task[None] | None = None
+        self.stats = stats or ServerStats()
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._service.warm_up)
+        self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        self._executor.shutdown(wait=True)
+
+    async def embed(self, query: str) -> np.ndarray:
+        key = " ".join(query.split())
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            return cached
+
+        self.stats.cache_misses += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._queue.put_nowait(key)
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            await self._encode(batch)
+
+    async def _encode(self, batch: Sequence[str]) -> None:
+        loop = asyncio.get_running_loop()
+        self.stats.record_batch(len(batch))
+        try:
+            vectors = await loop.run_in_executor(
+                self._executor,
+                self._service.embed_queries,
+                list(batch),
+            )
+        except Exception as exc:
+            logger.error(
+                "クエリ埋め込みに失敗しました: size={size} error={error}",
+                size=len(batch),
+                error=exc,
+            )
+            for key in batch:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, vector in zip(batch, vectors, strict=True):
+            self._remember(key, vector)
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+
+class QueryServer:
+    """Minimal asyncio HTTP/1.1 front end for :class:`QueryBatcher`.
+
+    ``POST /embed`` accepts ``{"query": "..."}`` or ``{"queries": [...]}`` and
+    returns ``{"embedding": [...]}`` / ``{"embeddings": [[...], ...]}``;
+    ``GET /stats`` returns latency and batching statistics.
+    """
+
+    def __init__(
+        self,
+        batcher: QueryBatcher,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ) -> None:
+        self._batcher = batcher
+        self._host = host
+        self._port = port
+
+    async def serve_forever(self) -> None:
+        await self._batcher.start()
+        server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+        logger.info(
+            "クエリ埋め込みサーバーを起動しました: http://{host}:{port}",
+            host=self._host,
+            port=self._port,
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self._batcher.close()
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, path, version = request_line.decode("latin-1").split(" ", 2)
+                headers = await _read_headers(reader)
+                length = int(headers.get("content-length", "0"))
+                if length > MAX_BODY_BYTES:
+                    await _write_response(writer, 413, {"error": "request body too large"}, False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._dispatch(method, path.split("?", 1)[0], body)
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version.strip() == "HTTP/1.1"
+                )
+                await _write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        if method == "GET" and path == "/healthz":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/stats":
+            return 200, self._batcher.stats.snapshot()
+        if method != "POST" or path != "/embed":
+            return 404, {"error": "not found"}
+
+        started = time.perf_counter()
+        try:
+            queries, single = _parse_queries(body)
+        except QueryServerError as exc:
+            return 400, {"error": str(exc)}
+        results = await asyncio.gather(
+            *(self._batcher.embed(query) for query in queries),
+            return_exceptions=True,
+        )
+        vectors = [result for result in results if not isinstance(result, BaseException)]
+        if len(vectors) < len(results):
+            # 失敗の詳細は _encode で記録済みのため、ここでは件数だけを残す
+            logger.error(
+                "埋め込みリクエストに失敗しました: queries={count} failed={failed}",
+                count=len(queries),
+                failed=len(results) - len(vectors),
+            )
+            return 500, {"error": "failed to embed queries"}
+        self._batcher.stats.record_request(time.perf_counter() - started)
+        if single:
+            return 200, {"embedding": vectors[0].tolist()}
+        return 200, {"embeddings": [vector.tolist() for vector in vectors]}
+
+
+def _parse_queries(body: bytes) -> tuple[list[str], bool]:
+    try:
+        data = json.loads(body or b"{}")
+    except json.JSONDecodeError as exc:
+        raise QueryServerError("Invalid JSON payload") from exc
+    if not isinstance(data, dict):
+        raise QueryServerError("Invalid JSON payload")
+
+    if isinstance(data.get("query"), str):
+        queries, single = [data["query"]], True
+    elif isinstance(data.get("queries"), list):
+        queries, single = data["queries"], False
+    else:
+        raise QueryServerError("query もしくは queries を指定してください")
+
+    if not queries or len(queries) > MAX_QUERIES_PER_REQUEST:
+        raise QueryServerError(f"queries must contain 1-{MAX_QUERIES_PER_REQUEST} items")
+    if not all(isinstance(query, str) and query.strip() for query in queries):
+        raise QueryServerError("queries must be non-empty strings")
+    return queries, single
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: dict[str, Any],
+    keep_alive: bool,
+) -> None:
+    reasons = {
+        200: "OK",
+        400: "Bad Request",
+        404: "Not Found",
+        413: "Payload Too Large",
+        500: "Internal Server Error",
+    }
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {reasons.get(status, 'Error')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="検索クエリ用の埋め込みサーバー")
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"待ち受けアドレス (デフォルト: {DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"待ち受けポート (デフォルト: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--model",
+        default="intfloat/multilingual-e5-large",
+        help="埋め込みモデル名 (デフォルト: intfloat/multilingual-e5-large)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=EMBEDDING_BACKENDS,
+        default="torch",
+        help="埋め込みバックエンド (デフォルト: torch)",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=DEFAULT_MAX_BATCH_SIZE,
+        help=f"1 回のモデル呼び出しにまとめるクエリ数の上限 (デフォルト: {DEFAULT_MAX_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT_MS,
+        help=f"バッチを締め切るまでの待ち時間 (ミリ秒, デフォルト: {DEFAULT_MAX_WAIT_MS})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"クエリベクトルの LRU キャッシュ件数 (デフォルト: {DEFAULT_CACHE_SIZE})",
+    )
+    return parser
+
+
+def main() -> None:
+    from logging_config import configure_logging
+
+    args = build_parser().parse_args()
+    configure_logging()
+
+    service = EmbeddingService(args.model, backend=args.backend)
+    batcher = QueryBatcher(
+        service,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        cache_size=args.cache_size,
+    )
+    try:
+        asyncio.run(QueryServer(batcher, host=args.host, port=args.port).serve_forever())
+    except KeyboardInterrupt:  # pragma: no cover - interactive stop
+        logger.info("クエリ埋め込みサーバーを停止しました。")
+
+
+if __name__ == "__main__":  # pragma: no cover - script entry
+    main()
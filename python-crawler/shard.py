@@ -0,0 +1,255 @@
+"""Deterministic URL sharding across nodes and merging of per-shard run reports.
+
+Each node runs ``main.py --shard INDEX/COUNT --shard-report PATH`` and only
+fetches, embeds and upserts listing entries whose URL hashes to its shard.
+``python shard.py merge`` combines the per-shard reports: counts, crawl and
+embedding failures, and title duplicates that only show up across shards.
+Title dedup runs per shard, so those cross-shard duplicates have already been
+upserted by their shards; ``--delete-cross-shard`` deletes the losing copies
+so the table ends up as after an unsharded run.
+
+Usage (from ``python-crawler/``)::
+
+    uv run python shard.py merge reports/shard-*.json --output reports/merged.json
+    uv run python shard.py merge reports/shard-*.json --delete-cross-shard
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from crawler import CrawlResult
+from embedding import EmbeddingJobResult
+
+if TYPE_CHECKING:
+    from postgres_client import PostgresCopyClient
+    from supabase_client import SupabaseVectorClient
+
+    ArticleStore = SupabaseVectorClient | PostgresCopyClient
+
+SHARD_REPORT_VERSION = 1
+
+
+class ShardError(ValueError):
+    """Raised for malformed shard specs or inconsistent shard reports."""
+
+
+@dataclass(slots=True, frozen=True)
+class ShardSpec:
+    """``index`` of ``count`` equal partitions of the URL space."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count <= 0 or not 0 <= self.index < self.count:
+            raise ShardError(f"invalid shard {self.index}/{self.count}")
+
+    @classmethod
+    def parse(cls, raw: str) -> ShardSpec:
+        """Parse ``"INDEX/COUNT"`` (e.g. ``"0/4"``)."""
+
+        index, sep, count = raw.partition("/")
+        if not sep:
+            raise ShardError(f"shard must be INDEX/COUNT: {raw!r}")
+        try:
+            return cls(int(index), int(count))
+        except ValueError as exc:
+            raise ShardError(f"shard must be INDEX/COUNT: {raw!r}") from exc
+
+    def owns(self, url: str) -> bool:
+        return shard_of(url, self.count) == self.index
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def shard_of(url: str, count: int) -> int:
+    """Stable shard number for ``url``; unlike ``hash()`` it does not vary per process."""
+
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def write_shard_report(
+    path: Path,
+    shard: ShardSpec,
+    crawl: CrawlResult,
+    embedding: EmbeddingJobResult | None = None,
+    upserted: int = 0,
+) -> None:
+    """Write what one shard produced, in the form :func:`merge_shard_reports` reads."""
+
+    report = {
+        "version": SHARD_REPORT_VERSION,
+        "shard": {"index": shard.index, "count": shard.count},
+        "summary": crawl.summary(),
+        "per_year_counts": dict(crawl.per_year_counts),
+        "scheduled": crawl.scheduled,
+        "skipped": crawl.skipped,
+        "failures": crawl.failures,
+        "duplicates": [duplicate.as_dict() for duplicate in crawl.duplicates],
+        # 正規化タイトル -> URL。シャードをまたぐ重複の検出に使う
+        "titles": crawl.seen_titles,
+        "embedding": {
+            "processed": embedding.processed if embedding else 0,
+            "failed": embedding.failed if embedding else [],
+        },
+        "upserted": upserted,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info("シャード {shard} のレポートを書き出しました: {path}", shard=shard, path=path)
+
+
+def merge_shard_reports(reports: Sequence[dict[str, Any]]) -> dict[str, Any]:
+    """Combine per-shard reports; the lowest shard index keeps a title seen in several shards.
+
+    The other copies are listed in ``cross_shard_duplicates`` and left out of
+    ``total``; they stay in the table until :func:`delete_cross_shard_duplicates`
+    removes them. Every shard fetches every listing, so crawl failures are
+    deduplicated by URL.
+    """
+
+    if not reports:
+        raise ShardError("no shard reports to merge")
+    counts = {report["shard"]["count"] for report in reports}
+    if len(counts) != 1:
+        raise ShardError(f"reports come from different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    ordered = sorted(reports, key=lambda report: report["shard"]["index"])
+    indices = [report["shard"]["index"] for report in ordered]
+    if len(set(indices)) != len(indices):
+        raise ShardError(f"duplicate shard reports: {indices}")
+
+    per_year_counts: Counter[str] = Counter()
+    titles: dict[str, str] = {}
+    cross_shard: list[dict[str, Any]] = []
+    merged: dict[str, Any] = {
+        "shards": count,
+        "missing_shards": sorted(set(range(count)) - set(indices)),
+        "scheduled": 0,
+        "skipped": 0,
+        "failures": [],
+        "duplicates": [],
+        "embedding": {"processed": 0, "failed": []},
+        "upserted": 0,
+    }
+    for report in ordered:
+        per_year_counts.update(report["per_year_counts"])
+        merged["scheduled"] += report["scheduled"]
+        merged["skipped"] += report["skipped"]
+        merged["failures"].extend(report["failures"])
+        merged["duplicates"].extend(report["duplicates"])
+        merged["embedding"]["processed"] += report["embedding"]["processed"]
+        merged["embedding"]["failed"].extend(report["embedding"]["failed"])
+        merged["upserted"] += report["upserted"]
+        for key, url in report["titles"].items():
+            matched_url = titles.setdefault(key, url)
+            if matched_url != url:
+                cross_shard.append(
+                    {
+                        "url": url,
+                        "matched_url": matched_url,
+                        "reason": "title",
+                        "shard": report["shard"]["index"],
+                    }
+                )
+    merged["failures"] = list(dict.fromkeys(merged["failures"]))
+    merged["per_year_counts"] = dict(sorted(per_year_counts.items()))
+    merged["total"] = sum(per_year_counts.values()) - len(cross_shard)
+    merged["cross_shard_duplicates"] = cross_shard
+    return merged
+
+
+def delete_cross_shard_duplicates(merged: dict[str, Any], store: ArticleStore) -> list[str]:
+    """Delete the losing copies of cross-shard title duplicates and return their URLs."""
+
+    urls = [duplicate["url"] for duplicate in merged["cross_shard_duplicates"]]
+    if urls:
+        store.delete_articles(urls)
+    return urls
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="シャード実行のレポート集約")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge", help="シャードごとのレポートを 1 つにまとめる")
+    merge.add_argument("reports", nargs="+", type=Path, help="--shard-report で書き出した JSON")
+    merge.add_argument("--output", type=Path, default=None, help="集約結果 JSON の保存先")
+    merge.add_argument(
+        "--delete-cross-shard",
+        action="store_true",
+        help="別シャードで取得された同名の論文のうち、シャード番号の大きい側をテーブルから削除",
+    )
+    merge.add_argument(
+        "--upsert-backend",
+        choices=("postgrest", "copy"),
+        default="postgrest",
+        help="削除に使う接続先 (main.py の --upsert-backend と同じ)",
+    )
+    return parser
+
+
+def main() -> None:
+    from logging_config import configure_logging
+
+    args = build_parser().parse_args()
+    configure_logging()
+
+    try:
+        merged = merge_shard_reports(
+            [json.loads(path.read_text(encoding="utf-8")) for path in args.reports]
+        )
+    except ShardError as exc:
+        logger.error("シャードレポートの集約に失敗しました: {}", exc)
+        raise SystemExit(1) from exc
+    if merged["cross_shard_duplicates"] and args.delete_cross_shard:
+        from config import SettingsError, get_settings
+        from postgres_client import PostgresCopyClient
+        from supabase_client import SupabaseClientError, SupabaseVectorClient
+
+        try:
+            settings = get_settings()
+            store: ArticleStore = (
+                PostgresCopyClient.from_settings(settings)
+                if args.upsert_backend == "copy"
+                else SupabaseVectorClient.from_settings(settings)
+            )
+            merged["deleted"] = delete_cross_shard_duplicates(merged, store)
+        except (SettingsError, SupabaseClientError) as exc:
+            logger.error("シャード間の重複の削除に失敗しました: {}", exc)
+            raise SystemExit(1) from exc
+    elif merged["cross_shard_duplicates"]:
+        logger.warning(
+            "別シャードで取得された同名の論文 {count} 件はテーブルに残っています "
+            "(cross_shard_duplicates を参照、--delete-cross-shard で削除できます)。",
+            count=len(merged["cross_shard_duplicates"]),
+        )
+    if merged["missing_shards"]:
+        logger.warning("レポートが無いシャードがあります: {}", merged["missing_shards"])
+    logger.info(
+        "集約結果: total={total}, failures={failures}, duplicates={duplicates}, "
+        "cross_shard_duplicates={cross}, embedding_failures={embedding}, upserted={upserted}",
+        total=merged["total"],
+        failures=len(merged["failures"]),
+        duplicates=len(merged["duplicates"]),
+        cross=len(merged["cross_shard_duplicates"]),
+        embedding=len(merged["embedding"]["failed"]),
+        upserted=merged["upserted"],
+    )
+    if args.output:
+        args.output.write_text(json.dumps(merged, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":  # pragma: no cover - script entry
+    main()
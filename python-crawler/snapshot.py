@@ -0,0 +1,182 @@
+"""Columnar on-disk snapshots of the article corpus.
+
+A snapshot is a directory holding ``articles.parquet`` (one row per article,
+with ``embedding_row`` pointing into the matrix or ``-1``), ``embeddings.npy``
+(a float32 ``rows x dimension`` matrix that is memory-mapped on load) and a
+small ``manifest.json``. pyarrow is an optional dependency (``.[snapshot]``).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+from models import Article
+
+SNAPSHOT_FORMAT_VERSION = 1
+METADATA_FILE = "articles.parquet"
+EMBEDDINGS_FILE = "embeddings.npy"
+MANIFEST_FILE = "manifest.json"
+DEFAULT_READ_BATCH_SIZE = 1024
+
+_METADATA_COLUMNS = ("id", "title", "authors", "year", "url", "abstract")
+
+
+class SnapshotError(RuntimeError):
+    """Raised when a snapshot cannot be written or read."""
+
+
+def write_snapshot(
+    path: Path,
+    articles: Sequence[Article],
+    model_name: str | None = None,
+) -> int:
+    """Write ``articles`` (and any embeddings they carry) to the snapshot directory ``path``.
+
+    Returns the number of rows in the embedding matrix.
+    """
+
+    pa, pq = _import_pyarrow()
+    embedded = [article for article in articles if article.abstract_embedding is not None]
+    dimension = len(embedded[0].abstract_embedding) if embedded else 0
+    path.mkdir(parents=True, exist_ok=True)
+
+    # 埋め込みは 1 本の float32 行列として書き出し、読み込み側で mmap できるようにする
+    matrix = np.lib.format.open_memmap(
+        path / EMBEDDINGS_FILE,
+        mode="w+",
+        dtype=np.float32,
+        shape=(len(embedded), dimension),
+    )
+    embedding_rows: list[int] = []
+    row = 0
+    for article in articles:
+        if article.abstract_embedding is None:
+            embedding_rows.append(-1)
+            continue
+        if len(article.abstract_embedding) != dimension:
+            raise SnapshotError(
+                f"embedding dimension mismatch: {article.url} has {len(article.abstract_embedding)}"
+            )
+        matrix[row] = article.abstract_embedding
+        embedding_rows.append(row)
+        row += 1
+    matrix.flush()
+    del matrix
+
+    columns: dict[str, list[Any]] = {
+        "id": [str(article.id) if article.id else None for article in articles],
+        "title": [article.title for article in articles],
+        "authors": [article.authors for article in articles],
+        "year": [article.year for article in articles],
+        "url": [str(article.url) for article in articles],
+        "abstract": [article.abstract for article in articles],
+    }
+    table = pa.table(
+        {
+            **{name: pa.array(columns[name], type=pa.string()) for name in _METADATA_COLUMNS},
+            "embedding_row": pa.array(embedding_rows, type=pa.int32()),
+        }
+    )
+    pq.write_table(table, path / METADATA_FILE, compression="zstd")
+
+    manifest = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "model_name": model_name,
+        "rows": len(articles),
+        "embedded": len(embedded),
+        "dimension": dimension,
+        "created_at": time.time(),
+    }
+    (path / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    logger.info(
+        "スナップショットを書き出しました: {path} rows={rows} embedded={embedded}",
+        path=path,
+        rows=len(articles),
+        embedded=len(embedded),
+    )
+    return len(embedded)
+
+
+class ArticleSnapshot:
+    """Read-only view of a snapshot directory written by :func:`write_snapshot`.
+
+    ``embeddings`` is memory-mapped, so offline analysis can slice the matrix
+    without loading it; articles yielded by :meth:`iter_articles` hold row
+    views into the same mapping.
+    """
+
+    def __init__(self, path: Path, mmap: bool = True) -> None:
+        manifest_path = path / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise SnapshotError(f"snapshot manifest not found: {manifest_path}")
+        self.manifest: dict[str, Any] = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if self.manifest.get("version") != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotError(f"unsupported snapshot format: {self.manifest.get('version')}")
+        self.path = path
+        self.embeddings: np.ndarray = np.load(
+            path / EMBEDDINGS_FILE,
+            mmap_mode="r" if mmap else None,
+            allow_pickle=False,
+        )
+
+    def __len__(self) -> int:
+        return int(self.manifest["rows"])
+
+    @property
+    def model_name(self) -> str | None:
+        return self.manifest.get("model_name")
+
+    def iter_batches(self, batch_size: int = DEFAULT_READ_BATCH_SIZE) -> Iterator[list[Article]]:
+        """Yield articles in file order, ``batch_size`` Parquet rows at a time."""
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        _, pq = _import_pyarrow()
+        metadata = pq.ParquetFile(self.path / METADATA_FILE)
+        for batch in metadata.iter_batches(batch_size=batch_size):
+            yield [self._to_article(row) for row in batch.to_pylist()]
+
+    def iter_articles(self, batch_size: int = DEFAULT_READ_BATCH_SIZE) -> Iterator[Article]:
+        for batch in self.iter_batches(batch_size):
+            yield from batch
+
+    def articles(self) -> list[Article]:
+        return list(self.iter_articles())
+
+    def _to_article(self, row: dict[str, Any]) -> Article:
+        embedding_row = row.pop("embedding_row")
+        article = Article.model_validate(
+            {key: value for key, value in row.items() if value is not None}
+        )
+        if embedding_row >= 0:
+            article.abstract_embedding = self.embeddings[embedding_row]
+        return article
+
+
+def load_snapshot(path: Path, mmap: bool = True) -> ArticleSnapshot:
+    snapshot = ArticleSnapshot(path, mmap=mmap)
+    logger.info(
+        "スナップショットを読み込みました: {path} rows={rows} embedded={embedded}",
+        path=path,
+        rows=len(snapshot),
+        embedded=snapshot.manifest.get("embedded"),
+    )
+    return snapshot
+
+
+def _import_pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise SnapshotError(
+            'pyarrow is not installed; install the extra with `uv pip install -e ".[snapshot]"`'
+        ) from exc
+    return pa, pq
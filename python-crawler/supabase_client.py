@@ -2,18 +2,67 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator, Sequence
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
 
+import httpx
 from loguru import logger
+from postgrest import APIError, ReturnMethod
 from supabase import Client, create_client
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from config import Settings
-from models import Article, UpsertPayload
+from metrics import DURATION_BUCKETS, METRICS
+from models import Article, UpsertPayload, parse_pgvector
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_MAX_BATCH_BYTES = 2_000_000
+DEFAULT_MAX_IN_FLIGHT = 4
+# in.(...) フィルタは URL のクエリ文字列に載るため、1 リクエストの件数を抑える
+DEFAULT_DELETE_CHUNK = 100
+
+
+_UPSERT_DURATION = METRICS.histogram(
+    "upsert_batch_duration_seconds",
+    "Latency of one upsert request (successful attempt) by backend.",
+    buckets=DURATION_BUCKETS,
+)
+_UPSERT_ROWS = METRICS.counter("upsert_rows_total", "Rows written by upserts by backend.")
+_UPSERT_RETRIES = METRICS.counter("upsert_retries_total", "Retried upsert batches.")
+
+
+def _count_retry(retry_state: RetryCallState) -> None:
+    _UPSERT_RETRIES.inc(backend="postgrest")
+    logger.warning(
+        "upsert バッチを再試行します: attempt={attempt} error={error}",
+        attempt=retry_state.attempt_number,
+        error=retry_state.outcome.exception() if retry_state.outcome else None,
+    )
 
 
 class SupabaseClientError(RuntimeError):
-    """Raised when Supabase operations fail."""
+    """Raised when Supabase operations fail.
+
+    ``retryable`` is set for transient failures: transport errors and responses
+    with a 5xx or 429 status.
+    """
+
+    def __init__(self, message: str, retryable: bool = False) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, SupabaseClientError) and exc.retryable
 
 
 class SupabaseVectorClient:
@@ -27,9 +76,8 @@ class SupabaseVectorClient:
         client = create_client(str(settings.supabase_url), settings.supabase_service_role_key)
         return cls(client)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
     def upsert_articles(self, articles: Sequence[Article]) -> None:
-        """Upsert articles into Supabase."""
+        """Upsert articles into Supabase as a single request."""
 
         payload = UpsertPayload(articles=list(articles))
         records = payload.to_records()
@@ -37,45 +85,260 @@ class SupabaseVectorClient:
             logger.debug("Upsert対象のレコードが空のため処理をスキップします。")
             return
 
+        self._upsert_records(records)
+
+    def upsert_articles_chunked(
+        self,
+        articles: Sequence[Article],
+        batch_size: int = 100,
+        on_batch: Callable[[Sequence[Article]], None] | None = None,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        """Upsert articles in batches to avoid payload limits.
+
+        Batches are closed at ``batch_size`` rows or ``max_batch_bytes`` of
+        serialized JSON, whichever comes first, and up to ``max_in_flight`` of them
+        are sent concurrently over the client's connection pool. Each batch is
+        retried on its own; ``on_batch`` is called (from the calling thread) with
+        each batch once it has been stored.
+        """
+
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+
+        batches = _byte_budget_batches(articles, batch_size, max_batch_bytes)
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            in_flight: dict[Future[None], Sequence[Article]] = {}
+            try:
+                for index, (chunk, records, size) in enumerate(batches, start=1):
+                    logger.debug(
+                        "バッチ {batch} (size={size}, bytes={nbytes}) をアップサートします。",
+                        batch=index,
+                        size=len(chunk),
+                        nbytes=size,
+                    )
+                    in_flight[pool.submit(self._upsert_records, records)] = chunk
+                    if len(in_flight) >= max_in_flight:
+                        self._drain(in_flight, on_batch, FIRST_COMPLETED)
+                self._drain(in_flight, on_batch, ALL_COMPLETED)
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+    def _drain(
+        self,
+        in_flight: dict[Future[None], Sequence[Article]],
+        on_batch: Callable[[Sequence[Article]], None] | None,
+        return_when: str,
+    ) -> None:
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            chunk = in_flight.pop(future)
+            future.result()
+            if on_batch:
+                on_batch(chunk)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=8),
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+        before_sleep=_count_retry,
+    )
+    def _upsert_records(self, records: list[dict[str, Any]]) -> None:
         logger.info("Supabase に {count} 件のレコードを upsert します。", count=len(records))
-        response = (
-            self._client.table("Articles")
-            .upsert(records, on_conflict="url")
-            .execute()
+        started = time.perf_counter()
+        _execute(
+            self._client.table("Articles").upsert(
+                records, on_conflict="url", returning=ReturnMethod.minimal
+            ),
+            "upsert",
         )
+        _UPSERT_DURATION.observe(time.perf_counter() - started, backend="postgrest")
+        _UPSERT_ROWS.inc(len(records), backend="postgrest")
+        logger.debug("Supabase upsert 完了: rows={count}", count=len(records))
+
+    def delete_articles(
+        self,
+        urls: Sequence[str],
+        chunk_size: int = DEFAULT_DELETE_CHUNK,
+    ) -> None:
+        """Delete stored articles by URL."""
 
-        if getattr(response, "error", None):
-            logger.error("Supabase upsert でエラーが発生しました: {}", response.error)
-            raise SupabaseClientError(str(response.error))
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        for start in range(0, len(urls), chunk_size):
+            chunk = list(urls[start : start + chunk_size])
+            _execute(
+                self._client.table("Articles")
+                .delete(returning=ReturnMethod.minimal)
+                .in_("url", chunk),
+                "delete",
+            )
+        logger.info("Supabase から {count} 件のレコードを削除しました。", count=len(urls))
+
+    def fetch_existing_urls(
+        self,
+        years: Sequence[int | str],
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> dict[str, bool]:
+        """Return stored article URLs for ``years`` mapped to whether they have an embedding."""
 
-        logger.debug("Supabase upsert 完了: {}", response.data)
+        year_values = [str(year) for year in years]
+        existing = dict.fromkeys(
+            self._select_urls(year_values, page_size, embedded_only=False),
+            False,
+        )
+        for url in self._select_urls(year_values, page_size, embedded_only=True):
+            existing[url] = True
+
+        logger.info(
+            "Supabase 上の既存レコード: total={total}, with_embedding={embedded}",
+            total=len(existing),
+            embedded=sum(existing.values()),
+        )
+        return existing
 
-    def upsert_articles_chunked(self, articles: Sequence[Article], batch_size: int = 100) -> None:
-        """Upsert articles in batches to avoid payload limits."""
+    def _select_urls(
+        self,
+        years: Sequence[str],
+        page_size: int,
+        embedded_only: bool,
+    ) -> Iterator[str]:
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
 
-        for index, chunk in enumerate(_chunked(articles, batch_size), start=1):
-            logger.debug(
-                "バッチ {batch} (size={size}) をアップサートします。",
-                batch=index,
-                size=len(chunk),
+        start = 0
+        while True:
+            query = self._client.table("Articles").select("url").in_("year", list(years))
+            if embedded_only:
+                query = query.not_.is_("abstract_embedding", "null")
+            response = _execute(query.order("url").range(start, start + page_size - 1), "select")
+
+            rows = response.data or []
+            for row in rows:
+                yield row["url"]
+            if len(rows) < page_size:
+                return
+            start += page_size
+
+    def iter_articles(
+        self,
+        years: Sequence[int | str] | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Article]:
+        """Page through stored articles (including embeddings), optionally filtered by year."""
+
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+
+        start = 0
+        while True:
+            query = self._client.table("Articles").select(
+                "id,title,authors,year,url,abstract,abstract_embedding"
             )
-            self.upsert_articles(chunk)
+            if years:
+                query = query.in_("year", [str(year) for year in years])
+            response = _execute(query.order("url").range(start, start + page_size - 1), "select")
+
+            rows = response.data or []
+            for row in rows:
+                row["abstract_embedding"] = parse_pgvector(row.get("abstract_embedding"))
+                yield Article.model_validate(row)
+            if len(rows) < page_size:
+                return
+            start += page_size
 
     def list_articles(self, limit: int = 5) -> Iterable[Article]:
         """Fetch a limited number of articles for health checks."""
 
-        response = self._client.table("Articles").select("*").limit(limit).execute()
-        if getattr(response, "error", None):
-            logger.error("Supabase select でエラーが発生しました: {}", response.error)
-            raise SupabaseClientError(str(response.error))
+        response = _execute(self._client.table("Articles").select("*").limit(limit), "select")
 
         items = response.data or []
         logger.debug("取得したレコード数: {}", len(items))
         return [Article.model_validate(item) for item in items]
 
 
-def _chunked(items: Sequence[Article], size: int) -> Iterator[Sequence[Article]]:
-    if size <= 0:
+def _execute(query: Any, operation: str) -> Any:
+    """Run a PostgREST query, raising ``SupabaseClientError`` for API and transport errors."""
+
+    try:
+        response = query.execute()
+    except (APIError, httpx.HTTPError) as exc:
+        logger.error(
+            "Supabase {operation} でエラーが発生しました: {error}", operation=operation, error=exc
+        )
+        raise SupabaseClientError(str(exc), retryable=_is_transient(exc)) from exc
+    if getattr(response, "error", None):
+        logger.error(
+            "Supabase {operation} でエラーが発生しました: {error}",
+            operation=operation,
+            error=response.error,
+        )
+        raise SupabaseClientError(str(response.error))
+    return response
+
+
+# PostgREST が 5xx で応答する SQLSTATE クラスとエラーコードの接頭辞
+_SERVER_ERROR_PREFIXES = tuple(
+    "08 09 25 2D 38 39 3B 40 53 54 55 57 58 F0 HV P0 XX PGRST0 PGRSTX".split()
+)
+# 上の接頭辞に含まれるが 4xx で応答するコード
+_CLIENT_ERROR_CODES = frozenset({"25006", "P0001"})
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Whether ``exc`` is a transport error or a 5xx/429 response worth retrying."""
+
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return _is_transient_status(exc.response.status_code)
+    if not isinstance(exc, APIError):
+        return False
+    code = exc.code
+    if isinstance(code, int):
+        # 本文が PostgREST の JSON でない応答 (ゲートウェイの 502/503/429 など) は
+        # HTTP ステータスがそのまま code に入る
+        return _is_transient_status(code)
+    # PostgREST のエラー本文には HTTP ステータスが無いため、コードから 5xx になるものを判定する
+    return (
+        bool(code) and code.startswith(_SERVER_ERROR_PREFIXES) and code not in _CLIENT_ERROR_CODES
+    )
+
+
+def _is_transient_status(status: int) -> bool:
+    return status >= 500 or status == 429
+
+
+def _byte_budget_batches(
+    articles: Sequence[Article],
+    max_rows: int,
+    max_bytes: int,
+) -> Iterator[tuple[Sequence[Article], list[dict[str, Any]], int]]:
+    """Yield ``(articles, records, payload_bytes)`` groups bounded by rows and bytes.
+
+    A single record larger than ``max_bytes`` still forms its own batch.
+    """
+
+    if max_rows <= 0:
         raise ValueError("batch_size must be positive")
-    for start in range(0, len(items), size):
-        yield items[start : start + size]
+    if max_bytes <= 0:
+        raise ValueError("max_batch_bytes must be positive")
+
+    chunk: list[Article] = []
+    records: list[dict[str, Any]] = []
+    size = 2  # 配列の "[" と "]"
+    for article in articles:
+        record = article.to_supabase_record()
+        record_size = len(json.dumps(record, ensure_ascii=False).encode("utf-8")) + 1
+        if chunk and (len(chunk) >= max_rows or size + record_size > max_bytes):
+            yield chunk, records, size
+            chunk, records, size = [], [], 2
+        chunk.append(article)
+        records.append(record)
+        size += record_size
+    if chunk:
+        yield chunk, records, size
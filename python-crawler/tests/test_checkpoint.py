@@ -0,0 +1,135 @@
+"""Resuming a streaming pipeline run from the SQLite checkpoint journal."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from collections.abc import Sequence
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+from checkpoint import CheckpointJournal, open_journal
+from crawler import CvprCrawler, build_sources
+from dedup import NearDuplicateIndex
+from embedding import EmbeddingService
+from models import Article
+from pipeline import StreamingPipeline
+
+PAPER_PREFIX = "/content/CVPR2024/html/"
+# P_002 は P_000 と同じ abstract を持ち、近似重複として除外される
+ABSTRACTS = ["topic 0", "topic 1", "topic 0"]
+
+
+class TopicEncoder:
+    """One-hot vector per trailing topic number, so equal abstracts are duplicates."""
+
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode(self, sentences: Sequence[str], **_: object) -> np.ndarray:
+        self.encoded.extend(sentences)
+        vectors = np.zeros((len(sentences), 4), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            vectors[row, int(text[-1])] = 1.0
+        return vectors
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.upserted: list[str] = []
+
+    def upsert_articles_chunked(self, articles: Sequence[Article], **_: object) -> None:
+        self.upserted.extend(str(article.url) for article in articles)
+
+
+def paper_path(index: int) -> str:
+    return f"{PAPER_PREFIX}P_{index:03d}_CVPR_2024_paper.html"
+
+
+def site(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/CVPR2024":
+        return httpx.Response(
+            200,
+            text="<html><body><dl>"
+            + "".join(
+                f'<dt class="ptitle"><br><a href="{paper_path(index)}">Paper {index}</a></dt>'
+                for index in range(len(ABSTRACTS))
+            )
+            + "</dl></body></html>",
+        )
+    index = int(request.url.path.removeprefix(PAPER_PREFIX)[2:5])
+    return httpx.Response(
+        200,
+        text='<html><body><div id="authors"><b><i>Author A</i></b>; CVPR 2024</div>'
+        f'<div id="abstract">{ABSTRACTS[index]}</div></body></html>',
+    )
+
+
+def run_pipeline(
+    journal: CheckpointJournal,
+    store: RecordingStore | None,
+    encoder: TopicEncoder,
+    restored: Sequence[Article] = (),
+) -> None:
+    service = EmbeddingService("intfloat/multilingual-e5-large")
+    service._model = encoder
+    crawler = CvprCrawler(
+        sources=build_sources([2024]),
+        transport=httpx.MockTransport(site),
+        skip_urls=journal.known_urls(),
+    )
+    pipeline = StreamingPipeline(
+        crawler,
+        service,
+        store,
+        journal=journal,
+        dedup_index=NearDuplicateIndex(threshold=0.95),
+    )
+    asyncio.run(pipeline.run(restored=restored))
+
+
+def test_resume_upserts_pending_rows_without_recomputing_embeddings(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoint.sqlite3"
+
+    # 1 回目は upsert 先なしで実行し、埋め込みまで済んだ状態で中断したことにする
+    with open_journal(path, resume=False) as journal:
+        run_pipeline(journal, None, TopicEncoder())
+
+    with open_journal(path, resume=True) as journal:
+        pending = journal.load_pending()
+        # 重複として除外した P_002 は完了扱いで、再開時に復元されない
+        assert sorted(article.title for article in pending) == ["Paper 0", "Paper 1"]
+        assert all(article.abstract_embedding is not None for article in pending)
+
+        encoder = TopicEncoder()
+        store = RecordingStore()
+        run_pipeline(journal, store, encoder, restored=pending)
+
+        assert encoder.encoded == []
+        assert sorted(store.upserted) == sorted(str(article.url) for article in pending)
+        assert journal.load_pending() == []
+        assert journal.summary() == "journaled=3, embedded=3, upserted=3"
+
+
+def test_opening_without_resume_clears_the_journal(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoint.sqlite3"
+    article = Article(
+        title="Paper",
+        authors="Author A",
+        year="2024",
+        url="https://example.org/paper.html",
+        abstract="An abstract.",
+    )
+    with open_journal(path, resume=False) as journal:
+        journal.record_article(article)
+
+    with open_journal(path, resume=True) as journal:
+        assert journal.known_urls() == {"https://example.org/paper.html"}
+    with open_journal(path, resume=False) as journal:
+        assert journal.known_urls() == set()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        journal.summary()
@@ -0,0 +1,54 @@
+"""Crawler dispatch behaviour against an ``httpx.MockTransport`` site."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from crawler import CvprCrawler, build_sources
+
+PAPERS = 20
+PAPER_PREFIX = "/content/CVPR2024/html/"
+LISTING = (
+    "<html><body><dl>"
+    + "".join(
+        f'<dt class="ptitle"><br><a href="{PAPER_PREFIX}P_{index:03d}_CVPR_2024_paper.html">'
+        f"Paper {index}</a></dt>"
+        for index in range(PAPERS)
+    )
+    + "</dl></body></html>"
+)
+PAPER = (
+    '<html><body><div id="authors"><b><i>Author A</i></b>; CVPR 2024</div>'
+    '<div id="abstract">An abstract.</div></body></html>'
+)
+
+
+def test_worker_failure_cancels_the_other_workers() -> None:
+    requested: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/CVPR2024":
+            return httpx.Response(200, text=LISTING)
+        requested.append(request.url.path)
+        if request.url.path.endswith("P_000_CVPR_2024_paper.html"):
+            raise RuntimeError("injected failure")
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=PAPER)
+
+    async def scenario() -> set[asyncio.Task[object]]:
+        crawler = CvprCrawler(
+            sources=build_sources([2024]),
+            concurrency=4,
+            max_concurrency=4,
+            transport=httpx.MockTransport(handler),
+        )
+        with pytest.raises(RuntimeError, match="injected failure"):
+            await crawler.crawl()
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(scenario()) == set()
+    # 失敗したワーカー以外も打ち切られ、残りの論文は取得されない
+    assert len(requested) < PAPERS
@@ -0,0 +1,82 @@
+"""Tests for embedding-based near-duplicate detection."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pytest
+
+from dedup import NearDuplicateIndex
+from models import Article
+
+
+def make_article(name: str, embedding: Sequence[float] | None) -> Article:
+    return Article(
+        title=name,
+        authors="Author A",
+        year="2024",
+        url=f"https://example.org/{name}.html",
+        abstract=f"abstract of {name}",
+        abstract_embedding=np.asarray(embedding, dtype=np.float32) if embedding else None,
+    )
+
+
+def names(articles: Sequence[Article]) -> list[str]:
+    return [article.title for article in articles]
+
+
+def test_matches_across_blocks_and_calls() -> None:
+    index = NearDuplicateIndex(threshold=0.95, block_size=2)
+    first = [
+        make_article("a", [1, 0, 0]),
+        make_article("b", [0, 1, 0]),
+        make_article("c", [0, 0, 1]),
+        # 3 件目以降は別ブロックになり、保持済みのブロックと比較される
+        make_article("a-copy", [1, 0.01, 0]),
+    ]
+
+    kept, duplicates = index.filter(first)
+
+    assert names(kept) == ["a", "b", "c"]
+    assert [(match.url, match.matched_url) for match in duplicates] == [
+        ("https://example.org/a-copy.html", "https://example.org/a.html")
+    ]
+
+    # 2 回目の呼び出しでは、前回 2 つ目のブロックに入った c も正しい URL で見つかる
+    kept, duplicates = index.filter([make_article("c-copy", [0, 0.01, 2]), make_article("d", None)])
+
+    assert names(kept) == ["d"]
+    assert duplicates[0].matched_url == "https://example.org/c.html"
+    assert len(index) == 3
+
+
+def test_first_occurrence_within_a_block_wins() -> None:
+    index = NearDuplicateIndex(threshold=0.99, block_size=8)
+
+    kept, duplicates = index.filter(
+        [make_article("x", [1, 1]), make_article("x-copy", [2, 2]), make_article("y", [1, -1])]
+    )
+
+    assert names(kept) == ["x", "y"]
+    assert duplicates[0].matched_url == "https://example.org/x.html"
+    assert duplicates[0].score == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize(
+    ("threshold", "duplicate"),
+    [(0.5, True), (float(np.nextafter(np.float32(0.5), np.float32(1))), False)],
+)
+def test_threshold_is_inclusive(threshold: float, duplicate: bool) -> None:
+    # 正規化すると (1, 0, 0, 0) と (0.5, 0.5, 0.5, 0.5) になり、類似度はちょうど 0.5
+    index = NearDuplicateIndex(threshold=threshold)
+
+    _, duplicates = index.filter([make_article("a", [1, 0, 0, 0]), make_article("b", [1, 1, 1, 1])])
+
+    assert bool(duplicates) is duplicate
+
+
+@pytest.mark.parametrize("threshold", [0.0, -0.1, 1.01])
+def test_threshold_must_be_in_unit_interval(threshold: float) -> None:
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=threshold)
@@ -0,0 +1,170 @@
+"""Tests for ``EmbeddingService`` using a stub encoder instead of a real model."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import pytest
+
+import embedding
+from embedding import EmbeddingService
+from models import Article
+
+MODEL_NAME = "intfloat/multilingual-e5-large"
+CRASH_MARKER = "crash"
+
+
+class StubEncoder:
+    """Returns ``[len(text), code point of the last character]`` for each text."""
+
+    def encode(self, sentences: Sequence[str], **_: object) -> np.ndarray:
+        return np.asarray([stub_vector(text) for text in sentences], dtype=np.float32)
+
+
+class CrashingEncoder(StubEncoder):
+    """Kills its worker process once the other shard has finished."""
+
+    def __init__(self, done: Any) -> None:
+        self.done = done
+
+    def encode(self, sentences: Sequence[str], **options: object) -> np.ndarray:
+        if any(CRASH_MARKER in text for text in sentences):
+            self.done.wait(timeout=60)
+            # もう一方のシャードの結果が親に届くのを待ってから落とす
+            time.sleep(0.5)
+            os._exit(1)
+        vectors = super().encode(sentences, **options)
+        self.done.set()
+        return vectors
+
+
+class PoisonedEncoder(StubEncoder):
+    """Fails every batch that contains ``marker`` and records the batch sizes."""
+
+    def __init__(self, marker: str) -> None:
+        self.marker = marker
+        self.batch_sizes: list[int] = []
+
+    def encode(self, sentences: Sequence[str], **options: object) -> np.ndarray:
+        self.batch_sizes.append(len(sentences))
+        if any(self.marker in text for text in sentences):
+            raise RuntimeError("poisoned input")
+        return super().encode(sentences, **options)
+
+
+def stub_vector(text: str) -> list[float]:
+    return [float(len(text)), float(ord(text[-1]))]
+
+
+def init_stub_worker(done: Any) -> None:
+    embedding._WORKER_SERVICE = EmbeddingService(MODEL_NAME)
+    embedding._WORKER_SERVICE._model = CrashingEncoder(done=done)
+
+
+def make_articles(abstracts: Sequence[str]) -> list[Article]:
+    return [
+        Article(
+            title=f"Paper {index}",
+            authors="Author A",
+            year="2024",
+            url=f"https://example.org/paper-{index}.html",
+            abstract=abstract,
+        )
+        for index, abstract in enumerate(abstracts)
+    ]
+
+
+def stub_service(workers: int) -> EmbeddingService:
+    service = EmbeddingService(MODEL_NAME, workers=workers)
+    if workers > 1:
+        context = multiprocessing.get_context("spawn")
+        # 実モデルの代わりにスタブを読み込むワーカーを差し込む
+        service._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=init_stub_worker,
+            initargs=(context.Event(),),
+        )
+    return service
+
+
+def test_threads_default_to_an_equal_share_of_cores(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(embedding.os, "cpu_count", lambda: 8)
+
+    assert EmbeddingService(MODEL_NAME, workers=3)._num_threads == 2
+    assert EmbeddingService(MODEL_NAME, workers=16)._num_threads == 1
+    assert EmbeddingService(MODEL_NAME, workers=3, num_threads=4)._num_threads == 4
+    assert EmbeddingService(MODEL_NAME)._num_threads is None
+
+
+def test_failed_batch_is_split_until_only_the_bad_item_fails() -> None:
+    abstracts = [f"abstract number {index}" for index in range(8)]
+    abstracts[5] = "poison pill"
+    articles = make_articles(abstracts)
+    service = EmbeddingService(MODEL_NAME)
+    encoder = PoisonedEncoder("poison")
+    service._model = encoder
+
+    result = service.embed_articles(articles, batch_size=8)
+
+    assert [failure["url"] for failure in result.failed] == [str(articles[5].url)]
+    assert result.processed == 7
+    for index, article in enumerate(articles):
+        if index == 5:
+            assert article.abstract_embedding is None
+        else:
+            np.testing.assert_array_equal(
+                article.abstract_embedding, stub_vector(f"passage: {article.abstract}")
+            )
+    # 8 件 -> 4 + 4 -> 2 + 2 -> 1 + 1 と失敗した側だけを二分割する
+    assert sorted(encoder.batch_sizes) == [1, 1, 2, 2, 4, 4, 8]
+
+
+def test_sharded_embedding_keeps_input_order() -> None:
+    abstracts = ["a" * length + str(length % 10) for length in (7, 3, 11, 5, 2, 9)]
+    articles = make_articles(abstracts)
+    service = stub_service(workers=2)
+    try:
+        result = service.embed_articles(articles)
+    finally:
+        service.close()
+
+    assert result.processed == len(articles)
+    assert result.failed == []
+    for article in articles:
+        np.testing.assert_array_equal(
+            article.abstract_embedding, stub_vector(f"passage: {article.abstract}")
+        )
+
+
+def test_crashed_shard_is_recorded_as_failures() -> None:
+    # 文字数順のラウンドロビンで、短い順に 0, 2, 4 番目がシャード 0、1, 3, 5 番目がシャード 1
+    abstracts = [
+        "aa",
+        f"{CRASH_MARKER}-b",
+        "cccccccc",
+        f"{CRASH_MARKER}-dddddd",
+        "e" * 12,
+        "f" * 20,
+    ]
+    articles = make_articles(abstracts)
+    service = stub_service(workers=2)
+    try:
+        result = service.embed_articles(articles)
+    finally:
+        service.close()
+
+    assert [failure["url"] for failure in result.failed] == [
+        str(article.url) for article in articles[1::2]
+    ]
+    assert all("shard 1" in failure["error"] for failure in result.failed)
+    assert result.processed == 3
+    assert all(article.abstract_embedding is not None for article in articles[::2])
+    # 異常終了したプールは破棄され、次の呼び出しで作り直される
+    assert service._pool is None
@@ -0,0 +1,86 @@
+"""Tests for the SQLite embedding cache and its use by ``EmbeddingService``."""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import embedding_cache
+from embedding import PASSAGE_PREFIX, QUERY_PREFIX, EmbeddingService
+from embedding_cache import EmbeddingCache
+from models import Article
+
+MODEL = "intfloat/multilingual-e5-large"
+
+
+class CountingEncoder:
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode(self, sentences: Sequence[str], **_: object) -> np.ndarray:
+        self.encoded.extend(sentences)
+        return np.asarray([[float(len(text)), 1.0] for text in sentences], dtype=np.float32)
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[EmbeddingCache]:
+    # 同じナノ秒に書き込まれて順序が決まらないことがないよう、時刻を 1 ずつ進める
+    clock = itertools.count(1)
+    monkeypatch.setattr(embedding_cache.time, "time_ns", lambda: next(clock))
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=3)
+    yield cache
+    cache.close()
+
+
+def vector(value: float) -> np.ndarray:
+    return np.asarray([value, value], dtype=np.float32)
+
+
+def test_least_recently_used_rows_are_evicted_first(cache: EmbeddingCache) -> None:
+    for key, value in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+        cache.put_many(MODEL, PASSAGE_PREFIX, [(key, vector(value))])
+    # 参照した a は新しくなり、最も古い b が追い出される
+    cache.get_many(MODEL, PASSAGE_PREFIX, ["a"])
+
+    cache.put_many(MODEL, PASSAGE_PREFIX, [("d", vector(4.0))])
+
+    assert len(cache) == 3
+    assert sorted(cache.get_many(MODEL, PASSAGE_PREFIX, ["a", "b", "c", "d"])) == ["a", "c", "d"]
+
+
+def test_model_name_and_prefix_are_part_of_the_key(cache: EmbeddingCache) -> None:
+    cache.put_many(MODEL, PASSAGE_PREFIX, [("a", vector(1.0))])
+
+    assert cache.get_many("other/model", PASSAGE_PREFIX, ["a"]) == {}
+    assert cache.get_many(MODEL, QUERY_PREFIX, ["a"]) == {}
+    np.testing.assert_array_equal(cache.get_many(MODEL, PASSAGE_PREFIX, ["a"])["a"], vector(1.0))
+
+
+def test_service_counts_hits_and_misses(cache: EmbeddingCache) -> None:
+    def articles(abstracts: Sequence[str]) -> list[Article]:
+        return [
+            Article(
+                title=abstract,
+                authors="Author A",
+                year="2024",
+                url=f"https://example.org/{abstract}.html",
+                abstract=abstract,
+            )
+            for abstract in abstracts
+        ]
+
+    encoder = CountingEncoder()
+    service = EmbeddingService(MODEL, cache=cache)
+    service._model = encoder
+
+    first = service.embed_articles(articles(["one", "two"]))
+    second = service.embed_articles(articles(["two", "three"]))
+
+    assert (first.cache_hits, first.cache_misses) == (0, 2)
+    assert (second.cache_hits, second.cache_misses) == (1, 1)
+    assert second.processed == 2
+    assert encoder.encoded == ["passage: one", "passage: two", "passage: three"]
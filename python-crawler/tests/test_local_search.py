@@ -0,0 +1,122 @@
+"""Tests for the offline ``search_articles`` port in ``local_search``.
+
+Expected ranks are ``ts_rank`` values returned by Postgres 16 for the same
+text. With ``POSTGRES_TEST_DSN`` set, the local ranks are also compared with
+the database directly.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+from local_search import LocalSearchIndex, TextIndex, tokenize
+from models import Article
+
+DSN = os.environ.get("POSTGRES_TEST_DSN")
+
+CORPUS = [
+    ("Self-Supervised Depth Estimation", "monocular depth estimation without labels", [1, 0, 0]),
+    ("Depth Completion", "sparse depth to dense depth; estimation is not the focus", [0.6, 0.8, 0]),
+    ("Image Segmentation", "panoptic segmentation of street scenes", [0.9, 0.1, 0.1]),
+    ("Estimation of Camera Pose", "relative pose from depth maps", [0, 0, 1]),
+    ("Unembedded Paper", "depth estimation from a single image", None),
+]
+
+
+def build_index() -> LocalSearchIndex:
+    return LocalSearchIndex.from_articles(
+        Article(
+            title=title,
+            authors="Author A",
+            year="2024",
+            url=f"https://example.org/paper-{index}.html",
+            abstract=abstract,
+            abstract_embedding=embedding,
+        )
+        for index, (title, abstract, embedding) in enumerate(CORPUS)
+    )
+
+
+def ranked(hits: list) -> list[int]:
+    return [int(hit.url.removesuffix(".html").rsplit("-", 1)[1]) for hit in hits]
+
+
+def test_tokenize_follows_the_simple_parser() -> None:
+    # to_tsvector('simple', ...) の位置順
+    assert tokenize("Self-Supervised ResNet-50, e.g. v1.5 state_of art.") == [
+        "self-supervised",
+        "self",
+        "supervised",
+        "resnet",
+        "-50",
+        "e.g",
+        "v1.5",
+        "state",
+        "of",
+        "art",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("title", "abstract", "query", "expected"),
+    [
+        ("deep depth", "estimation of depth in the wild", "depth estimation", 0.77383226),
+        ("a b", "", "a b", 0.9910322),
+        ("a x x b", "", "a b", 0.9735848),
+        ("", "a b", "a b", 0.39641288),
+        ("a c", "", "a b", 1e-20),
+    ],
+)
+def test_multi_term_rank_matches_ts_rank(
+    title: str, abstract: str, query: str, expected: float
+) -> None:
+    _, ranks, _ = TextIndex([title], [abstract]).lookup(tokenize(query))
+
+    assert ranks[0] == pytest.approx(expected, rel=1e-5)
+
+
+def test_hybrid_ordering_on_small_corpus() -> None:
+    index = build_index()
+    query = [1.0, 0.0, 0.0]
+
+    # 全文検索のみ: 両方の語を含む行だけが対象
+    assert ranked(index.search("depth estimation", alpha=1.0)) == [0, 1, 3, 4]
+    # ベクトルのみ: 全行が対象で、埋め込みの無い行はスコア 0
+    assert ranked(index.search("depth estimation", query, alpha=0.0)) == [0, 2, 1, 3, 4]
+    # 混合: 語を含まない 2 もベクトル類似度で 3, 4 より上に来る
+    hits = index.search("depth estimation", query, alpha=0.5)
+    assert ranked(hits) == [0, 1, 2, 3, 4]
+    assert hits[2].score == pytest.approx(0.5 * 0.9 / np.linalg.norm([0.9, 0.1, 0.1]))
+
+
+def test_ann_candidates_keep_the_exact_ordering() -> None:
+    index = build_index()
+    exact = ranked(index.search("depth estimation", [1.0, 0.0, 0.0], alpha=0.5))
+
+    index.build_ann("ivf", n_lists=2, n_probe=2)
+
+    assert ranked(index.search("depth estimation", [1.0, 0.0, 0.0], alpha=0.5)) == exact
+
+
+@pytest.mark.skipif(not DSN, reason="POSTGRES_TEST_DSN is not set")
+@pytest.mark.parametrize(
+    "query", ["depth", "depth estimation", "self-supervised depth", "estimation of depth maps"]
+)
+def test_text_rank_matches_postgres(query: str) -> None:
+    psycopg = pytest.importorskip("psycopg")
+    titles = [title for title, _, _ in CORPUS]
+    abstracts = [abstract for _, abstract, _ in CORPUS]
+    doc_ids, ranks, _ = TextIndex(titles, abstracts).lookup(list(dict.fromkeys(tokenize(query))))
+    local = dict(zip(doc_ids.tolist(), ranks.tolist(), strict=True))
+
+    with psycopg.connect(DSN) as conn:
+        for doc_id, (title, abstract) in enumerate(zip(titles, abstracts, strict=True)):
+            (expected,) = conn.execute(
+                "select ts_rank(setweight(to_tsvector('simple', %s), 'A')"
+                " || setweight(to_tsvector('simple', %s), 'B'), plainto_tsquery('simple', %s))",
+                (title, abstract, query),
+            ).fetchone()
+            assert local.get(doc_id, 0.0) == pytest.approx(expected, rel=1e-5, abs=1e-12)
@@ -0,0 +1,40 @@
+"""Tests for the on-disk page cache behind ``--page-cache`` / ``--since-cache``."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from page_cache import CachedPage, PageCache
+
+
+def test_known_urls_only_lists_pages_that_parsed(tmp_path: Path) -> None:
+    cache = PageCache(tmp_path / "pages.sqlite3")
+    pages = [
+        CachedPage("https://example.org/listing", "<html></html>", fetched_at=1.0),
+        CachedPage(
+            "https://example.org/parsed.html",
+            "<html></html>",
+            fetched_at=1.0,
+            parsed_at=2.0,
+            abstract="An abstract.",
+            authors="Author A",
+        ),
+        # 解析したが要旨が無かったページは次回も取得し直す
+        CachedPage(
+            "https://example.org/no-abstract.html",
+            "<html></html>",
+            fetched_at=1.0,
+            parsed_at=2.0,
+            abstract="",
+            authors="Author A",
+        ),
+        CachedPage("https://example.org/unparsed.html", "<html></html>", fetched_at=1.0),
+    ]
+    for page in pages:
+        cache.store(page)
+
+    assert cache.known_urls() == {
+        page.url for page in (cache.get(page.url) for page in pages) if page and page.has_article
+    }
+    assert cache.known_urls() == {"https://example.org/parsed.html"}
+    cache.close()
@@ -0,0 +1,48 @@
+"""lxml fast-path parsers against the BeautifulSoup reference and ``golden.json``.
+
+Every ``benchmarks/fixtures/*/*.html`` page is checked; ``listing.html`` files
+go through the listing parsers, the rest through the paper page parsers. Pages
+saved from the live site with ``parse_benchmark.py --save`` are picked up the
+same way once their output is recorded with ``--update-golden``.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from crawler import (
+    parse_article_fields,
+    parse_article_fields_soup,
+    parse_listing,
+    parse_listing_soup,
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+GOLDEN = json.loads((FIXTURES_DIR / "golden.json").read_text(encoding="utf-8"))
+PAGES = sorted(str(path.relative_to(FIXTURES_DIR)) for path in FIXTURES_DIR.glob("*/*.html"))
+
+
+def jsonable(value: Any) -> Any:
+    # golden.json ではタプルがリストになるため、同じ形にそろえて比較する
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+def test_every_fixture_has_a_golden_entry() -> None:
+    assert PAGES
+    assert sorted(GOLDEN) == PAGES
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_fast_parser_matches_soup_and_golden(name: str) -> None:
+    html = (FIXTURES_DIR / name).read_text(encoding="utf-8")
+    if name.endswith("listing.html"):
+        fast, soup = parse_listing(html), parse_listing_soup(html)
+    else:
+        fast, soup = parse_article_fields(html), parse_article_fields_soup(html)
+
+    assert fast == soup
+    assert jsonable(soup) == GOLDEN[name]
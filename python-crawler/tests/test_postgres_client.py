@@ -0,0 +1,102 @@
+"""Integration tests for the COPY backend against a real Postgres with pgvector.
+
+Skipped unless ``POSTGRES_TEST_DSN`` points at a database with
+``supabase/schema.sql`` applied (e.g. the one started by ``supabase start``).
+Rows are written under a per-run URL prefix and deleted afterwards.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+import pytest
+
+from models import DEFAULT_EMBEDDING_PRECISION, Article
+from postgres_client import PostgresCopyClient
+
+DSN = os.environ.get("POSTGRES_TEST_DSN")
+DIMENSION = 1024
+
+pytestmark = pytest.mark.skipif(not DSN, reason="POSTGRES_TEST_DSN is not set")
+psycopg = pytest.importorskip("psycopg")
+
+
+@pytest.fixture
+def url_prefix() -> Iterator[str]:
+    prefix = f"https://example.com/test-{uuid.uuid4().hex}/"
+    yield prefix
+    with psycopg.connect(DSN) as conn:
+        conn.execute('delete from public."Articles" where url like %s', (f"{prefix}%",))
+
+
+def make_article(prefix: str, index: int, title: str, embedding: bool) -> Article:
+    vector = np.full(DIMENSION, index + 1, dtype=np.float32) / DIMENSION if embedding else None
+    return Article(
+        title=title,
+        authors="Author A, Author B",
+        year="2024",
+        url=f"{prefix}paper-{index}.html",
+        abstract=f"abstract {index}",
+        abstract_embedding=vector,
+    )
+
+
+def fetch_rows(prefix: str) -> dict[str, tuple[str, str | None]]:
+    with psycopg.connect(DSN) as conn:
+        rows = conn.execute(
+            'select url, title, abstract_embedding::text from public."Articles" where url like %s',
+            (f"{prefix}%",),
+        ).fetchall()
+    return {url: (title, embedding) for url, title, embedding in rows}
+
+
+def test_copy_merges_rows_and_collapses_duplicate_urls(url_prefix: str) -> None:
+    batches: list[Sequence[Article]] = []
+    articles = [make_article(url_prefix, index, f"Paper {index}", True) for index in range(3)]
+    # 同じ URL が同じロードに 2 回現れても 1 行にまとまる
+    articles.append(make_article(url_prefix, 0, "Paper 0", True))
+
+    PostgresCopyClient(DSN).upsert_articles_chunked(articles, batch_size=2, on_batch=batches.append)
+
+    rows = fetch_rows(url_prefix)
+    assert len(rows) == 3
+    assert all(embedding is not None for _, embedding in rows.values())
+    stored = np.array(rows[f"{url_prefix}paper-1.html"][1].strip("[]").split(","), dtype=np.float32)
+    np.testing.assert_allclose(
+        stored, articles[1].abstract_embedding, atol=10**-DEFAULT_EMBEDDING_PRECISION
+    )
+    assert [len(batch) for batch in batches] == [2, 2]
+
+
+def test_reupsert_without_embedding_keeps_stored_vector(url_prefix: str) -> None:
+    client = PostgresCopyClient(DSN)
+    client.upsert_articles([make_article(url_prefix, 0, "Original title", True)])
+
+    client.upsert_articles(
+        [
+            make_article(url_prefix, 0, "Updated title", False),
+            make_article(url_prefix, 1, "New paper", False),
+        ]
+    )
+
+    rows = fetch_rows(url_prefix)
+    assert rows[f"{url_prefix}paper-0.html"][0] == "Updated title"
+    assert rows[f"{url_prefix}paper-0.html"][1] is not None
+    assert rows[f"{url_prefix}paper-1.html"][1] is None
+    existing = client.fetch_existing_urls(["2024"])
+    assert existing[f"{url_prefix}paper-0.html"] is True
+    assert existing[f"{url_prefix}paper-1.html"] is False
+
+
+def test_delete_articles_removes_only_the_given_urls(url_prefix: str) -> None:
+    client = PostgresCopyClient(DSN)
+    client.upsert_articles(
+        [make_article(url_prefix, index, f"Paper {index}", True) for index in range(3)]
+    )
+
+    client.delete_articles([f"{url_prefix}paper-0.html", f"{url_prefix}paper-2.html"])
+
+    assert list(fetch_rows(url_prefix)) == [f"{url_prefix}paper-1.html"]
@@ -0,0 +1,54 @@
+"""``QueryServer`` over a local socket with a stub embedding service."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+
+import httpx
+import numpy as np
+
+from query_server import QueryBatcher, QueryServer
+
+
+class FlakyService:
+    """Fails the first ``failures`` model calls, then returns one vector per query."""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+
+    def warm_up(self) -> None:
+        pass
+
+    def embed_queries(self, queries: Sequence[str]) -> list[np.ndarray]:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model crashed")
+        return [np.asarray([float(len(query)), 1.0], dtype=np.float32) for query in queries]
+
+
+async def post_twice(service: FlakyService) -> list[httpx.Response]:
+    batcher = QueryBatcher(service, max_wait=0)  # type: ignore[arg-type]
+    await batcher.start()
+    server = await asyncio.start_server(QueryServer(batcher)._handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            # 同じ keep-alive 接続で 2 回送り、失敗後も接続が使えることを確かめる
+            return [
+                await client.post("/embed", json={"queries": ["diffusion", "nerf"]}),
+                await client.post("/embed", json={"query": "diffusion"}),
+            ]
+    finally:
+        server.close()
+        await server.wait_closed()
+        await batcher.close()
+
+
+def test_model_failure_returns_500_and_the_server_keeps_serving() -> None:
+    failed, recovered = asyncio.run(post_twice(FlakyService(failures=1)))
+
+    assert failed.status_code == 500
+    assert failed.json() == {"error": "failed to embed queries"}
+    assert recovered.status_code == 200
+    assert recovered.json() == {"embedding": [9.0, 1.0]}
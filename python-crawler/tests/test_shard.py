@@ -0,0 +1,60 @@
+"""Tests for merging per-shard reports and deleting cross-shard duplicates."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from crawler import CrawlResult
+from shard import (
+    ShardSpec,
+    delete_cross_shard_duplicates,
+    merge_shard_reports,
+    write_shard_report,
+)
+
+LISTING = "https://openaccess.thecvf.com/CVPR2024?day=all"
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.deleted: list[str] = []
+
+    def delete_articles(self, urls: Sequence[str]) -> None:
+        self.deleted.extend(urls)
+
+
+def shard_report(tmp_path: Path, index: int, titles: dict[str, str]) -> dict[str, Any]:
+    crawl = CrawlResult(seen_titles=titles, scheduled=len(titles))
+    crawl.per_year_counts["2024"] = len(titles)
+    # 一覧ページは全シャードが取得するため、一覧の失敗はどのレポートにも載る
+    crawl.failures.extend([LISTING, f"https://example.org/failed-{index}.html"])
+    path = tmp_path / f"shard-{index}.json"
+    write_shard_report(path, ShardSpec(index, 2), crawl)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_merge_dedupes_failures_and_deletes_losing_cross_shard_copies(tmp_path: Path) -> None:
+    reports = [
+        shard_report(tmp_path, 1, {"paper b": "https://example.org/b.html"}),
+        shard_report(
+            tmp_path,
+            0,
+            {"paper a": "https://example.org/a.html", "paper b": "https://example.org/b2.html"},
+        ),
+    ]
+
+    merged = merge_shard_reports(reports)
+
+    assert merged["failures"] == [
+        LISTING,
+        "https://example.org/failed-0.html",
+        "https://example.org/failed-1.html",
+    ]
+    assert merged["total"] == 2
+    # シャード番号の小さい側 (0) を残し、1 の URL を削除する
+    store = RecordingStore()
+    assert delete_cross_shard_duplicates(merged, store) == ["https://example.org/b.html"]
+    assert store.deleted == ["https://example.org/b.html"]
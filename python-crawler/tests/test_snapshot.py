@@ -0,0 +1,75 @@
+"""Round trip of Parquet + ``.npy`` corpus snapshots."""
+
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from models import Article
+from snapshot import SnapshotError, load_snapshot, write_snapshot
+
+pytest.importorskip("pyarrow")
+
+MODEL = "intfloat/multilingual-e5-large"
+
+
+def make_articles() -> list[Article]:
+    rng = np.random.default_rng(0)
+    return [
+        Article(
+            id=uuid.UUID(int=index + 1) if index % 2 else None,
+            title=f"Paper {index}",
+            authors="Author A, 田中 花子",
+            year="2024",
+            url=f"https://example.org/paper-{index}.html",
+            abstract=f"Abstract {index} — ünïcode",
+            # index 2 は埋め込みなし
+            abstract_embedding=None if index == 2 else rng.standard_normal(8).astype(np.float32),
+        )
+        for index in range(5)
+    ]
+
+
+def test_round_trip_keeps_rows_and_maps_the_matrix(tmp_path: Path) -> None:
+    articles = make_articles()
+
+    assert write_snapshot(tmp_path / "snap", articles, model_name=MODEL) == 4
+
+    snapshot = load_snapshot(tmp_path / "snap")
+    assert len(snapshot) == 5
+    assert snapshot.model_name == MODEL
+    assert isinstance(snapshot.embeddings, np.memmap)
+    assert snapshot.embeddings.shape == (4, 8)
+    assert [len(batch) for batch in snapshot.iter_batches(batch_size=2)] == [2, 2, 1]
+
+    loaded = snapshot.articles()
+    for original, restored in zip(articles, loaded, strict=True):
+        assert restored.model_dump(exclude={"abstract_embedding"}) == original.model_dump(
+            exclude={"abstract_embedding"}
+        )
+        if original.abstract_embedding is None:
+            assert restored.abstract_embedding is None
+            continue
+        np.testing.assert_array_equal(restored.abstract_embedding, original.abstract_embedding)
+        # 記事の埋め込みは mmap した行列の行ビューで、コピーされていない
+        assert np.shares_memory(restored.abstract_embedding, snapshot.embeddings)
+
+
+def test_load_without_mmap_reads_the_matrix_into_memory(tmp_path: Path) -> None:
+    write_snapshot(tmp_path / "snap", make_articles())
+
+    snapshot = load_snapshot(tmp_path / "snap", mmap=False)
+
+    assert not isinstance(snapshot.embeddings, np.memmap)
+    assert snapshot.embeddings.shape == (4, 8)
+
+
+def test_mismatched_dimensions_are_rejected(tmp_path: Path) -> None:
+    articles = make_articles()
+    articles[3].abstract_embedding = np.zeros(4, dtype=np.float32)
+
+    with pytest.raises(SnapshotError, match="dimension mismatch"):
+        write_snapshot(tmp_path / "snap", articles)
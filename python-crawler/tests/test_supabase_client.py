@@ -0,0 +1,228 @@
+"""``SupabaseVectorClient`` against a fake PostgREST served by ``httpx.MockTransport``."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import postgrest
+import pytest
+from tenacity import wait_none
+
+from crawler import BASE_URL, CvprCrawler, build_sources
+from main import embedded_urls
+from models import Article
+from supabase_client import SupabaseClientError, SupabaseVectorClient, _byte_budget_batches
+
+PAPER_PREFIX = "/content/CVPR2024/html/"
+
+
+def paper_url(index: int) -> str:
+    return f"{BASE_URL}{PAPER_PREFIX}P_{index:03d}_CVPR_2024_paper.html"
+
+
+class FakePostgrest:
+    """Serves ``select`` requests on ``Articles`` from in-memory rows."""
+
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+        self.requests: list[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        params = request.url.params
+        rows = self.rows
+        if "year" in params:
+            years = params["year"].removeprefix("in.(").removesuffix(")").split(",")
+            rows = [row for row in rows if row["year"] in years]
+        if params.get("abstract_embedding") == "not.is.null":
+            rows = [row for row in rows if row["abstract_embedding"] is not None]
+        rows = sorted(rows, key=lambda row: row["url"])
+        offset = int(params.get("offset", 0))
+        rows = rows[offset : offset + int(params.get("limit", len(rows)))]
+        columns = params["select"].split(",")
+        return httpx.Response(
+            200, json=[{column: row[column] for column in columns} for row in rows]
+        )
+
+    def client(self) -> SupabaseVectorClient:
+        http_client = httpx.Client(transport=httpx.MockTransport(self.handler))
+        return SupabaseVectorClient(
+            postgrest.SyncPostgrestClient("http://supabase.test/rest/v1", http_client=http_client)
+        )
+
+
+STORED = [
+    {"url": paper_url(0), "year": "2024", "abstract_embedding": "[0.1,0.2]"},
+    {"url": paper_url(1), "year": "2024", "abstract_embedding": None},
+    {"url": paper_url(2), "year": "2024", "abstract_embedding": "[0.3,0.4]"},
+    {"url": paper_url(3), "year": "2024", "abstract_embedding": "[0.5,0.6]"},
+    {
+        "url": f"{BASE_URL}/content/CVPR2023/html/Old_CVPR_2023_paper.html",
+        "year": "2023",
+        "abstract_embedding": "[0.7,0.8]",
+    },
+]
+
+
+def test_fetch_existing_urls_pages_and_flags_embeddings() -> None:
+    fake = FakePostgrest(STORED)
+
+    existing = fake.client().fetch_existing_urls([2024], page_size=2)
+
+    assert existing == {
+        paper_url(0): True,
+        paper_url(1): False,
+        paper_url(2): True,
+        paper_url(3): True,
+    }
+    # 全件と埋め込みありの 2 通りをそれぞれ 2 件ずつページングする
+    assert len(fake.requests) == 5
+
+
+def test_skip_existing_fetches_only_rows_without_embeddings() -> None:
+    papers = 5
+    listing = (
+        "<html><body><dl>"
+        + "".join(
+            f'<dt class="ptitle"><br><a href="{PAPER_PREFIX}P_{index:03d}_CVPR_2024_paper.html">'
+            f"Paper {index}</a></dt>"
+            for index in range(papers)
+        )
+        + "</dl></body></html>"
+    )
+    paper = (
+        '<html><body><div id="authors"><b><i>Author A</i></b>; CVPR 2024</div>'
+        '<div id="abstract">An abstract.</div></body></html>'
+    )
+    requested: list[str] = []
+
+    def site(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/CVPR2024":
+            return httpx.Response(200, text=listing)
+        requested.append(str(request.url))
+        return httpx.Response(200, text=paper)
+
+    skip_urls = embedded_urls(FakePostgrest(STORED).client(), [2024])
+    crawler = CvprCrawler(
+        sources=build_sources([2024]),
+        transport=httpx.MockTransport(site),
+        skip_urls=skip_urls,
+    )
+    result = asyncio.run(crawler.crawl())
+
+    # 埋め込み付きで保存済みの 0, 2, 3 は取得せず、埋め込みの無い 1 と未保存の 4 を取得する
+    assert sorted(requested) == [paper_url(1), paper_url(4)]
+    assert result.skipped == 3
+    assert result.total == 2
+
+
+def make_article(index: int, abstract: str = "An abstract.") -> Article:
+    return Article(
+        title=f"Paper {index}",
+        authors="Author A",
+        year="2024",
+        url=paper_url(index),
+        abstract=abstract,
+    )
+
+
+def payload_bytes(records: list[dict[str, Any]]) -> int:
+    return len(json.dumps(records, ensure_ascii=False).encode("utf-8"))
+
+
+def test_byte_budget_batches_close_at_the_row_limit() -> None:
+    articles = [make_article(index) for index in range(5)]
+
+    batches = list(_byte_budget_batches(articles, max_rows=2, max_bytes=1_000_000))
+
+    assert [len(chunk) for chunk, _, _ in batches] == [2, 2, 1]
+    assert [article for chunk, _, _ in batches for article in chunk] == articles
+
+
+def test_byte_budget_batches_close_at_the_byte_limit() -> None:
+    articles = [make_article(index, "あ" * 100) for index in range(6)]
+    # 1 行は約 450 バイト (UTF-8 で "あ" は 3 バイト) なので、2 行までしか入らない
+    max_bytes = payload_bytes([articles[0].to_supabase_record()] * 2) + 50
+
+    batches = list(_byte_budget_batches(articles, max_rows=100, max_bytes=max_bytes))
+
+    assert [len(chunk) for chunk, _, _ in batches] == [2, 2, 2]
+    for chunk, records, size in batches:
+        assert records == [article.to_supabase_record() for article in chunk]
+        assert payload_bytes(records) <= size <= max_bytes
+
+
+def test_oversized_row_still_goes_out_alone() -> None:
+    articles = [make_article(0), make_article(1, "x" * 5_000), make_article(2)]
+
+    batches = list(_byte_budget_batches(articles, max_rows=100, max_bytes=1_000))
+
+    assert [[article.url for article in chunk] for chunk, _, _ in batches] == [
+        [articles[0].url],
+        [articles[1].url],
+        [articles[2].url],
+    ]
+    assert batches[1][2] > 1_000
+
+
+def flaky_client(*responses: httpx.Response) -> tuple[SupabaseVectorClient, list[httpx.Request]]:
+    """A client whose upserts get ``responses`` in turn, then succeed."""
+
+    pending = list(responses)
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return pending.pop(0) if pending else httpx.Response(201)
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = SupabaseVectorClient(
+        postgrest.SyncPostgrestClient("http://supabase.test/rest/v1", http_client=http_client)
+    )
+    return client, requests
+
+
+@pytest.fixture
+def no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SupabaseVectorClient._upsert_records.retry, "wait", wait_none())
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(503, text="<html>Service Unavailable</html>"),
+        httpx.Response(429, text="Too Many Requests"),
+        httpx.Response(503, json={"code": "PGRST001", "message": "Database client error"}),
+        httpx.Response(500, json={"code": "40P01", "message": "deadlock detected"}),
+    ],
+)
+@pytest.mark.usefixtures("no_retry_wait")
+def test_transient_errors_are_retried(response: httpx.Response) -> None:
+    client, requests = flaky_client(response)
+
+    client.upsert_articles_chunked([make_article(0)])
+
+    assert len(requests) == 2
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(400, json={"code": "22P02", "message": "invalid input syntax"}),
+        httpx.Response(409, json={"code": "23505", "message": "duplicate key value"}),
+        httpx.Response(401, json={"code": "PGRST301", "message": "JWT expired"}),
+        httpx.Response(413, text="Payload Too Large"),
+    ],
+)
+@pytest.mark.usefixtures("no_retry_wait")
+def test_client_errors_fail_without_retrying(response: httpx.Response) -> None:
+    client, requests = flaky_client(response)
+
+    with pytest.raises(SupabaseClientError) as excinfo:
+        client.upsert_articles_chunked([make_article(0)])
+
+    assert not excinfo.value.retryable
+    assert len(requests) == 1
@@ -0,0 +1,100 @@
+"""Retry and adaptive-limit behaviour of the crawler under injected 429/5xx responses."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import crawler
+from crawler import CvprCrawler, build_sources
+from throttle import AdaptiveLimiter, backoff_delay
+
+LISTING_PATH = "/CVPR2024"
+PAPER_PATH = "/content/CVPR2024/html/Retry_CVPR_2024_paper.html"
+LISTING = (
+    '<html><body><dl><dt class="ptitle"><br>'
+    f'<a href="{PAPER_PATH}">Retry Paper</a></dt></dl></body></html>'
+)
+PAPER = (
+    '<html><body><div id="authors"><b><i>Author A</i></b>; CVPR 2024</div>'
+    '<div id="abstract">An abstract.</div></body></html>'
+)
+
+
+def test_retries_honour_retry_after_then_back_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "1"}),
+            httpx.Response(503),
+            httpx.Response(200, text=PAPER),
+        ]
+    )
+    paper_requests: list[float] = []
+    delays: list[tuple[int, float | None]] = []
+    limits: list[int] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == LISTING_PATH:
+            return httpx.Response(200, text=LISTING)
+        paper_requests.append(time.monotonic())
+        return next(responses)
+
+    def fast_backoff(attempt: int, retry_after: float | None = None) -> float:
+        delays.append((attempt, retry_after))
+        limits.extend(limiter.limit for limiter in crawl._limiters.values())
+        return backoff_delay(attempt, retry_after, base=0.01)
+
+    monkeypatch.setattr(crawler, "backoff_delay", fast_backoff)
+    crawl = CvprCrawler(
+        sources=build_sources([2024]),
+        concurrency=4,
+        max_concurrency=4,
+        transport=httpx.MockTransport(handler),
+    )
+
+    result = asyncio.run(crawl.crawl())
+
+    assert [article.title for article in result.articles] == ["Retry Paper"]
+    assert result.request_stats["status_429"] == 1
+    assert result.request_stats["status_503"] == 1
+    assert result.request_stats["retries"] == 2
+    # 429 は Retry-After に従い、503 はジッター付き指数バックオフで再試行する
+    assert delays == [(1, 1.0), (2, None)]
+    assert paper_requests[1] - paper_requests[0] >= 0.9
+    assert paper_requests[2] - paper_requests[1] < 0.5
+    # 429 と 503 はそれぞれ別の輻輳として 4 -> 2 -> 1 に半減し、成功で 1 つ戻る
+    assert limits == [2, 1]
+    assert result.request_stats["concurrency_limit"] == 2
+
+
+def test_limiter_halves_once_per_in_flight_generation() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(8, maximum=8)
+        tickets = [await limiter.acquire() for _ in range(8)]
+        for ticket in tickets:
+            await limiter.release(ticket, throttled=True)
+        assert limiter.limit == 4
+
+        # 減少後に送ったリクエストの 429 は新しい輻輳として扱う
+        await limiter.release(await limiter.acquire(), throttled=True)
+        assert limiter.limit == 2
+
+        for _ in range(2 + 3 + 4):
+            await limiter.release(await limiter.acquire(), latency=0.01)
+        assert limiter.limit == 5
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_pauses_new_requests() -> None:
+    async def scenario() -> float:
+        limiter = AdaptiveLimiter(2, maximum=2)
+        await limiter.release(await limiter.acquire(), throttled=True, retry_after=0.3)
+        started = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.25
@@ -0,0 +1,150 @@
+"""Adaptive request concurrency and retry helpers for the crawler."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_MAX_CONCURRENCY = 20
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter for a single host.
+
+    The limit grows by one after ``limit`` consecutive healthy responses whose
+    smoothed latency stays within ``latency_tolerance`` times the best latency seen
+    so far, and halves on throttling signals (429/5xx/timeouts). The decrease is
+    applied once per congestion event: throttled responses to requests that were
+    already in flight when the limit was cut do not cut it again. A ``Retry-After``
+    hint pauses every new request to the host until it expires.
+
+    :meth:`acquire` returns a ticket that must be passed back to :meth:`release`.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int = DEFAULT_MAX_CONCURRENCY,
+        minimum: int = 1,
+        latency_tolerance: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if minimum <= 0 or initial < minimum or maximum < initial:
+            raise ValueError("expected 0 < minimum <= initial <= maximum")
+        self._limit = initial
+        self._minimum = minimum
+        self._maximum = maximum
+        self._latency_tolerance = latency_tolerance
+        self._clock = clock
+        self._in_flight = 0
+        self._healthy_streak = 0
+        self._latency_ewma: float | None = None
+        self._best_latency: float | None = None
+        self._paused_until = 0.0
+        self._issued = 0
+        self._recovery_ticket = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> int:
+        async with self._condition:
+            while True:
+                delay = self._paused_until - self._clock()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=delay)
+                    except TimeoutError:
+                        pass
+                    continue
+                if self._in_flight < self._limit:
+                    self._in_flight += 1
+                    self._issued += 1
+                    return self._issued
+                await self._condition.wait()
+
+    async def release(
+        self,
+        ticket: int,
+        latency: float | None = None,
+        throttled: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Return a slot and feed the request outcome into the controller."""
+
+        async with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._on_throttled(ticket, retry_after)
+            elif latency is not None:
+                self._on_success(latency)
+            self._condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        self._latency_ewma = (
+            latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+        )
+        if self._best_latency is None or self._latency_ewma < self._best_latency:
+            self._best_latency = self._latency_ewma
+
+        if self._latency_ewma > self._best_latency * self._latency_tolerance:
+            self._healthy_streak = 0
+            return
+
+        self._healthy_streak += 1
+        if self._healthy_streak >= self._limit and self._limit < self._maximum:
+            self._limit += 1
+            self._healthy_streak = 0
+
+    def _on_throttled(self, ticket: int, retry_after: float | None) -> None:
+        self._healthy_streak = 0
+        # 前回の減少より前に送ったリクエストの 429/5xx は同じ輻輳として扱う
+        if ticket > self._recovery_ticket:
+            self._limit = max(self._minimum, self._limit // 2)
+            self._recovery_ticket = self._issued
+        if retry_after:
+            self._paused_until = max(self._paused_until, self._clock() + retry_after)
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: float | None = None,
+    base: float = DEFAULT_BACKOFF_BASE,
+    maximum: float = DEFAULT_BACKOFF_MAX,
+) -> float:
+    """Delay before retry ``attempt`` (1-based): ``Retry-After`` if given, else full jitter."""
+
+    if retry_after is not None:
+        return min(retry_after, maximum)
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())